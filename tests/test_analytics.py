@@ -0,0 +1,132 @@
+import os
+import json
+import random
+import pytest
+from trusted_agent_engine.engine.context_bank import ContextBank
+from trusted_agent_engine.engine.types import Accountability
+from test_context_bank import make_trace, record_all
+
+np = pytest.importorskip("numpy")
+from trusted_agent_engine.engine import columnar  # noqa: E402
+from trusted_agent_engine.engine.analytics import LedgerAnalytics  # noqa: E402
+
+DIRECTORIES = ['src/api', 'src/core', 'docs', 'infra/prod', '.']
+
+def random_traces(count, seed=0, start=0):
+    rng = random.Random(seed)
+    traces = []
+    for i in range(start, start + count):
+        files = [os.path.join(rng.choice(DIRECTORIES), f"f{rng.randrange(3)}.py") for _ in range(rng.randrange(1, 4))]
+        trace = make_trace(
+            i, allowed=rng.random() < 0.7, risk=rng.choice(['low', 'medium', 'high']),
+            rules=tuple(rng.sample(['scope', 'secrets', 'size'], rng.randrange(0, 3))),
+            files=tuple(f.lstrip('./') if f.startswith('./') else f for f in files),
+            author=rng.choice(['ai-agent', 'human'])
+        )
+        trace.proposal.timestamp = 1_700_000_000 + i * 7200.0
+        if rng.random() < 0.8:
+            trace.accountability = Accountability(
+                responsibleEntity=rng.choice(['ai-agent', 'policy-author', 'system-fault']),
+                signature='abc', creditImpact=1.0 if trace.allowed else -2.0
+            )
+        traces.append(trace)
+    return traces
+
+def test_reports_match_python_loops(tmp_path):
+    root = str(tmp_path)
+    traces = random_traces(300)
+    bank = ContextBank(root)
+    record_all(bank, traces)
+    analytics = LedgerAnalytics(root)
+
+    summary = analytics.summary()
+    assert summary.records == 300
+    assert summary.outcomes['applied'] == sum(t.outcome == 'applied' for t in traces)
+    assert summary.riskLevels['high'] == sum(t.riskLevel == 'high' for t in traces)
+
+    expected = {}
+    for t in traces:
+        for directory in {os.path.dirname(f) or '.' for f in t.proposal.files}:
+            total, applied = expected.get(directory, (0, 0))
+            expected[directory] = (total + 1, applied + (t.outcome == 'applied'))
+    assert {d.directory: (d.total, d.applied) for d in analytics.success_by_directory()} == expected
+    top = {d.directory: d.total for d in analytics.success_by_directory(depth=1)}
+    assert top['src'] == sum(any(f.startswith('src/') for f in t.proposal.files) for t in traces)
+
+    timeline = analytics.rule_hits_over_time(bucket=86400)
+    scope = next(s for s in timeline.rules if s.ruleId == 'scope')
+    assert scope.total == sum('scope' in [v.ruleId for v in t.violations] for t in traces)
+    first_day = [t for t in traces if t.proposal.timestamp < timeline.buckets[0] + 86400]
+    assert scope.counts[0] == sum('scope' in [v.ruleId for v in t.violations] for t in first_day)
+
+    charged = [t.accountability.creditImpact for t in traces
+               if t.accountability and t.accountability.responsibleEntity != 'system-fault']
+    trajectory = analytics.credit_trajectory(bucket=3600)
+    assert trajectory[-1].credits == pytest.approx(100 + sum(charged))
+    assert all(a.time < b.time for a, b in zip(trajectory, trajectory[1:]))
+
+    since = traces[100].proposal.timestamp
+    assert analytics.summary(since=since).records == 200
+
+def test_incremental_update_and_rewrite(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    monkeypatch.setattr(columnar, 'PART_ROWS', 64)
+    bank = ContextBank(root)
+    record_all(bank, random_traces(100))
+    cache = columnar.ColumnarLedger(root)
+    assert cache.update() == 100
+    assert [p.rows for p in cache.parts()] == [64, 36]
+    assert cache.update() == 0
+
+    # Shards are cached separately and merged in the reports
+    record_all(ContextBank(root, shard='w0'), random_traces(50, seed=1, start=100))
+    record_all(bank, random_traces(40, seed=2, start=150))
+    assert cache.update() == 90
+    assert sorted(p.rows for p in cache.parts()) == [12, 50, 64, 64]
+    assert LedgerAnalytics(root, update=False).summary().records == 190
+    assert LedgerAnalytics(root, rebuild=True).summary().records == 190
+
+def test_background_completions_are_not_counted_as_decisions(tmp_path):
+    root = str(tmp_path)
+    provisional, completion = make_trace(0, allowed=False), make_trace(0, rules=('scope',))
+    provisional.timedOutStage = 'rules'
+    completion.outcome, completion.backgroundCompletion = 'pending', True
+    record_all(ContextBank(root), [provisional, completion, make_trace(1)])
+
+    analytics = LedgerAnalytics(root)
+    assert analytics.summary().records == 2
+    assert analytics.summary().outcomes == {'applied': 1, 'rejected': 1, 'pending': 0}
+    assert analytics.rule_hits_over_time().rules == []
+
+def test_update_streams_the_index_file(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    monkeypatch.setattr(columnar, 'PART_ROWS', 16)
+    bank = ContextBank(root)
+    record_all(bank, random_traces(40))
+    cache = columnar.ColumnarLedger(root)
+
+    def no_index(path):
+        raise AssertionError("the export must not load the ledger index")
+    with monkeypatch.context() as patched:
+        patched.setattr(columnar.LedgerIndex, 'for_ledger', staticmethod(no_index))
+        assert cache.update() == 40
+
+        # Caches written before the index offsets were kept still resume in place
+        meta_path = os.path.join(root, columnar.COLUMNS_DIR, 'ledger', 'meta.json')
+        meta = json.load(open(meta_path))
+        for part in meta['parts']:
+            del part['offset']
+        del meta['lastOffset'], meta['indexOffset']
+        json.dump(meta, open(meta_path, 'w'))
+        record_all(bank, random_traces(10, seed=1, start=40))
+        assert cache.update() == 10
+        assert [p.rows for p in cache.parts()] == [16, 16, 16, 2]
+        assert LedgerAnalytics(root, update=False).summary().records == 50
+
+    # A ledger rewritten underneath the cache is exported again
+    for suffix in ('', '.idx'):
+        os.remove(os.path.join(root, '.ai', f'ledger.jsonl{suffix}'))
+    columnar.LedgerIndex._instances.clear()
+    record_all(ContextBank(root), random_traces(30, seed=2))
+    assert cache.update() == 30
+    assert cache.records() == 30
@@ -0,0 +1,86 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from trusted_agent_engine.engine import anomaly_detector
+from trusted_agent_engine.engine.anomaly_detector import AnomalyDetector, DiffScanner, split_diff
+from trusted_agent_engine.engine.types import Proposal
+
+def scan_in_chunks(text, size):
+    scanner = DiffScanner()
+    for i in range(0, len(text), size):
+        scanner.feed(text[i:i + size])
+    return scanner
+
+def test_chunked_scan_matches_whole_scan():
+    blob = 'a1' * 40
+    diff = '\n'.join(['+line'] * 600 + ['+' + blob] + ['+ünïcödé'] * 3)
+    whole = scan_in_chunks(diff, len(diff))
+    for size in (1, 7, 64, 1000):
+        chunked = scan_in_chunks(diff, size)
+        assert (chunked.line_count, chunked.has_encoded_blob, chunked.non_ascii) == \
+            (whole.line_count, whole.has_encoded_blob, whole.non_ascii)
+    assert whole.has_encoded_blob and whole.line_count == 604
+
+def test_detect_reports_size_and_obfuscation():
+    diff = '\n'.join(['+x'] * 501) + '\n+' + 'A' * 120
+    report = AnomalyDetector().detect(Proposal(id='p', author='ai-agent', reasoning='r', files=['a'], diff=diff))
+    assert report.isAnomaly is True
+    assert report.score == 1.0
+    assert len(report.reasons) == 2
+
+def make_diff(seed, files=20):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(files):
+        parts.append(f'diff --git a/f{i}.py b/f{i}.py\n--- a/f{i}.py\n+++ b/f{i}.py\n@@ -1 +1 @@\n')
+        for _ in range(rng.randint(5, 40)):
+            kind = rng.random()
+            if kind < 0.02:
+                line = ''.join(rng.choice('0123456789abcdef') for _ in range(rng.randint(30, 70)))
+            elif kind < 0.04:
+                line = ''.join(rng.choice('ABCxyz019+/') for _ in range(rng.randint(80, 130)))
+            elif kind < 0.05:
+                line = 'é' * rng.randint(1, 3)
+            else:
+                line = 'x = 1'
+            parts.append(rng.choice('+- ') + line + '\n')
+    return ''.join(parts)
+
+def test_parallel_scan_identical_to_serial():
+    serial = AnomalyDetector()
+    with ThreadPoolExecutor(max_workers=4) as threads:
+        detectors = [
+            AnomalyDetector(parallel_threshold=0, chunk_size=256),
+            AnomalyDetector(parallel_threshold=0, chunk_size=300, executor=threads),
+        ]
+        for seed in range(30):
+            diff = make_diff(seed)
+            expected = serial.scan(diff)
+            for detector in detectors:
+                result = detector.scan(diff)
+                assert (result.newlines, result.has_encoded_blob, result.is_obfuscated) == \
+                    (expected.newlines, expected.has_encoded_blob, expected.is_obfuscated)
+
+            proposal = Proposal(id='p', author='ai-agent', reasoning='r', files=['f.py'], diff=diff)
+            assert detectors[0].detect(proposal) == serial.detect(proposal)
+
+def test_blob_spanning_chunk_boundary_is_found():
+    diff = 'x' * 150 + 'A' * 100 + 'y' * 150
+    # Force a hard cut through the middle of the blob: there are no newlines
+    assert split_diff(diff, 200)[0] == (0, 200)
+    assert AnomalyDetector(parallel_threshold=0, chunk_size=200).scan(diff).has_encoded_blob
+
+def test_split_prefers_file_boundaries():
+    diff = make_diff(1)
+    ranges = split_diff(diff, 512)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(diff)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(diff[start - 1] == '\n' for start, _ in ranges[1:])
+    assert sum(diff.startswith('diff --git ', start) for start, _ in ranges) > len(ranges) // 2
+
+def test_each_worker_count_gets_its_own_pool():
+    diff = make_diff(1)
+    expected = AnomalyDetector().scan(diff).newlines
+    for workers in (1, 2, 1):
+        assert AnomalyDetector(parallel_threshold=0, chunk_size=256, max_workers=workers).scan(diff).newlines == expected
+    assert anomaly_detector._pools[1]._max_workers == 1
+    assert anomaly_detector._pools[2]._max_workers == 2
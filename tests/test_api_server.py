@@ -0,0 +1,106 @@
+import gzip
+import json
+import asyncio
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api import server
+from trusted_agent_engine.api.server import app
+
+POLICY = """
+meta:
+  name: "api-test"
+scopes:
+  - id: "source"
+    allow: ["src/**"]
+risks: []
+rules:
+  - id: "no-anomalies"
+    description: "Anomalous diffs are flagged"
+    condition: {"var": "engine.isAnomaly"}
+    action: "warn"
+"""
+
+DIFF = ('diff --git a/src/app.py b/src/app.py\n'
+        '--- a/src/app.py\n'
+        '+++ b/src/app.py\n'
+        '@@ -1 +1,2 @@\n'
+        ' import os\n'
+        '+KEY = "' + 'deadbeef' * 10 + '"\n')
+
+def make_workspace(tmp_path):
+    (tmp_path / 'agent.policy.yaml').write_text(POLICY, encoding='utf-8')
+    return str(tmp_path)
+
+def test_stream_endpoint_with_gzip_body(tmp_path):
+    root = make_workspace(tmp_path)
+    client = TestClient(app)
+    meta = {"workspaceRoot": root, "id": "stream-1", "author": "ai-agent", "reasoning": "Add key"}
+
+    body = gzip.compress(DIFF.encode('utf-8'))
+    response = client.post(
+        '/v1/evaluate/stream',
+        content=iter([body[:10], body[10:]]),
+        headers={'X-Proposal-Meta': json.dumps(meta), 'Content-Encoding': 'gzip'}
+    )
+    assert response.status_code == 200, response.text
+    decision = response.json()
+    assert "Possible code obfuscation or binary smuggling detected." in decision['anomalyReport']['reasons']
+
+    trace = json.loads((tmp_path / '.ai' / 'ledger.jsonl').read_text(encoding='utf-8').splitlines()[-1])
+    assert trace['proposal']['files'] == ['src/app.py']
+    assert trace['proposal']['diff'] == DIFF
+
+def test_stream_endpoint_caps_body_and_inflated_size(tmp_path, monkeypatch):
+    root = make_workspace(tmp_path)
+    client = TestClient(app)
+    headers = {'X-Proposal-Meta': json.dumps({"workspaceRoot": root, "id": "big", "author": "ai-agent", "reasoning": "r"})}
+    monkeypatch.setattr(server, 'MAX_STREAM_DIFF_BYTES', 1024 * 1024)
+
+    bomb = gzip.compress(b'+' * (64 * 1024 * 1024))  # about 64 KiB on the wire
+    response = client.post('/v1/evaluate/stream', content=iter([bomb]), headers={**headers, 'Content-Encoding': 'gzip'})
+    assert response.status_code == 413
+
+    monkeypatch.setattr(server, 'MAX_STREAM_BODY_BYTES', 1024)
+    response = client.post('/v1/evaluate/stream', content=iter([b'+x\n' * 1000]), headers=headers)
+    assert response.status_code == 413
+    assert not (tmp_path / '.ai' / 'ledger.jsonl').exists() or not (tmp_path / '.ai' / 'ledger.jsonl').read_text()
+
+def test_stream_endpoint_rejects_missing_metadata(tmp_path):
+    client = TestClient(app)
+    response = client.post('/v1/evaluate/stream', content=DIFF, headers={'X-Workspace-Root': str(tmp_path)})
+    assert response.status_code == 400
+
+def test_history_endpoint(tmp_path):
+    root = make_workspace(tmp_path)
+    client = TestClient(app)
+    for i in range(3):
+        meta = {"workspaceRoot": root, "id": f"h-{i}", "author": "ai-agent", "reasoning": "Add key"}
+        client.post('/v1/evaluate/stream', content=DIFF, headers={'X-Proposal-Meta': json.dumps(meta)})
+
+    page = client.get('/v1/history', params={"workspaceRoot": root, "limit": 2}).json()
+    assert [t['proposal']['id'] for t in page['traces']] == ['h-2', 'h-1']
+    rest = client.get('/v1/history', params={"workspaceRoot": root, "cursor": page['nextCursor']}).json()
+    assert [t['proposal']['id'] for t in rest['traces']] == ['h-0']
+    count = client.get('/v1/history', params={"workspaceRoot": root, "file": "src/*", "countOnly": True}).json()
+    assert count['count'] == 3
+
+def test_batch_items_run_concurrently_and_batch_size_is_capped(tmp_path, monkeypatch):
+    running, peak = [0], [0]
+
+    async def evaluate(request, **kwargs):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return server.Decision(allowed=True, requiresHuman=False, riskLevel='low', actions=[], violations=[], auditLog='')
+
+    monkeypatch.setattr(server, '_evaluate_request', evaluate)
+    item = {"workspaceRoot": str(tmp_path), "proposal": {
+        "id": "p", "author": "ai-agent", "reasoning": "r", "files": ["src/a.py"], "diff": ""
+    }}
+    client = TestClient(app)
+    response = client.post('/v1/evaluate/batch', json={"requests": [item] * 4})
+    assert [r['status'] for r in response.json()['results']] == [200] * 4
+    assert peak[0] == 4
+
+    too_many = {"requests": [item] * (server.MAX_BATCH_SIZE + 1)}
+    assert client.post('/v1/evaluate/batch', json=too_many).status_code == 422
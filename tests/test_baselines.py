@@ -0,0 +1,105 @@
+import os
+import asyncio
+import statistics
+from trusted_agent_engine.engine import baselines
+from trusted_agent_engine.engine.baselines import RunningStats, BaselineStore
+from trusted_agent_engine import TrustedGuard
+from trusted_agent_engine.engine.context_bank import ContextBank
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+from trusted_agent_engine.engine.types import PolicyConfig, Proposal, DecisionTrace
+
+def make_proposal(path, lines, index=0):
+    diff = (f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -0,0 +1,{lines} @@\n"
+            + "+x = 1\n" * lines)
+    return Proposal(id=f"p-{index}", author='ai-agent', reasoning='r', files=[path], diff=diff)
+
+def make_trace(proposal, applied=True):
+    return DecisionTrace(
+        allowed=applied, requiresHuman=False, riskLevel='low', actions=[], violations=[], auditLog='',
+        outcome='applied' if applied else 'rejected', proposal=proposal
+    )
+
+def make_engine(root):
+    policy = PolicyConfig.model_validate({
+        "meta": {"name": "baselines", "anomalyBaseline": {"minSamples": 5}},
+        "scopes": [{"id": "all", "allow": ["**"]}],
+        "risks": [],
+        "rules": []
+    })
+    return PolicyEngine(policy, workspace_root=root)
+
+def test_running_stats_matches_batch_statistics():
+    values = [3, 8, 1, 9, 4, 4, 12]
+    stats = RunningStats()
+    for v in values:
+        stats.update(v)
+    assert abs(stats.mean - statistics.mean(values)) < 1e-9
+    assert abs(stats.std - statistics.stdev(values)) < 1e-9
+
+def test_baselines_learn_per_directory_sizes(tmp_path):
+    root = str(tmp_path)
+    bank = ContextBank(root)
+
+    async def learn():
+        for i in range(10):
+            # Generated code is always huge, auth changes always tiny
+            for proposal in (make_proposal('gen/models.py', 800 + i, i), make_proposal('src/auth/login.py', 2 + i % 2, i)):
+                await bank.record(make_trace(proposal))
+        # Rejected changes are not learned
+        await bank.record(make_trace(make_proposal('src/auth/login.py', 5000), applied=False))
+    asyncio.run(learn())
+
+    detector = make_engine(root).anomaly_detector
+    routine = detector.detect(make_proposal('gen/models.py', 805))
+    assert routine.reasons == []  # > 500 lines, but normal for gen/
+    assert routine.baselineZ is not None
+
+    suspicious = detector.detect(make_proposal('src/auth/login.py', 60))
+    assert any('src/auth' in reason for reason in suspicious.reasons)
+
+    # Persisted: a fresh store sees the same counts without touching the ledger
+    reloaded = BaselineStore(BaselineStore.for_workspace(root).path)
+    directory, stats = reloaded.baseline_for('src/auth', min_samples=5)
+    assert directory == 'src/auth'
+    assert stats['files'].count == 10
+
+def test_samples_are_journaled_and_compacted(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    bank = ContextBank(root)
+    store = BaselineStore.for_workspace(root)
+    other = BaselineStore(store.path)  # another process
+    monkeypatch.setattr(baselines, 'JOURNAL_COMPACT_BYTES', 400)
+
+    async def learn(count):
+        for i in range(count):
+            await bank.record(make_trace(make_proposal('src/a.py', 3, i)))
+    asyncio.run(learn(2))
+    assert not os.path.exists(store.path)  # appended to the journal only
+    other.refresh()
+    assert other.directories['src']['files'].count == 2
+
+    asyncio.run(learn(8))
+    assert os.path.getsize(store.journal_path) < 400  # folded into the snapshot
+    other.refresh()
+    assert other.directories['src']['added'].count == 10
+    assert BaselineStore(store.path).author_baseline('ai-agent', 1)['added'].mean == 3
+
+def test_observe_reuses_scan_counts_and_respects_disabled_baselines(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    engine = make_engine(root)
+    proposal = make_proposal('src/a.py', 4)
+    counted = []
+    monkeypatch.setattr(baselines, 'count_file_lines', lambda diff: counted.append(diff) or {})
+    decision = engine.evaluate(proposal, anomaly_report=engine.anomaly_detector.detect(proposal))
+    trace = DecisionTrace.from_decision(decision, proposal, outcome='applied')
+    assert 'fileStats' not in trace.model_dump_json()
+    asyncio.run(ContextBank(root).record(trace))
+    assert counted == []  # the scan already measured the diff
+    assert BaselineStore.for_workspace(root).directories['src']['added'].mean == 4
+
+    disabled = PolicyConfig.model_validate({
+        "meta": {"name": "off", "anomalyBaseline": {"enabled": False}},
+        "scopes": [{"id": "all", "allow": ["**"]}], "risks": [], "rules": []
+    })
+    asyncio.run(TrustedGuard.evaluate(root, make_proposal('docs/x.md', 2), engine=PolicyEngine(disabled, workspace_root=root)))
+    assert 'docs' not in BaselineStore.for_workspace(root).directories
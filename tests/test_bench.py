@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from trusted_agent_engine.api.bench import BENCH_POLICY, local_server, run_benchmark, parse_mix, synthetic_proposal, benchmark_evaluation
+
+def test_parse_mix():
+    assert parse_mix("small=3,large=1") == {"small": 3, "large": 1}
+    with pytest.raises(ValueError):
+        parse_mix("huge=1")
+
+def test_synthetic_out_of_scope_touches_infra():
+    assert synthetic_proposal("out-of-scope", 0).files == ["infra/main.tf"]
+
+def test_closed_loop_benchmark_reports_server_stages():
+    with local_server() as (url, root):
+        report = asyncio.run(run_benchmark(url, root, concurrency=2, max_requests=20, warmup=2))
+    assert report.mode == "closed-loop"
+    assert report.requests == 20
+    assert report.errors == 0
+    assert report.latencyMs["p50"] <= report.latencyMs["p99"]
+    assert {"policy", "evaluate", "record"} <= set(report.serverStages)
+
+def test_local_server_benchmarks_a_copy_of_the_workspace(tmp_path):
+    (tmp_path / 'agent.policy.yaml').write_text(BENCH_POLICY, encoding='utf-8')
+    with local_server(str(tmp_path)) as (url, root):
+        assert root != str(tmp_path)
+        # Whichever of the limits comes first ends the run
+        report = asyncio.run(run_benchmark(url, root, concurrency=2, duration=0.5, max_requests=10**6, warmup=0))
+    assert 0 < report.requests < 10**6 and report.errors == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['agent.policy.yaml']  # no ledger, no credits
+
+def test_evaluation_microbenchmark_variants():
+    report = benchmark_evaluation(kind="docs", iterations=20, warmup=2)
+    assert set(report.variants) == {"record", "model", "eager-models"}
+    assert report.rules == 3
+    # The slotted record holds less memory than the public model built from it
+    assert report.variants["record"].retainedBytes < report.variants["model"].retainedBytes
@@ -0,0 +1,20 @@
+import sys
+import subprocess
+from trusted_agent_engine.api.bench import DEFAULT_MIX
+from trusted_agent_engine.engine.analytics import BUCKETS
+
+def test_cli_imports_command_modules_lazily():
+    check = (
+        "import sys, trusted_agent_engine.cli.main as cli\n"
+        "print(sorted(m for m in ('trusted_agent_engine.api.bench', 'trusted_agent_engine.api.server',"
+        " 'trusted_agent_engine.engine.analytics', 'trusted_agent_engine.engine.replay', 'fastapi', 'uvicorn',"
+        " 'numpy') if m in sys.modules))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", check], text=True)
+    assert output.strip() == "[]"
+
+    # The parser spells out choices it cannot import without loading those modules
+    def usage(command):
+        return subprocess.check_output([sys.executable, "-m", "trusted_agent_engine.cli.main", command, "--help"], text=True)
+    assert "{" + ",".join(BUCKETS) + "}" in usage("analytics")
+    assert "{" + ",".join(DEFAULT_MIX) + "}" in usage("bench-eval")
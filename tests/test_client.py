@@ -0,0 +1,112 @@
+import asyncio
+import httpx
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api.client import AsyncGovernanceClient, GovernanceClient, GovernanceAPIError
+from trusted_agent_engine.api.server import app
+from trusted_agent_engine.engine.types import Proposal, Decision
+
+POLICY = """
+meta:
+  name: "client-test"
+scopes:
+  - id: "source"
+    allow: ["src/**"]
+risks: []
+rules:
+  - id: "always-warn"
+    description: "Always warn"
+    condition: true
+    action: "warn"
+"""
+
+def make_workspace(tmp_path):
+    (tmp_path / 'agent.policy.yaml').write_text(POLICY, encoding='utf-8')
+    return str(tmp_path)
+
+def make_proposal(i):
+    return Proposal(id=f"c-{i}", author='ai-agent', reasoning='Client test', files=['src/a.py'], diff='+x')
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner):
+        self.inner = inner
+        self.paths = []
+
+    async def handle_async_request(self, request):
+        self.paths.append(request.url.path)
+        return await self.inner.handle_async_request(request)
+
+def test_async_client_coalesces_concurrent_calls(tmp_path):
+    root = make_workspace(tmp_path)
+    transport = RecordingTransport(httpx.ASGITransport(app=app))
+
+    async def run():
+        async with AsyncGovernanceClient("http://testserver", root, transport=transport, batch_window=0.05) as client:
+            return await asyncio.gather(*(client.evaluate(make_proposal(i)) for i in range(5)))
+
+    decisions = asyncio.run(run())
+    assert all(d.allowed and d.violations[0].ruleId == 'always-warn' for d in decisions)
+    assert transport.paths == ['/v1/evaluate/batch']
+
+def test_async_client_retries_503():
+    calls = []
+    decision = Decision(allowed=True, requiresHuman=False, riskLevel='low', actions=[], violations=[], auditLog='')
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) < 3:
+            return httpx.Response(503, json={"detail": "busy"}, headers={"Retry-After": "0"})
+        return httpx.Response(200, content=decision.model_dump_json())
+
+    async def run():
+        async with AsyncGovernanceClient("http://testserver", "/ws", transport=httpx.MockTransport(handler), max_batch_size=1) as client:
+            return await client.evaluate(make_proposal(0))
+
+    assert asyncio.run(run()).allowed is True
+    assert calls == ['/v1/evaluate'] * 3
+
+def test_batch_errors_are_per_request(tmp_path):
+    root = make_workspace(tmp_path)
+
+    async def run():
+        async with AsyncGovernanceClient("http://testserver", root, transport=httpx.ASGITransport(app=app), batch_window=0.05) as client:
+            return await asyncio.gather(
+                client.evaluate(make_proposal(0)),
+                client.evaluate(make_proposal(1), workspace_root=str(tmp_path / 'missing')),
+                return_exceptions=True
+            )
+
+    ok, error = asyncio.run(run())
+    assert ok.allowed is True
+    assert isinstance(error, GovernanceAPIError) and error.status_code == 400
+
+def test_rate_limited_batch_items_are_retried_singly():
+    calls = []
+    decision = Decision(allowed=True, requiresHuman=False, riskLevel='low', actions=[], violations=[], auditLog='')
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == '/v1/evaluate/batch':
+            return httpx.Response(200, json={"results": [
+                {"status": 200, "decision": decision.model_dump()},
+                {"status": 429, "error": "Rate limit exceeded"}
+            ]})
+        return httpx.Response(200, content=decision.model_dump_json())
+
+    async def run():
+        async with AsyncGovernanceClient("http://testserver", "/ws", transport=httpx.MockTransport(handler), batch_window=0.05) as client:
+            return await asyncio.gather(*(client.evaluate(make_proposal(i)) for i in range(2)))
+
+    assert all(d.allowed for d in asyncio.run(run()))
+    assert calls == ['/v1/evaluate/batch', '/v1/evaluate']
+
+def test_sync_and_in_process_clients(tmp_path):
+    root = make_workspace(tmp_path)
+    with GovernanceClient(http_client=TestClient(app), workspace_root=root) as client:
+        assert client.evaluate(make_proposal(0)).allowed is True
+    with GovernanceClient(workspace_root=root) as client:
+        assert client.evaluate(make_proposal(1)).violations[0].ruleId == 'always-warn'
+
+    async def run():
+        async with AsyncGovernanceClient(workspace_root=root) as client:
+            return await client.evaluate(make_proposal(2))
+    assert asyncio.run(run()).allowed is True
@@ -0,0 +1,138 @@
+import os
+import asyncio
+import threading
+from trusted_agent_engine.engine.context_bank import ContextBank
+from trusted_agent_engine.engine.ledger_index import LedgerIndex
+from trusted_agent_engine.engine.types import DecisionTrace, Proposal, Violation
+
+def make_trace(i, allowed=True, risk='low', rules=(), files=('src/app.py',), author='ai-agent'):
+    return DecisionTrace(
+        allowed=allowed, requiresHuman=False, riskLevel=risk, actions=[],
+        violations=[Violation(ruleId=r, description=r, level='block') for r in rules],
+        auditLog='', outcome='applied' if allowed else 'rejected',
+        proposal=Proposal(id=f"p-{i}", timestamp=1000.0 + i, author=author, reasoning='r', files=list(files), diff='+x')
+    )
+
+def record_all(bank, traces):
+    async def run():
+        for trace in traces:
+            await bank.record(trace)
+    asyncio.run(run())
+
+def test_query_filters_and_pagination(tmp_path):
+    bank = ContextBank(str(tmp_path))
+    traces = [
+        make_trace(i, allowed=i % 3 != 0, risk='high' if i % 2 else 'low',
+                   rules=('scope',) if i % 3 == 0 else (), files=(f'src/m{i % 4}/a.py',))
+        for i in range(20)
+    ]
+    record_all(bank, traces)
+
+    rejected = asyncio.run(bank.query(outcome='rejected', limit=3))
+    assert [t.proposal.id for t in rejected.traces] == ['p-18', 'p-15', 'p-12']
+    assert rejected.nextCursor is not None
+    rest = asyncio.run(bank.query(outcome='rejected', limit=3, cursor=rejected.nextCursor))
+    assert [t.proposal.id for t in rest.traces] == ['p-9', 'p-6', 'p-3']
+    last = asyncio.run(bank.query(outcome='rejected', limit=3, cursor=rest.nextCursor))
+    assert [t.proposal.id for t in last.traces] == ['p-0'] and last.nextCursor is None
+
+    assert asyncio.run(bank.query(rule_id='scope', count_only=True)).count == 7
+    assert asyncio.run(bank.query(risk_level='high', outcome='rejected', count_only=True)).count == 3
+    recorded = [t.recordedAt for t in traces]
+    assert asyncio.run(bank.query(since=recorded[10], until=recorded[14], count_only=True)).count == 5
+    page = asyncio.run(bank.query(since=recorded[10], until=recorded[14], outcome='rejected'))
+    assert [t.proposal.id for t in page.traces] == ['p-12']
+    # The client-supplied proposal timestamps play no part in time ranges
+    assert asyncio.run(bank.query(until=1014, count_only=True)).count == 0
+    files = asyncio.run(bank.query(file_glob='src/m1/*', limit=100))
+    assert [t.proposal.id for t in files.traces] == ['p-17', 'p-13', 'p-9', 'p-5', 'p-1']
+
+def test_index_catches_up_with_unindexed_ledger(tmp_path):
+    ledger = tmp_path / '.ai' / 'ledger.jsonl'
+    ledger.parent.mkdir()
+    ledger.write_text(''.join(make_trace(i).model_dump_json() + '\n' for i in range(5)), encoding='utf-8')
+
+    bank = ContextBank(str(tmp_path))
+    record_all(bank, [make_trace(5, allowed=False)])
+    page = asyncio.run(bank.query(limit=10))
+    assert [t.proposal.id for t in page.traces] == ['p-5', 'p-4', 'p-3', 'p-2', 'p-1', 'p-0']
+
+    # A fresh index instance (new process) loads the persisted index file
+    fresh = LedgerIndex(str(ledger))
+    assert fresh.count(outcome='rejected') == 1
+    assert len(list(fresh.iter_matches())) == 6
+
+def test_paused_query_does_not_block_writers(tmp_path):
+    bank = ContextBank(str(tmp_path))
+    record_all(bank, [make_trace(i, allowed=False) for i in range(3)])
+    matches = bank.index.iter_matches(outcome='rejected')
+    assert next(matches) == 2  # the consumer stops mid-scan
+
+    writer = threading.Thread(target=record_all, args=(bank, [make_trace(3, allowed=False)]), daemon=True)
+    writer.start()
+    writer.join(5)
+    assert not writer.is_alive()
+    assert list(matches) == [1, 0]  # positions snapshotted when the scan began
+    assert bank.index.count(outcome='rejected') == 4
+
+def test_record_runs_off_the_event_loop_and_banks_are_cached(tmp_path):
+    root = str(tmp_path)
+    bank = ContextBank.for_workspace(root)
+    assert ContextBank.for_workspace(root) is bank
+    threads = []
+    bank.baselines.observe = lambda trace: threads.append(threading.current_thread())
+    record_all(bank, [make_trace(0)])
+    assert threads and threads[0] is not threading.main_thread()
+
+def _append_from_process(root, shard, start, count):
+    bank = ContextBank(root, shard=shard)
+    big_diff = '+' + 'x' * 200_000  # far beyond PIPE_BUF, would tear without the lock
+    async def run():
+        for i in range(start, start + count):
+            trace = make_trace(i)
+            trace.proposal.diff = big_diff
+            await bank.record(trace)
+    asyncio.run(run())
+
+def test_concurrent_processes_do_not_tear_records(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    root = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_append_from_process, [root] * 4, [None] * 4, [0, 100, 200, 300], [10] * 4))
+
+    traces = asyncio.run(ContextBank(root).get_history())
+    assert len(traces) == 40
+    assert sorted(t.sequence for t in traces) == list(range(40))
+
+def test_shards_are_merged_for_reads(tmp_path):
+    root = str(tmp_path)
+    banks = [ContextBank(root, shard=f"w{n}") for n in range(3)]
+    async def run():
+        for i in range(12):
+            await banks[i % 3].record(make_trace(i, allowed=i % 2 == 0))
+    asyncio.run(run())
+
+    files = set(os.listdir(tmp_path / '.ai'))
+    assert {'ledger.w0.jsonl', 'ledger.w1.jsonl', 'ledger.w2.jsonl'} <= files and 'ledger.jsonl' not in files
+    reader = ContextBank(root)
+    history = asyncio.run(reader.get_history())
+    assert [t.proposal.id for t in history] == [f"p-{i}" for i in range(11, -1, -1)]
+
+    first = asyncio.run(reader.query(outcome='applied', limit=4))
+    assert [t.proposal.id for t in first.traces] == ['p-10', 'p-8', 'p-6', 'p-4']
+    # Records appended after the first page do not shift later pages
+    asyncio.run(banks[0].record(make_trace(100)))
+    rest = asyncio.run(reader.query(outcome='applied', cursor=first.nextCursor, limit=4))
+    assert [t.proposal.id for t in rest.traces] == ['p-2', 'p-0'] and rest.nextCursor is None
+    assert asyncio.run(reader.query(outcome='applied', count_only=True)).count == 7
+
+def test_torn_record_is_skipped(tmp_path):
+    bank = ContextBank(str(tmp_path))
+    record_all(bank, [make_trace(0)])
+    with open(bank.storage_path, 'ab') as f:
+        f.write(b'{"allowed": tr')  # writer died mid-append
+    LedgerIndex._instances.clear()
+
+    bank = ContextBank(str(tmp_path))
+    record_all(bank, [make_trace(1)])
+    assert [t.proposal.id for t in asyncio.run(bank.get_history())] == ['p-1', 'p-0']
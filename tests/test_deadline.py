@@ -0,0 +1,114 @@
+import time
+import asyncio
+import pytest
+from trusted_agent_engine import TrustedGuard
+from trusted_agent_engine.engine.context_bank import ContextBank
+from trusted_agent_engine.engine.deadline import Deadline, DeadlineExceeded
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+from trusted_agent_engine.engine.safe_evaluator import SafeEvaluator
+from trusted_agent_engine.engine import anomaly_detector
+from trusted_agent_engine.engine.replay import ReplayRunner, iter_ledger_records
+from test_evaluator import make_policy, make_proposal
+
+RULES = [
+    {"id": "first", "description": "First", "condition": True, "action": "warn"},
+    {"id": "second", "description": "Second", "condition": True, "action": "warn"}
+]
+
+def with_deadline(policy, **deadline):
+    policy.meta['deadline'] = deadline
+    return policy
+
+def slow(monkeypatch, target, name, seconds=0.02):
+    original = getattr(target, name)
+    def wrapper(*args, **kwargs):
+        time.sleep(seconds)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(target, name, wrapper)
+
+def test_deadline_checks_stage_and_total_budgets():
+    deadline = Deadline(total_ms=1000, stages={"scan": 5})
+    deadline.enter('scan')
+    time.sleep(0.01)
+    with pytest.raises(DeadlineExceeded) as e:
+        deadline.check()
+    assert e.value.stage == 'scan'
+    deadline.enter('rules')  # no budget of its own: only the total applies
+    assert 0 < deadline.remaining() <= 1.0
+    assert Deadline.from_config({}) is None
+    with pytest.raises(ValueError):
+        Deadline(stages={"parse": 10})
+
+def test_slow_rules_yield_require_human(monkeypatch, tmp_path):
+    engine = PolicyEngine(with_deadline(make_policy(RULES), stages={"rules": 5}), workspace_root=str(tmp_path))
+    slow(monkeypatch, SafeEvaluator, 'evaluate')
+    decision = engine.evaluate(make_proposal())
+    assert decision.timedOutStage == 'rules'
+    assert decision.allowed is False and decision.requiresHuman is True
+    assert decision.actions == ['require_human']
+    assert [v.ruleId for v in decision.violations] == ['deadline-exceeded']
+    assert decision.accountability is None  # nothing charged
+    assert engine.liability.get_credits() == 100
+
+    full = engine.evaluate(make_proposal(), use_deadline=False)
+    assert full.timedOutStage is None and [v.ruleId for v in full.violations] == ['first', 'second']
+
+def test_per_call_deadline_stops_the_scan(monkeypatch):
+    engine = PolicyEngine(make_policy([
+        {"id": "anomaly", "description": "Anomaly", "condition": {"var": "engine.isAnomaly"}, "action": "warn"}
+    ]))
+    engine.anomaly_detector.chunk_size = 1000
+    slow(monkeypatch, anomaly_detector.DiffScanner, 'feed', 0.005)
+    decision = engine.evaluate(make_proposal(diff="+x = 1\n" * 2000), deadline_ms=8)
+    assert decision.timedOutStage == 'scan'
+    assert 'deadline of 8ms' in decision.violations[0].description
+    assert engine.evaluate(make_proposal()).timedOutStage is None  # no deadline configured
+
+def test_full_evaluation_completes_in_background(monkeypatch, tmp_path):
+    root = str(tmp_path)
+    engine = PolicyEngine(
+        with_deadline(make_policy(RULES), stages={"rules": 5}, completeInBackground=True), workspace_root=root
+    )
+    slow(monkeypatch, SafeEvaluator, 'evaluate')
+    decision = asyncio.run(TrustedGuard.evaluate(root, make_proposal(), engine=engine))
+    assert decision.timedOutStage == 'rules'
+    assert TrustedGuard.wait_for_background(timeout=10)
+
+    bank = ContextBank(root)
+    provisional, complete = sorted(asyncio.run(bank.get_history(completions=True)), key=lambda t: t.sequence)
+    assert provisional.timedOutStage == 'rules' and provisional.outcome == 'rejected'
+    assert complete.backgroundCompletion is True and complete.outcome == 'pending'
+    assert complete.completesSequence == provisional.sequence
+    assert [v.ruleId for v in complete.violations] == ['first', 'second']
+    assert complete.accountability is not None
+
+    # One decision per proposal: counts keep the deadline decision, replay its completion
+    assert [t.sequence for t in asyncio.run(bank.get_history())] == [provisional.sequence]
+    page = asyncio.run(bank.query())
+    assert [t.sequence for t in page.traces] == [provisional.sequence]
+    assert asyncio.run(bank.query(outcome='pending', count_only=True)).count == 0
+    report = ReplayRunner(make_policy(RULES), workers=1).run(iter_ledger_records(root))
+    assert (report.total, report.unchanged) == (1, 1)
+
+def test_replay_ignores_candidate_deadlines(monkeypatch, tmp_path):
+    root = str(tmp_path)
+    asyncio.run(TrustedGuard.evaluate(root, make_proposal(), engine=PolicyEngine(make_policy(RULES), workspace_root=root)))
+    slow(monkeypatch, SafeEvaluator, 'evaluate')
+    report = ReplayRunner(with_deadline(make_policy(RULES), stages={"rules": 5}), workers=1).run(iter_ledger_records(root))
+    assert (report.total, report.unchanged, report.newlyBlocked) == (1, 1, 0)
+
+def test_short_client_deadlines_are_clamped_and_still_charged(monkeypatch, tmp_path):
+    root = str(tmp_path)
+    assert Deadline.from_config({}, 0.001).total_ms == 5
+    assert Deadline.from_config({"minMs": 50}, 10).total_ms == 50
+
+    rules = [{"id": "gate", "description": "Gate", "condition": True, "action": "block"}]
+    engine = PolicyEngine(with_deadline(make_policy(rules), minMs=1), workspace_root=root)
+    slow(monkeypatch, SafeEvaluator, 'evaluate')
+    proposal = make_proposal(files=("src/auth.py",))
+    decision = asyncio.run(TrustedGuard.evaluate(root, proposal, engine=engine, deadline_ms=1))
+    assert decision.timedOutStage == 'rules'
+    assert TrustedGuard.wait_for_background(timeout=10)
+    assert engine.liability.get_credits() == 90  # the high-risk block is charged anyway
+    # Not recorded without completeInBackground
+    assert len(asyncio.run(ContextBank(root).get_history(completions=True))) == 1
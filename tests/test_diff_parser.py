@@ -42,3 +42,17 @@ def test_multiple_files():
     assert result.additions == 2
     assert result.deletions == 1
     assert result.hunks == 2
+
+def test_count_file_lines():
+    from trusted_agent_engine.engine.diff_parser import count_file_lines
+    git_diff = ('diff --git a/A.ts b/A.ts\n--- a/A.ts\n+++ b/A.ts\n@@ -1 +1,2 @@\n+a\n+b\n-x\n'
+                'diff --git a/B.ts b/B.ts\ndeleted file mode 100644\n--- a/B.ts\n+++ /dev/null\n@@ -1 +0,0 @@\n-c\n')
+    plain_diff = '--- a/A.ts\n+++ b/A.ts\n@@ -1 +1,2 @@\n+a\n+b\n-x\n--- a/B.ts\n+++ /dev/null\n@@ -1 +0,0 @@\n-c'
+    expected = {'A.ts': [2, 1], 'B.ts': [0, 1]}
+    assert count_file_lines(git_diff) == expected
+    assert count_file_lines(plain_diff) == expected
+
+    # Removed SQL/Lua comments ('-- x') look like '--- ' file headers
+    sql = '--- a/q.sql\n+++ b/q.sql\n@@ -1,3 +1,2 @@\n--- note\n+++ kept\n--- old\n+select 1;\n'
+    assert count_file_lines(sql) == {'q.sql': [2, 2]}
+    assert count_file_lines('diff --git a/q.sql b/q.sql\n' + sql) == {'q.sql': [2, 2]}
@@ -0,0 +1,117 @@
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+from trusted_agent_engine.engine.evaluation_context import EvaluationContext
+from trusted_agent_engine.engine.rule_stats import RuleStats
+from trusted_agent_engine.engine.safe_evaluator import SafeEvaluator
+from trusted_agent_engine.engine.types import Decision, PolicyConfig, Proposal, ValueManifesto
+
+def make_policy(rules, privileges=('high-risk-decision',)):
+    return PolicyConfig.model_validate({
+        "meta": {"name": "test", "privileges": list(privileges)},
+        "scopes": [{"id": "source", "allow": ["src/*"]}],
+        "risks": [{"id": "auth", "level": "high", "match": ["src/auth*"]}],
+        "rules": rules
+    })
+
+def make_proposal(files=("src/app.py",), diff="+print('hi')"):
+    return Proposal(id="p-1", author="ai-agent", reasoning="Refactor the app entrypoint", files=list(files), diff=diff)
+
+def test_collect_vars():
+    expression = {"and": [{"var": "engine.isScoped"}, {">": [{"var": ["payload.files.length", 0]}, 0]}]}
+    assert SafeEvaluator.collect_vars(expression) == {"engine.isScoped", "payload.files.length"}
+    assert SafeEvaluator.collect_vars({"var": {"cat": ["engine.", "riskLevel"]}}) is None
+    assert SafeEvaluator.collect_vars({"var": ""}) is None
+    assert SafeEvaluator.collect_vars(True) == set()
+
+def test_scope_only_policy_skips_anomaly_scan():
+    engine = PolicyEngine(make_policy([
+        {"id": "scope", "description": "In scope", "check": {"var": "engine.isScoped"}, "action": "block"}
+    ]))
+    calls = []
+    detect = engine.anomaly_detector.detect
+    engine.anomaly_detector.detect = lambda p: calls.append(p) or detect(p)
+
+    decision = engine.evaluate(make_proposal())
+    assert calls == []
+    assert decision.anomalyReport is None
+    assert engine.dependencies == {"engine.isScoped"}
+
+def test_context_contains_only_referenced_signals():
+    engine = PolicyEngine(make_policy([
+        {"id": "anomaly", "description": "No anomalies", "condition": {"var": "anomaly.score"}, "action": "warn"},
+        {"id": "reason", "description": "Reasoning", "check": {"var": "payload.reasoning"}, "action": "warn"}
+    ]))
+    proposal = make_proposal()
+    signals = EvaluationContext(proposal, 'low', engine.anomaly_detector.detect, engine._is_within_scope)
+    context = signals.materialize(engine.dependencies)
+    assert context == {"anomaly": {"score": 0.0}, "payload": {"reasoning": proposal.reasoning}}
+    assert signals.materialize(None)["engine"]["isScoped"] is True
+
+def test_literal_rules_apply_actions():
+    engine = PolicyEngine(make_policy([
+        {"id": "always", "description": "Always blocks", "condition": True, "action": "block"},
+        {"id": "never", "description": "Never warns", "check": True, "action": "warn"}
+    ]))
+    decision = engine.evaluate(make_proposal(files=["src/auth.py"]))
+    assert decision.allowed is False
+    assert decision.riskLevel == 'high'
+    assert [v.ruleId for v in decision.violations] == ["always"]
+    assert '"proposalId": "p-1"' in decision.auditLog
+
+def test_fail_fast_stops_after_sealing_rule(tmp_path):
+    rules = [
+        {"id": "warn-first", "description": "Warns", "condition": True, "action": "warn"},
+        {"id": "blocker", "description": "Blocks", "condition": True, "action": "block"},
+        {"id": "blocker-2", "description": "Blocks too", "condition": True, "action": "block"},
+        {"id": "late", "description": "Needs a human", "condition": True, "action": "require_human"}
+    ]
+    full = PolicyEngine(make_policy(rules), workspace_root=str(tmp_path / 'full')).evaluate(make_proposal())
+    fast = PolicyEngine(make_policy(rules), workspace_root=str(tmp_path / 'fast'),
+                        evaluation_mode='fail-fast').evaluate(make_proposal())
+
+    assert full.allowed is fast.allowed is False
+    assert full.skippedRules is None
+    # A later require_human still runs after the first block: the outcome and
+    # who is accountable match full mode, only further block/warn rules are skipped
+    assert fast.requiresHuman is full.requiresHuman is True
+    assert fast.accountability.responsibleEntity == full.accountability.responsibleEntity == 'human-approver'
+    assert [v.ruleId for v in fast.violations] == ["blocker", "late"]
+    assert fast.skippedRules == ["blocker-2", "warn-first"]
+
+def test_fail_fast_respects_mercy_hooks():
+    manifesto = ValueManifesto.model_validate({
+        "values": [],
+        "mercy_hooks": [{"id": "always", "condition": True, "action": "downgrade_to_warn", "description": "Mercy"}]
+    })
+    rules = [{"id": "blocker", "description": "Blocks", "condition": True, "action": "block"}]
+    decision = PolicyEngine(make_policy(rules), manifesto, evaluation_mode='fail-fast').evaluate(make_proposal())
+    assert decision.allowed is True
+    assert decision.actions == ['warn']
+
+def test_rule_stats_order_cheap_selective_blockers_first():
+    stats = RuleStats()
+    policy = make_policy([
+        {"id": "slow", "description": "Slow", "condition": True, "action": "block"},
+        {"id": "warn", "description": "Warn", "condition": True, "action": "warn"},
+        {"id": "fast", "description": "Fast", "condition": True, "action": "block"}
+    ])
+    for _ in range(10):
+        stats.record("slow", 5000, True)
+        stats.record("fast", 100, True)
+        stats.record("warn", 10, True)
+    assert [r.id for r in stats.order(policy.rules)] == ["fast", "slow", "warn"]
+
+def test_decision_is_a_valid_public_model(tmp_path):
+    engine = PolicyEngine(make_policy([
+        {"id": "always", "description": "Always warns", "condition": True, "action": "warn", "valueId": "safety"},
+        {"id": "human", "description": "Needs review", "condition": True, "action": "require_human"}
+    ]), ValueManifesto.model_validate({
+        "values": [{"id": "safety", "weight": 1.0, "description": "Safety"}], "mercy_hooks": []
+    }), workspace_root=str(tmp_path))
+    record = engine.evaluate_record(make_proposal())
+    decision = engine.evaluate(make_proposal())
+    assert type(decision.violations[0]).__name__ == 'Violation'
+    assert decision.accountability.responsibleEntity == 'human-approver'
+    assert decision.model_dump() == Decision.model_validate(decision.model_dump()).model_dump()
+    assert [v.ruleId for v in record.violations] == ["always", "human"]
+    assert decision.violations[0].valueWeight == 1.0
+    assert decision.valueScore == record.valueScore == 0.8
@@ -0,0 +1,107 @@
+import os
+import asyncio
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api.server import app
+from trusted_agent_engine.engine.context_bank import ContextBank, ledger_path
+from trusted_agent_engine.engine.ledger_tail import LedgerTailer
+from test_context_bank import make_trace, record_all
+
+def test_subscribe_replays_from_a_sequence_then_follows_live_records(tmp_path):
+    bank = ContextBank(str(tmp_path))
+    record_all(bank, [make_trace(i) for i in range(3)])
+
+    async def run():
+        received, from_now = [], []
+
+        async def consume(since, into, count):
+            async for trace in bank.subscribe(since=since, max_queued=2):
+                into.append((trace.sequence, trace.proposal.id))
+                if len(into) == count:
+                    return
+
+        tasks = [asyncio.create_task(consume(1, received, 6)), asyncio.create_task(consume(None, from_now, 4))]
+        await asyncio.sleep(0.05)
+        # More records than the live queue holds: the lagging subscriber refills from the ledger
+        for i in range(3, 7):
+            await bank.record(make_trace(i))
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        return received, from_now
+
+    received, from_now = asyncio.run(run())
+    assert received == [(i, f"p-{i}") for i in range(1, 7)]
+    assert from_now == [(i, f"p-{i}") for i in range(3, 7)]
+
+def test_tailer_resumes_from_offsets_and_skips_partial_lines(tmp_path):
+    root = str(tmp_path)
+    bank = ContextBank(root)
+    record_all(bank, [make_trace(i) for i in range(2)])
+
+    tailer = LedgerTailer(root)
+    assert [e.trace().proposal.id for e in tailer.poll()] == ['p-0', 'p-1']
+    assert list(tailer.poll()) == []
+    cursor = tailer.cursor()
+
+    record_all(ContextBank(root, shard='w1'), [make_trace(2)])
+    with open(ledger_path(root), 'ab') as f:
+        f.write(b'{"partial": ')  # a record still being written
+    resumed = LedgerTailer.from_cursor(root, cursor)
+    assert [(e.shard, e.trace().proposal.id) for e in resumed.poll()] == [('w1', 'p-2')]
+    assert resumed.offsets[''] == tailer.offsets['']
+
+    assert list(LedgerTailer(root, from_end=True).poll()) == []
+
+def test_tailer_buffers_a_record_written_in_two_parts(tmp_path):
+    root = str(tmp_path)
+    record_all(ContextBank(root), [make_trace(0)])
+    tailer = LedgerTailer(root, from_end=True)
+    line = make_trace(1).model_dump_json().encode() + b'\n'
+
+    with open(ledger_path(root), 'ab') as f:
+        f.write(line[:40])
+    assert list(tailer.poll()) == []
+    assert list(tailer.poll()) == []
+    with open(ledger_path(root), 'ab') as f:
+        f.write(line[40:])
+    events = list(tailer.poll())
+    assert [e.trace().proposal.id for e in events] == ['p-1']
+    assert tailer.offsets[''] == os.path.getsize(ledger_path(root))
+    assert events[0].offset + len(line) == tailer.offsets['']
+
+def test_tailer_skips_a_torn_record(tmp_path):
+    root = str(tmp_path)
+    bank = ContextBank(root)
+    record_all(bank, [make_trace(0)])
+    tailer = LedgerTailer(root, from_end=True)
+
+    with open(ledger_path(root), 'ab') as f:
+        f.write(make_trace(1).model_dump_json().encode()[:40])  # the writer died here
+    record_all(bank, [make_trace(2)])  # terminates the torn record with its own newline
+    assert [e.trace().proposal.id for e in tailer.poll()] == ['p-2']
+    assert tailer.offsets[''] == os.path.getsize(ledger_path(root))
+
+def test_events_endpoint_streams_and_resumes_after_last_event_id(tmp_path):
+    root = str(tmp_path)
+    record_all(ContextBank(root), [make_trace(i) for i in range(3)])
+    client = TestClient(app)
+
+    def read(**kwargs):
+        events = []
+        with client.stream('GET', '/v1/events', **kwargs) as response:
+            assert response.headers['content-type'].startswith('text/event-stream')
+            event = {}
+            for line in response.iter_lines():
+                if not line:
+                    events.append(event)
+                    event = {}
+                else:
+                    field, _, value = line.partition(': ')
+                    event[field] = value
+        return events
+
+    first = read(params={"workspaceRoot": root, "since": "0", "limit": 2})
+    assert [e['event'] for e in first] == ['decision', 'decision']
+    assert '"p-1"' in first[1]['data']
+    rest = read(params={"workspaceRoot": root, "limit": 1}, headers={"Last-Event-ID": first[1]['id']})
+    assert '"p-2"' in rest[0]['data']
+
+    assert client.get('/v1/events', params={"workspaceRoot": root, "since": "x:y"}).status_code == 400
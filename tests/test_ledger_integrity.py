@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+from trusted_agent_engine.engine.context_bank import ContextBank, ledger_path
+from trusted_agent_engine.engine.ledger_integrity import verify_ledger, verify_inclusion
+from trusted_agent_engine.engine.merkle import GENESIS_HASH
+from trusted_agent_engine.engine.sovereign import SovereignManager
+from test_context_bank import make_trace, record_all
+
+def make_ledger(root, monkeypatch, count=10, interval=4):
+    private_key, public_key = SovereignManager.generate_key_pair()
+    os.makedirs(os.path.join(root, '.ai'), exist_ok=True)
+    with open(os.path.join(root, '.ai', 'sovereign.key'), 'w', encoding='utf-8') as f:
+        f.write(private_key)
+    monkeypatch.setattr(ContextBank, 'CHECKPOINT_INTERVAL', interval)
+    bank = ContextBank(root)
+    record_all(bank, [make_trace(i) for i in range(count)])
+    return bank, public_key
+
+def read_records(root):
+    with open(ledger_path(root), 'rb') as f:
+        return f.read().splitlines()
+
+def write_records(root, records):
+    with open(ledger_path(root), 'wb') as f:
+        f.write(b''.join(r + b'\n' for r in records))
+
+def test_records_are_chained_and_checkpointed(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    bank, public_key = make_ledger(root, monkeypatch)
+    records = read_records(root)
+    assert json.loads(records[0])['prevHash'] == GENESIS_HASH
+    for previous, record in zip(records, records[1:]):
+        assert json.loads(record)['prevHash'] == hashlib.sha256(previous).hexdigest()
+
+    assert [c.size for c in bank.index.checkpoints()] == [4, 8]
+    # Split into several segments verified by two worker processes
+    report = verify_ledger(root, public_key=public_key, workers=2, segment_bytes=300)
+    shard = report.shards[0]
+    assert report.ok, shard.error
+    assert (shard.records, shard.checkpoints, shard.signedCheckpoints) == (10, 2, 2)
+    # Without the public key the signatures cannot be checked, so none counts as signed
+    unchecked = verify_ledger(root).shards[0]
+    assert unchecked.ok and (unchecked.signedCheckpoints, unchecked.unverifiedCheckpoints) == (0, 2)
+
+def test_first_corrupted_position_is_reported(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _, public_key = make_ledger(root, monkeypatch)
+    records = read_records(root)
+    records[6] = records[6].replace(b'"outcome":"applied"', b'"outcome":"rejected"')
+    write_records(root, records)
+
+    for workers, segment_bytes in ((1, 1 << 20), (2, 300)):
+        shard = verify_ledger(root, public_key=public_key, workers=workers, segment_bytes=segment_bytes).shards[0]
+        assert not shard.ok
+        assert shard.firstCorruptPosition == 6
+        assert shard.firstCorruptOffset == sum(len(r) + 1 for r in records[:6])
+
+def test_rewritten_chain_is_caught_by_checkpoints(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _, public_key = make_ledger(root, monkeypatch)
+    records = [json.loads(r) for r in read_records(root)]
+    # Tamper with record 5 and re-chain everything after it
+    records[5]['outcome'] = 'rejected'
+    rewritten = []
+    previous = GENESIS_HASH
+    for record in records:
+        record['prevHash'] = previous
+        raw = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        previous = hashlib.sha256(raw).hexdigest()
+        rewritten.append(raw)
+    write_records(root, rewritten)
+
+    shard = verify_ledger(root, public_key=public_key).shards[0]
+    assert not shard.ok
+    # Records 0-3 still match checkpoint 4, so the damage is located within 4..7
+    assert shard.firstCorruptPosition == 4 and 'checkpoint 8' in shard.error
+
+    write_records(root, read_records(root)[:6])
+    assert 'truncated' in verify_ledger(root).shards[0].error
+
+def test_inclusion_proofs(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    bank, public_key = make_ledger(root, monkeypatch, count=21, interval=16)
+    proof = bank.prove(11)
+    assert proof.treeSize == 16 and proof.signature
+    assert len(proof.path) == 4
+    assert verify_inclusion(proof, public_key)
+
+    latest = bank.prove(20)  # not checkpointed yet: current, unsigned tree
+    assert latest.treeSize == 21 and latest.signature is None
+    assert verify_inclusion(latest) and not verify_inclusion(latest, public_key)
+
+    assert not verify_inclusion(proof.model_copy(update={'position': 12}), public_key)
+    forged = proof.model_copy(update={'entryHash': hashlib.sha256(b'forged').hexdigest()})
+    assert not verify_inclusion(forged, public_key)
+    _, other_key = SovereignManager.generate_key_pair()
+    assert not verify_inclusion(proof, other_key)
+
+def test_legacy_records_are_followed_by_the_chain(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, '.ai'))
+    write_records(root, [make_trace(i).model_dump_json(exclude={'prevHash'}).encode('utf-8') for i in range(3)])
+    record_all(ContextBank(root), [make_trace(i) for i in range(3, 5)])
+
+    shard = verify_ledger(root).shards[0]
+    assert shard.ok, shard.error
+    assert (shard.records, shard.legacyRecords) == (5, 3)
@@ -0,0 +1,68 @@
+import asyncio
+import tracemalloc
+from trusted_agent_engine.engine.context_bank import ContextBank
+from trusted_agent_engine.engine.diff_parser import parse_unified_diff
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+from trusted_agent_engine.engine.types import PolicyConfig, Proposal, DecisionTrace
+
+DIFF_SIZE = 2 * 1024 * 1024
+
+def make_diff():
+    header = 'diff --git a/src/big.py b/src/big.py\n--- a/src/big.py\n+++ b/src/big.py\n@@ -1 +1 @@\n'
+    line = '+x = 1\n'
+    return header + line * ((DIFF_SIZE - len(header)) // len(line))
+
+def make_engine(root):
+    policy = PolicyConfig.model_validate({
+        "meta": {"name": "memory"},
+        "scopes": [{"id": "source", "allow": ["src/**"]}],
+        "risks": [],
+        "rules": [
+            {"id": "has-diff", "description": "Diff required", "check": {"var": "payload.diff"}, "action": "warn"},
+            {"id": "anomaly", "description": "Anomalies", "condition": {"var": "engine.isAnomaly"}, "action": "warn"}
+        ]
+    })
+    return PolicyEngine(policy, workspace_root=root)
+
+def peak_during(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        return peak - baseline
+    finally:
+        tracemalloc.stop()
+
+def test_evaluation_does_not_copy_diff(tmp_path):
+    diff = make_diff()
+    proposal = Proposal(id='big', author='ai-agent', reasoning='Large generated change', files=['src/big.py'], diff=diff)
+    engine = make_engine(str(tmp_path))
+
+    decision_holder = []
+    peak = peak_during(lambda: decision_holder.append(engine.evaluate(proposal)))
+    assert decision_holder[0].anomalyReport.isAnomaly is False
+    # Only small bookkeeping: the diff is scanned in place, never copied or split
+    assert peak < 0.1 * len(diff)
+
+def test_trace_and_ledger_write_stay_within_json_size(tmp_path):
+    diff = make_diff()
+    proposal = Proposal(id='big', author='ai-agent', reasoning='Large generated change', files=['src/big.py'], diff=diff)
+    decision = make_engine(str(tmp_path)).evaluate(proposal)
+    bank = ContextBank(str(tmp_path))
+
+    def record():
+        trace = DecisionTrace.from_decision(decision, proposal, outcome='applied')
+        assert trace.proposal is proposal
+        asyncio.run(bank.record(trace))
+
+    # The serialized JSON line itself (~1.15x the diff, newlines are escaped) is the only large buffer
+    assert peak_during(record) < 1.5 * len(diff)
+
+def test_diff_parsing_does_not_split_into_lines():
+    diff = make_diff()
+    holder = []
+    peak = peak_during(lambda: holder.append(parse_unified_diff(diff)))
+    assert holder[0].additions > 250000
+    assert peak < 0.1 * len(diff)
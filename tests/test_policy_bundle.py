@@ -0,0 +1,141 @@
+import os
+import fnmatch
+import pytest
+from trusted_agent_engine import TrustedGuard
+from trusted_agent_engine.engine.policy_bundle import BUNDLE_FILE, CompiledPolicy, compile_bundle
+from trusted_agent_engine.engine.policy_loader import load_workspace, load_compiled_workspace
+from trusted_agent_engine.engine.policy_watcher import PolicyWatcher
+from trusted_agent_engine.engine.sovereign import SovereignManager
+from trusted_agent_engine.engine.types import PolicyConfig, Proposal
+
+POLICY = """
+meta:
+  name: "{name}"
+  privileges: ["high-risk-decision"]
+scopes:
+  - id: "source"
+    allow: ["src/**", "docs/*.md"]
+risks:
+  - id: "auth"
+    level: "high"
+    match: ["src/auth/**"]
+  - id: "docs"
+    level: "low"
+    match: ["docs/**"]
+rules:
+  - id: "scope-enforcement"
+    description: "Reject changes outside allowed scopes"
+    check: {{"var": "engine.isScoped"}}
+    action: "block"
+    valueId: "safety"
+"""
+
+MANIFESTO = """
+values:
+  - id: "safety"
+    weight: 0.5
+    description: "Stay in scope"
+mercy_hooks: []
+"""
+
+def make_workspace(root, name="v1", manifesto=True):
+    private_key, public_key = SovereignManager.generate_key_pair()
+    os.makedirs(os.path.join(root, '.ai'), exist_ok=True)
+    with open(os.path.join(root, '.ai', 'sovereign.pub'), 'w', encoding='utf-8') as f:
+        f.write(public_key)
+    write_sources(root, private_key, name, manifesto)
+    return private_key
+
+def write_sources(root, private_key, name, manifesto=True):
+    content = POLICY.format(name=name)
+    with open(os.path.join(root, 'agent.policy.yaml'), 'w', encoding='utf-8') as f:
+        f.write(content)
+    with open(os.path.join(root, 'agent.policy.yaml.sig'), 'w', encoding='utf-8') as f:
+        f.write(SovereignManager.sign_policy(content, private_key))
+    if manifesto:
+        with open(os.path.join(root, 'value_manifesto.yaml'), 'w', encoding='utf-8') as f:
+            f.write(MANIFESTO)
+
+def write_bundle(root, private_key, name="v1", manifesto=True):
+    data = compile_bundle(POLICY.format(name=name), MANIFESTO if manifesto else None, private_key)
+    with open(os.path.join(root, BUNDLE_FILE), 'wb') as f:
+        f.write(data)
+    return data
+
+def proposal(files):
+    return Proposal(id="p1", author="ai-agent", reasoning="r", files=files, diff="")
+
+def test_bundle_decisions_match_yaml(tmp_path):
+    root = str(tmp_path)
+    private_key = make_workspace(root)
+    yaml_engine = TrustedGuard.load_engine(root)
+    write_bundle(root, private_key)
+    bundle_engine = TrustedGuard.load_engine(root)
+
+    assert load_compiled_workspace(root)[2] is not None
+    for files in (["src/app.py"], ["src/auth/login.py"], ["docs/guide.md"], ["docs/deep/x.md"], ["infra/main.tf"]):
+        expected = yaml_engine.evaluate(proposal(files))
+        actual = bundle_engine.evaluate(proposal(files))
+        assert (actual.allowed, actual.riskLevel, actual.valueScore) == (expected.allowed, expected.riskLevel, expected.valueScore)
+        assert [v.model_dump() for v in actual.violations] == [v.model_dump() for v in expected.violations]
+
+def test_bundle_is_used_without_yaml_sources(tmp_path):
+    root = str(tmp_path)
+    private_key = make_workspace(root)
+    write_bundle(root, private_key)
+    for name in ('agent.policy.yaml', 'agent.policy.yaml.sig', 'value_manifesto.yaml'):
+        os.remove(os.path.join(root, name))
+
+    config, manifesto = load_workspace(root)
+    assert config.meta['name'] == 'v1'
+    assert manifesto.values[0].id == 'safety'
+
+def test_tampered_bundle_is_rejected(tmp_path):
+    root = str(tmp_path)
+    private_key = make_workspace(root)
+    data = write_bundle(root, private_key)
+    with open(os.path.join(root, BUNDLE_FILE), 'wb') as f:
+        f.write(data.replace(b'"src/**"', b'"**/**"'))
+
+    with pytest.raises(ValueError, match="verification failed"):
+        load_workspace(root)
+    # Signed with someone else's key
+    other_key, _ = SovereignManager.generate_key_pair()
+    write_bundle(root, other_key)
+    with pytest.raises(ValueError, match="verification failed"):
+        load_workspace(root)
+
+def test_stale_bundle_falls_back_to_yaml(tmp_path):
+    root = str(tmp_path)
+    private_key = make_workspace(root)
+    write_bundle(root, private_key, name="v1")
+    write_sources(root, private_key, name="v2")
+
+    config, _ = load_workspace(root)
+    assert config.meta['name'] == 'v2'
+    assert load_compiled_workspace(root)[2] is None
+
+def test_watcher_reloads_on_new_bundle(tmp_path):
+    root = str(tmp_path)
+    private_key = make_workspace(root, manifesto=False)
+    watcher = PolicyWatcher(root)
+    write_sources(root, private_key, name="v2", manifesto=False)
+    write_bundle(root, private_key, name="v2", manifesto=False)
+    assert watcher.reload(force=True) is True
+    assert watcher.engine.policy.meta['name'] == 'v2'
+    assert load_compiled_workspace(root)[2] is not None
+
+def test_compile_rejects_string_conditions():
+    private_key, _ = SovereignManager.generate_key_pair()
+    policy = POLICY.format(name="x") + '  - id: "legacy"\n    description: "d"\n    condition: "1 == 1"\n    action: "warn"\n'
+    with pytest.raises(ValueError, match="String-based"):
+        compile_bundle(policy, None, private_key)
+
+def test_compiled_globs_match_fnmatch():
+    patterns = ["src/**", "*.md", "docs/?/x.py", "lib/[ab]*.py"]
+    policy = PolicyConfig(meta={}, scopes=[{"id": "s", "allow": patterns}], risks=[], rules=[])
+    compiled = CompiledPolicy.from_policy(policy)
+    for path in ["src/a.py", "README.md", "docs/a/x.py", "docs/ab/x.py", "lib/a1.py", "lib/c.py", "x/src/a.py"]:
+        expected = any(fnmatch.fnmatch(path, p) for p in patterns)
+        assert compiled.is_within_scope([path]) is expected, path
+    assert CompiledPolicy.from_policy(PolicyConfig(meta={}, scopes=[], risks=[], rules=[])).is_within_scope(["a"]) is False
@@ -0,0 +1,94 @@
+import os
+import time
+from trusted_agent_engine.engine.policy_watcher import PolicyWatcher, PolicyRegistry
+from trusted_agent_engine.engine.sovereign import SovereignManager
+
+POLICY = """
+meta:
+  name: "{name}"
+scopes:
+  - id: "source"
+    allow: ["src/**"]
+risks: []
+rules:
+  - id: "always-warn"
+    description: "Always warn"
+    condition: true
+    action: "warn"
+"""
+
+def make_workspace(root, name="v1"):
+    private_key, public_key = SovereignManager.generate_key_pair()
+    os.makedirs(os.path.join(root, '.ai'), exist_ok=True)
+    with open(os.path.join(root, '.ai', 'sovereign.pub'), 'w', encoding='utf-8') as f:
+        f.write(public_key)
+    write_policy(root, private_key, name)
+    return private_key
+
+def write_policy(root, private_key, name, signature=None):
+    content = POLICY.format(name=name)
+    with open(os.path.join(root, 'agent.policy.yaml'), 'w', encoding='utf-8') as f:
+        f.write(content)
+    with open(os.path.join(root, 'agent.policy.yaml.sig'), 'w', encoding='utf-8') as f:
+        f.write(signature or SovereignManager.sign_policy(content, private_key))
+
+def test_reload_swaps_in_newly_signed_policy(tmp_path):
+    private_key = make_workspace(str(tmp_path))
+    watcher = PolicyWatcher(str(tmp_path))
+    assert watcher.engine.policy.meta['name'] == 'v1'
+    assert watcher.reload() is False
+
+    write_policy(str(tmp_path), private_key, 'v2')
+    assert watcher.reload(force=True) is True
+    assert watcher.engine.policy.meta['name'] == 'v2'
+    assert watcher.last_error is None
+
+def test_bad_signature_keeps_last_good_policy(tmp_path):
+    private_key = make_workspace(str(tmp_path))
+    rejected = []
+    watcher = PolicyWatcher(str(tmp_path), on_reject=lambda root, e: rejected.append(root))
+    old_engine = watcher.engine
+
+    write_policy(str(tmp_path), private_key, 'tampered', signature='bm90LWEtc2lnbmF0dXJl')
+    assert watcher.reload(force=True) is False
+    assert watcher.engine is old_engine
+    assert 'verification failed' in watcher.last_error
+    assert rejected == [str(tmp_path)]
+
+def test_registry_picks_up_changes_in_background(tmp_path):
+    private_key = make_workspace(str(tmp_path))
+    registry = PolicyRegistry(poll_interval=0.05)
+    try:
+        assert registry.get(str(tmp_path)).policy.meta['name'] == 'v1'
+        write_policy(str(tmp_path), private_key, 'v2-with-longer-name')
+
+        deadline = time.time() + 5
+        while time.time() < deadline and registry.get(str(tmp_path)).policy.meta['name'] != 'v2-with-longer-name':
+            time.sleep(0.05)
+        assert registry.get(str(tmp_path)).policy.meta['name'] == 'v2-with-longer-name'
+    finally:
+        registry.close()
+
+def test_registry_caps_client_named_workspaces(tmp_path):
+    roots = [str(tmp_path / f"ws{i}") for i in range(4)]
+    for root in roots:
+        make_workspace(root)
+    registry = PolicyRegistry(poll_interval=0.05, max_watchers=2)
+    try:
+        registry.preload([roots[0]])
+        registry.get(roots[1])
+        registry.get(roots[2])
+        registry.get(roots[1])  # now more recently used than ws2
+        evicted = registry.watchers()[roots[2]]
+        registry.get(roots[3])
+
+        assert set(registry.watchers()) == {roots[0], roots[1], roots[3]}
+        deadline = time.time() + 5
+        while time.time() < deadline and evicted._thread.is_alive():
+            time.sleep(0.05)
+        assert not evicted._thread.is_alive()
+        # An evicted workspace is loaded again on its next request
+        assert registry.get(roots[2]).policy.meta['name'] == 'v1'
+        assert roots[0] in registry.watchers()
+    finally:
+        registry.close()
@@ -0,0 +1,68 @@
+import os
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api.server import app
+from trusted_agent_engine.api import server
+from trusted_agent_engine.engine.profiler import ProfileCapture, list_profiles, aggregate_profiles
+
+POLICY = """
+meta:
+  name: "profile-test"
+scopes:
+  - id: "source"
+    allow: ["src/**"]
+risks: []
+rules:
+  - id: "always"
+    description: "Literal rule"
+    condition: true
+    action: "warn"
+"""
+
+def test_capture_and_aggregate(tmp_path):
+    root = str(tmp_path)
+    for i in range(2):
+        profile = ProfileCapture(root, f"agent/proposal {i}")
+        with profile:
+            sorted(range(1000), key=lambda x: -x)
+        profile.save()
+
+    paths = list_profiles(root)
+    assert len(paths) == 2
+    assert all(os.path.basename(p).startswith("agent_proposal_") for p in paths)
+
+    hot = aggregate_profiles(paths, sort='calls', limit=5)
+    assert hot[0].calls >= 2000  # the sort key lambda, from both profiles
+    assert hot[0].profiles == 2
+
+def test_profile_header_writes_profile(tmp_path, monkeypatch):
+    (tmp_path / 'agent.policy.yaml').write_text(POLICY, encoding='utf-8')
+    root = str(tmp_path)
+    body = {"workspaceRoot": root, "proposal": {
+        "id": "p-1", "author": "human", "reasoning": "r", "files": ["src/a.py"], "diff": ""
+    }}
+    client = TestClient(app)
+
+    assert 'x-trusted-profile' not in client.post('/v1/evaluate', json=body).headers
+    # Clients cannot make the server write files unless the operator allows it
+    unset = client.post('/v1/evaluate', json=body, headers={'X-Trusted-Profile': '1'})
+    assert 'x-trusted-profile' not in unset.headers and list_profiles(root) == []
+
+    monkeypatch.setattr(server, 'PROFILE_HEADER_ENABLED', True)
+    response = client.post('/v1/evaluate', json=body, headers={'X-Trusted-Profile': '1'})
+    assert response.status_code == 200
+    path = response.headers['x-trusted-profile']
+    assert path.startswith(os.path.join('.ai', 'profiles', 'p-1-'))
+    assert os.path.exists(os.path.join(root, path))
+    functions = [h.function for h in aggregate_profiles(list_profiles(root), sort='cumtime', limit=50)]
+    assert any(f.startswith('evaluate (evaluator.py') for f in functions)
+
+def test_saving_prunes_the_oldest_profiles(tmp_path):
+    root = str(tmp_path)
+    saved = []
+    for i in range(5):
+        profile = ProfileCapture(root, f"p-{i}", max_retained=3)
+        with profile:
+            sum(range(10))
+        saved.append(profile.save())
+        os.utime(saved[-1], (1000 + i, 1000 + i))
+    assert list_profiles(root) == sorted(saved[2:])
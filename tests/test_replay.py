@@ -0,0 +1,64 @@
+import subprocess
+import pytest
+from trusted_agent_engine.engine.replay import ReplayRunner, iter_ledger_records, iter_git_records
+from trusted_agent_engine.engine.types import PolicyConfig, Proposal, DecisionTrace
+
+def make_policy(action="block"):
+    return PolicyConfig.model_validate({
+        "meta": {"name": "candidate", "privileges": ["high-risk-decision"]},
+        "scopes": [{"id": "source", "allow": ["src/**"]}],
+        "risks": [],
+        "rules": [{"id": "freeze", "description": "Code freeze", "condition": True, "action": action}]
+    })
+
+def write_ledger(root, allowed_flags):
+    ledger = root / '.ai' / 'ledger.jsonl'
+    ledger.parent.mkdir(parents=True)
+    with open(ledger, 'w', encoding='utf-8') as f:
+        for i, allowed in enumerate(allowed_flags):
+            trace = DecisionTrace(
+                allowed=allowed, requiresHuman=False, riskLevel='low', actions=[], violations=[],
+                auditLog='', outcome='applied' if allowed else 'rejected',
+                proposal=Proposal(id=f"p-{i}", author='ai-agent', reasoning='r', files=['src/a.py'], diff='+x')
+            )
+            f.write(trace.model_dump_json() + '\n')
+
+def test_replay_ledger_reports_decision_changes(tmp_path):
+    write_ledger(tmp_path, [True, True, False])
+    for workers in (1, 2):
+        report = ReplayRunner(make_policy(), workers=workers, batch_size=2).run(iter_ledger_records(str(tmp_path)))
+        assert report.total == 3
+        assert report.newlyBlocked == 2
+        assert report.unchanged == 1
+        assert report.perRule['freeze'].added == 3
+        assert sorted(c['id'] for c in report.changedProposals) == ['p-0', 'p-1']
+
+    # Replay never writes to the ledger or the credits file
+    assert len((tmp_path / '.ai' / 'ledger.jsonl').read_text(encoding='utf-8').splitlines()) == 3
+    assert not (tmp_path / '.ai' / 'credits.json').exists()
+
+def test_replay_git_range(tmp_path):
+    def git(*args):
+        subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True)
+    git('init', '-q')
+    git('config', 'user.email', 't@example.com')
+    git('config', 'user.name', 'T')
+    for i in range(3):
+        (tmp_path / 'src').mkdir(exist_ok=True)
+        (tmp_path / 'src' / f'f{i}.py').write_text(f'x = {i}\n')
+        git('add', '.')
+        git('commit', '-q', '-m', f'commit {i}\n\nbody line')
+
+    records = list(iter_git_records('HEAD~2..HEAD', cwd=str(tmp_path)))
+    assert len(records) == 2
+    report = ReplayRunner(make_policy("warn"), workers=1).run(records)
+    assert report.total == 2 and report.unchanged == 2
+    assert report.perRule['freeze'].added == 2
+
+    # A consumer stopping early is not a git failure
+    stream = iter_git_records('HEAD', cwd=str(tmp_path))
+    next(stream)
+    stream.close()
+
+    with pytest.raises(RuntimeError, match='no-such-rev'):
+        list(iter_git_records('no-such-rev', cwd=str(tmp_path)))
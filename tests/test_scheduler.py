@@ -0,0 +1,117 @@
+import time
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api import server
+from trusted_agent_engine.api.scheduler import FairScheduler, RateLimited
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_limits_and_refills():
+    clock = FakeClock()
+    scheduler = FairScheduler(rate=1.0, burst=2.0, clock=clock)
+
+    async def run():
+        for _ in range(2):
+            async with scheduler.slot("agent"):
+                pass
+        with pytest.raises(RateLimited) as raised:
+            await scheduler.acquire("agent")
+        assert raised.value.retry_after == pytest.approx(1.0)
+        clock.now += 1.0
+        async with scheduler.slot("agent"):
+            pass
+    asyncio.run(run())
+    assert scheduler.metrics().agents["agent"].rateLimited == 1
+
+def test_agent_state_is_bounded_by_lru_eviction():
+    scheduler = FairScheduler(capacity=2, max_agents=3)
+
+    async def run():
+        async with scheduler.slot("busy"):
+            for i in range(50):  # a client rotating its agent id
+                async with scheduler.slot(f"rotated-{i}", weight_for=lambda: 1.0):
+                    pass
+            assert "busy" in scheduler.agents  # never evicted while running
+    asyncio.run(run())
+    assert len(scheduler.agents) <= 3 and len(scheduler._weights) <= 3
+    assert list(scheduler.agents)[-1] == "rotated-49"
+
+def serve_order(scheduler, requests):
+    order = []
+
+    async def one(agent, weight):
+        async with scheduler.slot(agent, weight_for=(lambda: weight) if weight else None):
+            order.append(agent)
+            await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(*(one(agent, weight) for agent, weight in requests))
+    asyncio.run(run())
+    return order
+
+def test_flooding_agent_does_not_starve_others():
+    # The spammer's ten requests arrive first, but the other agent runs second
+    order = serve_order(FairScheduler(), [("spammer", None)] * 10 + [("polite", None)])
+    assert order.index("polite") <= 1
+
+def test_low_weight_agent_gets_smaller_share():
+    order = serve_order(FairScheduler(), [("low", 0.25)] * 8 + [("normal", 1.0)] * 8)
+    assert order[:5].count("normal") >= 4
+
+def test_api_rate_limits_per_agent_and_reports_metrics(tmp_path, monkeypatch):
+    (tmp_path / 'agent.policy.yaml').write_text(
+        'meta:\n  name: "t"\nscopes:\n  - id: "s"\n    allow: ["src/**"]\nrisks: []\nrules: []\n', encoding='utf-8'
+    )
+    monkeypatch.setattr(server.scheduler, 'rate', 0.01)
+    monkeypatch.setattr(server.scheduler, 'burst', 1.0)
+    client = TestClient(server.app)
+    body = {"workspaceRoot": str(tmp_path), "proposal": {
+        "id": "p", "author": "ai-agent", "reasoning": "r", "files": ["src/a.py"], "diff": ""
+    }}
+
+    assert client.post('/v1/evaluate', json=body, headers={'X-Agent-Id': 'bot-a'}).status_code == 200
+    limited = client.post('/v1/evaluate', json=body, headers={'X-Agent-Id': 'bot-a'})
+    assert limited.status_code == 429
+    assert int(limited.headers['retry-after']) >= 1
+    # Other agents have their own bucket
+    assert client.post('/v1/evaluate', json=body, headers={'X-Agent-Id': 'bot-b'}).status_code == 200
+
+    metrics = client.get('/v1/metrics').json()
+    assert metrics['agents']['bot-a']['rateLimited'] == 1
+    assert metrics['agents']['bot-a']['weight'] == pytest.approx(1.0)  # 100 credits
+    assert metrics['inFlight'] == 0 and metrics['queued'] == 0
+
+def test_cheap_agent_overtakes_queued_heavy_agent(tmp_path, monkeypatch):
+    (tmp_path / 'agent.policy.yaml').write_text(
+        'meta:\n  name: "t"\nscopes:\n  - id: "s"\n    allow: ["src/**"]\nrisks: []\nrules: []\n', encoding='utf-8'
+    )
+    evaluate = PolicyEngine.evaluate
+    def slow(self, *args, **kwargs):
+        time.sleep(0.2)  # evaluation runs off the event loop, which keeps admitting requests
+        return evaluate(self, *args, **kwargs)
+    monkeypatch.setattr(PolicyEngine, 'evaluate', slow)
+    monkeypatch.setattr(server, 'scheduler', FairScheduler(capacity=1))
+    finished = []
+
+    async def one(client, agent, diff, delay=0.0):
+        await asyncio.sleep(delay)
+        body = {"workspaceRoot": str(tmp_path), "proposal": {
+            "id": agent, "author": "ai-agent", "reasoning": "r", "files": ["src/a.py"], "diff": diff
+        }}
+        response = await client.post('/v1/evaluate', json=body, headers={'X-Agent-Id': agent})
+        assert response.status_code == 200
+        finished.append(agent)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://testserver") as client:
+            heavy = '+' + 'x' * (1 << 20)
+            await asyncio.gather(*(one(client, 'heavy', heavy) for _ in range(3)), one(client, 'cheap', '+x', delay=0.05))
+    asyncio.run(run())
+    assert finished == ['heavy', 'cheap', 'heavy', 'heavy']
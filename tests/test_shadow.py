@@ -0,0 +1,104 @@
+import json
+import threading
+from fastapi.testclient import TestClient
+from trusted_agent_engine.api import server
+from trusted_agent_engine.engine.context_bank import ledger_path
+from trusted_agent_engine.engine.evaluator import PolicyEngine
+from trusted_agent_engine.engine.shadow import (
+    ShadowEvaluator, ShadowPolicy, load_shadow_policies, iter_shadow_ledger, shadow_evaluator, summarize_shadow_ledger,
+    anomaly_config, evaluate_shadows, _ShadowJob
+)
+from trusted_agent_engine.engine.types import AnomalyReport
+from trusted_agent_engine.engine.anomaly_detector import AnomalyDetector
+from test_evaluator import make_policy, make_proposal
+
+PRIMARY = 'meta:\n  name: "primary"\nscopes:\n  - id: "s"\n    allow: ["src/**"]\nrisks: []\nrules: []\n'
+STRICT = ('meta:\n  name: "strict"\n  privileges: ["high-risk-decision"]\nscopes: []\nrisks: []\nrules:\n'
+          '  - id: "freeze"\n    description: "Code freeze"\n    condition: true\n    action: "block"\n')
+
+def test_disagreements_are_counted_and_recorded_without_credits(tmp_path):
+    root = str(tmp_path)
+    (tmp_path / 'agent.shadow.strict.yaml').write_text(STRICT, encoding='utf-8')
+    (tmp_path / 'agent.shadow.broken.yaml').write_text('rules: [', encoding='utf-8')
+    shadows = load_shadow_policies(root)
+    assert [s.name for s in shadows] == ['strict']  # the broken candidate is skipped
+    primary = PolicyEngine(make_policy([]), workspace_root=root)
+
+    evaluator = ShadowEvaluator()
+    for i in range(3):
+        proposal = make_proposal()
+        proposal.id = f"p-{i}"
+        decision = primary.evaluate(proposal)
+        assert evaluator.submit(root, shadows, proposal, decision)
+    evaluator.join()
+    # Never forked from the threaded server process
+    assert evaluator._pool._mp_context.get_start_method() != 'fork'
+
+    [stats] = evaluator.metrics().policies
+    assert (stats.policy, stats.evaluated, stats.agreed) == ('strict', 3, 0)
+    assert stats.outcomes == {'allow -> block': 3}
+    assert stats.perRule['freeze'].added == 3
+    assert primary.liability.get_credits() == 103  # only the primary decisions were charged
+
+    records = list(iter_shadow_ledger(root))
+    assert [r.proposalId for r in records] == ['p-0', 'p-1', 'p-2']
+    assert records[0].rulesAdded == ['freeze'] and records[0].shadowOutcome == 'block'
+    assert summarize_shadow_ledger(root)[0].outcomes == stats.outcomes
+
+def test_full_queue_drops_shadow_work(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    evaluator = ShadowEvaluator(max_queued=1)
+    evaluate = evaluator._evaluate
+    def blocking(job):
+        started.set()
+        release.wait(10)
+        return evaluate(job)
+    evaluator._evaluate = blocking
+    shadows = [ShadowPolicy('slow', PolicyEngine(make_policy([])))]
+    decision = PolicyEngine(make_policy([])).evaluate(make_proposal())
+
+    assert evaluator.submit(str(tmp_path), shadows, make_proposal(), decision)
+    assert started.wait(10)  # the worker holds the first job
+    assert evaluator.submit(str(tmp_path), shadows, make_proposal(), decision)
+    assert not evaluator.submit(str(tmp_path), shadows, make_proposal(), decision)
+    release.set()
+    evaluator.join()
+    metrics = evaluator.metrics()
+    assert (metrics.submitted, metrics.dropped, metrics.policies[0].evaluated) == (3, 1, 2)
+
+def test_shadows_with_other_anomaly_settings_detect_anomalies_themselves(tmp_path, monkeypatch):
+    scans = []
+    detect = AnomalyDetector.detect
+    monkeypatch.setattr(AnomalyDetector, 'detect', lambda self, *args: scans.append(self.chunk_size) or detect(self, *args))
+    rules = [{"id": "anomaly", "description": "Anomaly", "condition": {"var": "engine.isAnomaly"}, "action": "warn"}]
+    same = ShadowPolicy('same', PolicyEngine(make_policy(rules)))
+    other_policy = make_policy(rules)
+    other_policy.meta['anomalyScan'] = {"chunkSize": 4096}
+    other = ShadowPolicy('other', PolicyEngine(other_policy))
+
+    primary_policy = make_policy([])
+    decision = PolicyEngine(primary_policy).evaluate(make_proposal())
+    report = AnomalyReport(isAnomaly=False, score=0.0, reasons=[])
+    job = _ShadowJob(str(tmp_path), [same.spec, other.spec], make_proposal(), decision, report, anomaly_config(primary_policy))
+    assert [r.policy for r in evaluate_shadows(job)] == ['same', 'other']
+    # Only the shadow scanning unlike the primary ran its own detection
+    assert scans == [4096]
+
+def test_api_evaluates_workspace_shadows_off_the_request_path(tmp_path):
+    root = str(tmp_path)
+    (tmp_path / 'agent.policy.yaml').write_text(PRIMARY, encoding='utf-8')
+    (tmp_path / 'agent.shadow.strict.yaml').write_text(STRICT, encoding='utf-8')
+    client = TestClient(server.app)
+    body = {"workspaceRoot": root, "proposal": {
+        "id": "p", "author": "human", "reasoning": "r", "files": ["src/a.py"], "diff": ""
+    }}
+    response = client.post('/v1/evaluate', json=body)
+    assert response.status_code == 200 and response.json()['allowed'] is True
+    shadow_evaluator().join()
+
+    metrics = client.get('/v1/metrics').json()
+    [stats] = [p for p in metrics['shadow']['policies'] if p['workspaceRoot'] == root]
+    assert stats['outcomes'] == {'allow -> block': 1}
+    # The shadow ledger is separate from the decision ledger
+    with open(ledger_path(root), 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['allowed'] for line in f] == [True]
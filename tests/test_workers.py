@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import socket
+import signal
+import threading
+import subprocess
+import httpx
+import multiprocessing
+from trusted_agent_engine.engine.liability_manager import LiabilityManager
+from trusted_agent_engine.engine.policy_watcher import PolicyRegistry
+from trusted_agent_engine.api.workers import WorkerSupervisor
+
+POLICY = """
+meta:
+  name: "workers-test"
+scopes:
+  - id: "source"
+    allow: ["src/**"]
+risks: []
+rules:
+  - id: "gate"
+    description: "Literal gate"
+    condition: {block}
+    action: "block"
+"""
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for(predicate, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+def _start_and_credit(root):
+    LiabilityManager(root).update_credits(1.0)
+
+def test_workers_starting_together_never_reset_credits(tmp_path):
+    root = str(tmp_path)
+    workers = [multiprocessing.Process(target=_start_and_credit, args=(root,)) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert [w.exitcode for w in workers] == [0] * 8
+    assert LiabilityManager(root).get_credits() == 108
+
+    # Created by another worker that has not initialized it yet
+    manager = LiabilityManager(root)
+    open(manager.ledger_path, 'w').close()
+    assert manager.get_credits() == 100
+    assert manager.update_credits(-2.0) == 98
+
+def test_prefork_workers_share_policy_and_roll_on_change(tmp_path):
+    policy = tmp_path / 'agent.policy.yaml'
+    policy.write_text(POLICY.replace('{block}', 'false'), encoding='utf-8')
+    root, port = str(tmp_path), free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, TRUSTED_ENGINE_POLICY_POLL_INTERVAL="0.2")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "trusted_agent_engine.cli.main", "serve",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", "2", "--workspace", root],
+        env=env
+    )
+
+    def health():
+        try:
+            return httpx.get(f"{url}/health").status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def evaluate(i):
+        body = {"workspaceRoot": root, "proposal": {
+            "id": f"p-{i}", "author": "human", "reasoning": "r", "files": ["src/a.py"], "diff": ""
+        }}
+        response = httpx.post(f"{url}/v1/evaluate", json=body, timeout=10)
+        assert response.status_code == 200
+        return response.json()["allowed"]
+
+    try:
+        assert wait_for(health)
+        assert all(evaluate(i) for i in range(10))
+        shards = {f for f in os.listdir(tmp_path / '.ai') if f.startswith('ledger.') and f.endswith('.jsonl')}
+        assert shards and shards <= {'ledger.w0.jsonl', 'ledger.w1.jsonl'}
+
+        # Every request keeps succeeding while the workers are replaced
+        failures, results, done = [], [], threading.Event()
+        def client(offset):
+            i = offset
+            while not done.is_set():
+                try:
+                    results.append(evaluate(i))
+                except Exception as e:
+                    failures.append(repr(e))
+                i += 2
+        clients = [threading.Thread(target=client, args=(k,)) for k in (1000, 1001)]
+        for thread in clients:
+            thread.start()
+        policy.write_text(POLICY.replace('{block}', 'true'), encoding='utf-8')
+        try:
+            # Blocked by both replaced workers once the roll is over
+            assert wait_for(lambda: results[-20:].count(False) == 20, timeout=30)
+        finally:
+            done.set()
+            for thread in clients:
+                thread.join(15)
+        assert failures == []
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
+
+def test_replacement_failing_to_start_keeps_the_old_worker():
+    supervisor = WorkerSupervisor(None, PolicyRegistry(), [], workers=1)
+    supervisor._run_worker = lambda slot, ready_fd: os._exit(3)  # dies before reporting ready
+    old = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        supervisor.slots = {0: old.pid}
+        supervisor.rolling_restart()
+        assert supervisor.slots == {0: old.pid}
+        assert old.poll() is None  # never told to drain
+    finally:
+        old.kill()
+        old.wait()
@@ -1,31 +1,44 @@
-import os
-import yaml
+import time
 import asyncio
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Set
 
 from .engine.evaluator import PolicyEngine
-from .engine.policy_loader import load_policy
-from .engine.types import Proposal, Decision, ValueManifesto, DecisionTrace
+from .engine.policy_loader import load_policy, load_workspace, load_compiled_workspace
+from .engine.policy_watcher import PolicyWatcher, PolicyRegistry
+from .engine.types import Proposal, Decision, ValueManifesto, DecisionTrace, AnomalyReport
 from .engine.context_bank import ContextBank
+from .engine.ledger_tail import LedgerTailer
 from .engine.sovereign import SovereignManager
 from .engine.diff_parser import parse_unified_diff
 from .engine.asset_manager import AssetManager
 from .engine.anomaly_detector import AnomalyDetector
 from .engine.self_audit import SelfAuditor
+from .engine.profiler import ProfileCapture
+from .engine.shadow import ShadowPolicy, load_shadow_policies, shadow_evaluator
 
 __all__ = [
     'PolicyEngine',
     'load_policy',
+    'load_workspace',
+    'PolicyWatcher',
+    'PolicyRegistry',
     'Proposal',
     'Decision',
     'ValueManifesto',
     'DecisionTrace',
     'ContextBank',
+    'LedgerTailer',
     'SovereignManager',
     'parse_unified_diff',
     'AssetManager',
     'AnomalyDetector',
     'SelfAuditor',
+    'ProfileCapture',
+    'ShadowPolicy',
+    'load_shadow_policies',
     'TrustedGuard'
 ]
 
@@ -34,46 +47,155 @@ class TrustedGuard:
     TrustedGuard - High-level integration wrapper.
     Provides "zero-config" rapid governance capability for other projects.
     """
-    
+
+    # Full evaluations continuing after a deadline decision. A thread rather than
+    # an event loop task, so they outlive the loop of a synchronous caller.
+    _background_executor: Optional[ThreadPoolExecutor] = None
+    _background: Set[Future] = set()
+    _background_lock = threading.Lock()
+
+    @staticmethod
+    def load_engine(workspace_root: str) -> PolicyEngine:
+        """
+        Loads and verifies the workspace policy into a reusable engine.
+        """
+        config, manifesto, compiled = load_compiled_workspace(workspace_root)
+        return PolicyEngine(config, manifesto, workspace_root, compiled=compiled)
+
     @staticmethod
-    async def evaluate(workspace_root: str, proposal: Proposal) -> Decision:
+    async def evaluate(
+        workspace_root: str,
+        proposal: Proposal,
+        engine: Optional[PolicyEngine] = None,
+        anomaly_report: Optional[AnomalyReport] = None,
+        timings: Optional[Dict[str, float]] = None,
+        profile: Optional[ProfileCapture] = None,
+        deadline_ms: Optional[float] = None,
+        complete_in_background: Optional[bool] = None,
+        shadows: Optional[List[ShadowPolicy]] = None,
+        in_thread: bool = False
+    ) -> Decision:
         """
         One-click decision check.
+        Pass a preloaded `engine` (e.g. from a PolicyRegistry) to skip policy loading,
+        and an `anomaly_report` when the diff was already scanned while streaming in.
+        If `timings` is given, per-stage durations (seconds) are stored in it.
+        With a `profile`, policy loading and evaluation are profiled and saved;
+        recording is not, since other requests may run while it is awaited.
+        When `deadline_ms` (or the policy's `meta.deadline`) cuts the evaluation
+        short, the conservative decision is returned and recorded, and the full
+        evaluation then runs on a background thread to charge its credits; with
+        `complete_in_background` (default: `meta.deadline.completeInBackground`)
+        it is recorded too.
+        `shadows` (see load_shadow_policies) are queued for evaluation against the
+        same proposal once the decision is recorded; they never change it.
+        With `in_thread`, loading and evaluation run on a worker thread so the
+        event loop keeps serving (and scheduling) other requests meanwhile.
         """
-        policy_path = os.path.join(workspace_root, 'agent.policy.yaml')
-        manifesto_path = os.path.join(workspace_root, 'value_manifesto.yaml')
-        pub_key_path = os.path.join(workspace_root, '.ai', 'sovereign.pub')
-
-        # 1. Load sovereign public key (if exists)
-        public_key = None
-        if os.path.exists(pub_key_path):
-            with open(pub_key_path, 'r', encoding='utf-8') as f:
-                public_key = f.read()
-
-        # 2. Load policy (with signature verification)
-        config = load_policy(policy_path, public_key=public_key)
-
-        # 3. Load manifesto (optional)
-        manifesto = None
-        if os.path.exists(manifesto_path):
-            with open(manifesto_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                manifesto = ValueManifesto.model_validate(data)
-
-        # 4. Execute evaluation
-        engine = PolicyEngine(config, manifesto, workspace_root)
-        decision = engine.evaluate(proposal)
-
-        # 5. Record trace to ContextBank
-        bank = ContextBank(workspace_root)
-        trace = DecisionTrace(
-            **decision.model_dump(),
-            proposal=proposal,
+        started = time.perf_counter()
+
+        def decide():
+            with profile if profile is not None else nullcontext():
+                # 1. Load and verify policy unless the caller holds a verified engine
+                loaded_engine = engine if engine is not None else TrustedGuard.load_engine(workspace_root)
+                loaded = time.perf_counter()
+
+                # 2. Execute evaluation
+                decision = loaded_engine.evaluate(proposal, anomaly_report=anomaly_report, deadline_ms=deadline_ms)
+            return loaded_engine, decision, loaded
+
+        if in_thread:
+            engine, decision, loaded = await asyncio.to_thread(decide)
+        else:
+            engine, decision, loaded = decide()
+        evaluated = time.perf_counter()
+        if profile is not None:
+            profile.save()
+
+        # 3. Record trace to ContextBank
+        bank = ContextBank.for_workspace(workspace_root)
+        trace = DecisionTrace.from_decision(
+            decision,
+            proposal,
             outcome='applied' if decision.allowed else 'rejected'
         )
         
         # We can't easily do fire-and-forget in sync-looking code unless we use a background task
         # But for simplicity in Python, we'll just await it or wrap it.
-        await bank.record(trace)
+        await bank.record(trace, learn=engine.anomaly_detector.baselines is not None)
+
+        if decision.timedOutStage is not None:
+            if complete_in_background is None:
+                complete_in_background = bool(engine.deadline_config.get('completeInBackground', False))
+            # Always completed, so that a short deadline never spares the agent its credit
+            # impact; the completed decision is only recorded with `complete_in_background`
+            TrustedGuard._submit_background(
+                workspace_root, engine, proposal, anomaly_report, bank.shard, trace.sequence, complete_in_background
+            )
+        elif shadows:
+            # A deadline decision says nothing about the policy: nothing to compare against
+            shadow_evaluator().submit(workspace_root, shadows, proposal, decision, anomaly_report, engine.policy)
+
+        if timings is not None:
+            timings['policy'] = loaded - started
+            timings['evaluate'] = evaluated - loaded
+            timings['record'] = time.perf_counter() - evaluated
 
         return decision
+
+    @staticmethod
+    def _submit_background(
+        workspace_root: str,
+        engine: PolicyEngine,
+        proposal: Proposal,
+        anomaly_report: Optional[AnomalyReport],
+        shard: str,
+        provisional_sequence: int,
+        record: bool = True
+    ) -> None:
+        with TrustedGuard._background_lock:
+            if TrustedGuard._background_executor is None:
+                TrustedGuard._background_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='trusted-background'
+                )
+            future = TrustedGuard._background_executor.submit(
+                TrustedGuard._complete, workspace_root, engine, proposal, anomaly_report, shard, provisional_sequence, record
+            )
+            TrustedGuard._background.add(future)
+        future.add_done_callback(TrustedGuard._background.discard)
+
+    @staticmethod
+    def _complete(
+        workspace_root: str,
+        engine: PolicyEngine,
+        proposal: Proposal,
+        anomaly_report: Optional[AnomalyReport],
+        shard: str,
+        provisional_sequence: int,
+        record: bool = True
+    ) -> None:
+        try:
+            # Charges the credits the deadline decision left uncharged
+            decision = engine.evaluate(proposal, anomaly_report=anomaly_report, use_deadline=False)
+            if not record:
+                return
+            # The proposal was already answered (require_human); this is the analysis the human gets,
+            # recorded next to the provisional trace it completes
+            trace = DecisionTrace.from_decision(decision, proposal, outcome='pending')
+            trace.backgroundCompletion = True
+            trace.completesSequence = provisional_sequence
+            asyncio.run(ContextBank.for_workspace(workspace_root, shard=shard).record(
+                trace, learn=engine.anomaly_detector.baselines is not None
+            ))
+        except Exception as e:
+            print(f"[Governance Error] Background evaluation of '{proposal.id}' failed: {e}")
+
+    @staticmethod
+    def wait_for_background(timeout: Optional[float] = None) -> bool:
+        """
+        Waits for background evaluations to be recorded. Returns False if some
+        are still running after `timeout` seconds.
+        """
+        with TrustedGuard._background_lock:
+            pending = set(TrustedGuard._background)
+        return not wait(pending, timeout=timeout).not_done
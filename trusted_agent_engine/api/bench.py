@@ -0,0 +1,412 @@
+import os
+import sys
+import time
+import glob
+import random
+import socket
+import asyncio
+import shutil
+import tempfile
+import tracemalloc
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import yaml
+import httpx
+import uvicorn
+from pydantic import BaseModel
+
+from ..engine.types import Accountability, Decision, PolicyConfig, Proposal, ValueManifesto, Violation
+from ..engine.evaluator import PolicyEngine
+from ..engine.records import DecisionRecord
+from ..engine.policy_loader import POLICY_FILE, MANIFESTO_FILE, PUBLIC_KEY_FILE
+from ..engine.policy_bundle import BUNDLE_FILE
+from ..engine.shadow import SHADOW_POLICY_PATTERN
+
+BENCH_POLICY = """
+meta:
+  name: "bench-policy"
+  privileges: ["high-risk-decision"]
+scopes:
+  - id: "source"
+    allow: ["src/**", "docs/**", "README.md"]
+risks:
+  - id: "auth"
+    level: "high"
+    match: ["src/auth/**"]
+rules:
+  - id: "scope-enforcement"
+    description: "Reject changes outside allowed scopes"
+    check: {"var": "engine.isScoped"}
+    action: "block"
+  - id: "anomaly-gate"
+    description: "Anomalous diffs need a human"
+    condition: {"var": "engine.isAnomaly"}
+    action: "require_human"
+  - id: "reasoning-required"
+    description: "Must provide reasoning"
+    check: {"var": "payload.reasoning"}
+    action: "warn"
+"""
+
+DEFAULT_MIX = {"small": 70, "large": 10, "docs": 10, "obfuscated": 5, "out-of-scope": 5}
+
+class StageStats(BaseModel):
+    meanMs: float
+    p95Ms: float
+
+class BenchReport(BaseModel):
+    url: str
+    mode: str
+    concurrency: int
+    targetRate: Optional[float]
+    durationS: float
+    requests: int
+    errors: int
+    errorRate: float
+    throughputRps: float
+    latencyMs: Dict[str, float]
+    statusCounts: Dict[str, int]
+    serverStages: Dict[str, StageStats]
+    mix: Dict[str, int]
+
+class EvalVariantStats(BaseModel):
+    meanUs: float
+    p95Us: float
+    peakBytes: float  # peak traced memory during an evaluation
+    retainedBytes: float  # memory held by the returned decision
+
+class EvalBenchReport(BaseModel):
+    kind: str
+    iterations: int
+    rules: int
+    variants: Dict[str, EvalVariantStats]
+
+def _file_diff(path: str, lines: int, content: str = "value = 1") -> str:
+    body = ''.join(f"+{content}\n" for _ in range(lines))
+    return (f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+            f"@@ -0,0 +1,{lines} @@\n{body}")
+
+def synthetic_proposal(kind: str, index: int) -> Proposal:
+    """Builds one synthetic proposal of the given mix kind."""
+    if kind == "large":
+        files = [f"src/gen/module_{i}.py" for i in range(12)]
+        diff = ''.join(_file_diff(f, 200) for f in files)
+    elif kind == "docs":
+        files = ["docs/guide.md"]
+        diff = _file_diff(files[0], 10, "Some documentation.")
+    elif kind == "obfuscated":
+        files = ["src/util.py"]
+        diff = _file_diff(files[0], 3, 'PAYLOAD = "' + 'QUJD' * 40 + '"')
+    elif kind == "out-of-scope":
+        files = ["infra/main.tf"]
+        diff = _file_diff(files[0], 5, 'resource "x" {}')
+    else:
+        files = ["src/app.py"]
+        diff = _file_diff(files[0], 5)
+    return Proposal(
+        id=f"bench-{kind}-{index}",
+        author="ai-agent",
+        reasoning="Synthetic load-test proposal.",
+        files=files,
+        diff=diff
+    )
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    """Parses 'small=70,large=10,...' into mix weights."""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown proposal kind '{kind}'. Expected one of {list(DEFAULT_MIX)}.")
+        mix[kind] = int(weight or 1)
+    return mix
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def _parse_server_timing(header: str) -> Iterator[Tuple[str, float]]:
+    for metric in header.split(','):
+        name, _, params = metric.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'dur':
+                yield name, float(value)
+
+@contextmanager
+def local_server(workspace_root: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Runs the API app on an ephemeral localhost port in a child process, so the
+    load generator and the server do not compete for the same interpreter.
+    Yields (base_url, workspace_root) of a throwaway workspace: the benchmark
+    policy, or a copy of `workspace_root`'s policy files, so the load never
+    reaches a real workspace's ledger, baselines or credits.
+    """
+    with tempfile.TemporaryDirectory(prefix="trusted-bench-") as tmp:
+        if workspace_root is None:
+            with open(os.path.join(tmp, POLICY_FILE), 'w', encoding='utf-8') as f:
+                f.write(BENCH_POLICY)
+        else:
+            copy_policy_files(workspace_root, tmp)
+        workspace_root = tmp
+
+        # Bind here and hand the socket to the child, so there is no port race.
+        # IPPROTO_TCP matters: asyncio only sets TCP_NODELAY on sockets created
+        # with it, and Nagle + delayed ACKs would add ~40ms to every request.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        url = f"http://127.0.0.1:{port}"
+
+        process = subprocess.Popen(
+            [sys.executable, "-m", "trusted_agent_engine.api.bench", str(sock.fileno())],
+            pass_fds=[sock.fileno()]
+        )
+        try:
+            _wait_until_ready(url, process)
+            yield url, workspace_root
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            sock.close()
+
+def copy_policy_files(source_root: str, target_root: str) -> None:
+    """Copies what a workspace's policy loads from (policy, manifesto, bundle, key, shadows)."""
+    names = [POLICY_FILE, MANIFESTO_FILE, BUNDLE_FILE, PUBLIC_KEY_FILE]
+    names += [os.path.basename(p) for p in glob.glob(os.path.join(source_root, SHADOW_POLICY_PATTERN))]
+    for name in names:
+        source = os.path.join(source_root, name)
+        if os.path.exists(source):
+            os.makedirs(os.path.dirname(os.path.join(target_root, name)), exist_ok=True)
+            shutil.copy2(source, os.path.join(target_root, name))
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Benchmark server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("Benchmark server failed to start")
+
+async def run_benchmark(
+    url: str,
+    workspace_root: str,
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    duration: Optional[float] = 10.0,
+    max_requests: Optional[int] = None,
+    mix: Optional[Dict[str, int]] = None,
+    warmup: int = 10,
+    seed: int = 0
+) -> BenchReport:
+    """
+    Drives /v1/evaluate and measures latency per request.
+    Without `rate`, `concurrency` workers send back-to-back (closed loop). With
+    `rate`, requests are issued on a fixed schedule (open loop) and latency is
+    measured from the scheduled send time, so a slow server cannot hide queueing.
+    The run ends after `duration` seconds or `max_requests` requests, whichever
+    comes first (None: no such limit, but one of them must be set).
+    """
+    if duration is None and max_requests is None:
+        raise ValueError("Set a duration or a request count for the benchmark")
+    mix = mix or dict(DEFAULT_MIX)
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    # Pre-serialize a pool of bodies so the client's own JSON work stays off the clock
+    bodies = {
+        kind: [{"workspaceRoot": workspace_root, "proposal": synthetic_proposal(kind, i).model_dump(mode='json')}
+               for i in range(4)]
+        for kind in kinds
+    }
+
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    status_counts: Dict[str, int] = {}
+    errors = 0
+    issued = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        for i in range(warmup):
+            await client.post("/v1/evaluate", json=bodies[kinds[i % len(kinds)]][0])
+
+        async def send(scheduled: float) -> None:
+            nonlocal errors
+            kind = rng.choices(kinds, weights)[0]
+            try:
+                response = await client.post("/v1/evaluate", json=rng.choice(bodies[kind]))
+                status = str(response.status_code)
+                if response.status_code != 200:
+                    errors += 1
+                for stage, ms in _parse_server_timing(response.headers.get("server-timing", "")):
+                    stages.setdefault(stage, []).append(ms)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        def budget_left(now: float) -> bool:
+            # Whichever limit is reached first ends the run
+            if max_requests is not None and issued >= max_requests:
+                return False
+            return duration is None or now - started < duration
+
+        started = time.perf_counter()
+        if rate:
+            in_flight = set()
+            semaphore = asyncio.Semaphore(concurrency)
+            next_send = started
+
+            async def scheduled_send(at: float) -> None:
+                async with semaphore:
+                    await send(at)
+
+            while budget_left(time.perf_counter()):
+                await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+                task = asyncio.create_task(scheduled_send(next_send))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                issued += 1
+                next_send += 1.0 / rate
+            await asyncio.gather(*in_flight)
+        else:
+            async def worker() -> None:
+                nonlocal issued
+                while budget_left(time.perf_counter()):
+                    issued += 1
+                    await send(time.perf_counter())
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return BenchReport(
+        url=url,
+        mode="open-loop" if rate else "closed-loop",
+        concurrency=concurrency,
+        targetRate=rate,
+        durationS=round(elapsed, 3),
+        requests=len(latencies),
+        errors=errors,
+        errorRate=errors / len(latencies) if latencies else 0.0,
+        throughputRps=len(latencies) / elapsed if elapsed > 0 else 0.0,
+        latencyMs={
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "p99": _percentile(ordered, 0.99),
+            "max": ordered[-1] if ordered else 0.0,
+            "mean": sum(ordered) / len(ordered) if ordered else 0.0
+        },
+        statusCounts=status_counts,
+        serverStages={
+            stage: StageStats(meanMs=sum(values) / len(values), p95Ms=_percentile(sorted(values), 0.95))
+            for stage, values in stages.items()
+        },
+        mix=mix
+    )
+
+def _eager_models(record: DecisionRecord) -> Decision:
+    # How decisions used to be built: every nested model constructed and validated on its own
+    accountability = record.accountability
+    return Decision(
+        allowed=record.allowed,
+        requiresHuman=record.requiresHuman,
+        riskLevel=record.riskLevel,
+        actions=record.actions,
+        violations=[Violation(**v.to_dict()) for v in record.violations],
+        valueScore=record.valueScore,
+        accountability=Accountability(
+            responsibleEntity=accountability.responsibleEntity,
+            signature=accountability.signature,
+            creditImpact=accountability.creditImpact
+        ) if accountability is not None else None,
+        anomalyReport=record.anomalyReport,
+        skippedRules=record.skippedRules,
+        auditLog=record.auditLog
+    )
+
+def benchmark_evaluation(
+    policy: Optional[PolicyConfig] = None,
+    manifesto: Optional[ValueManifesto] = None,
+    kind: str = "small",
+    iterations: int = 2000,
+    warmup: int = 100
+) -> EvalBenchReport:
+    """
+    In-process microbenchmark of one PolicyEngine evaluation, per way of
+    producing the decision: the internal record only, the public model
+    (`evaluate`), and eagerly validated nested models. No workspace is used,
+    so no credits or baselines are written.
+    """
+    if kind not in DEFAULT_MIX:
+        raise ValueError(f"Unknown proposal kind '{kind}'. Expected one of {list(DEFAULT_MIX)}.")
+    policy = policy or PolicyConfig.model_validate(yaml.safe_load(BENCH_POLICY))
+    engine = PolicyEngine(policy, manifesto)
+    proposal = synthetic_proposal(kind, 0)
+    # The scan is done once up front, as DiffScanner does while receiving the diff
+    anomaly_report = engine.anomaly_detector.detect(proposal)
+    variants = {
+        "record": lambda: engine.evaluate_record(proposal, anomaly_report),
+        "model": lambda: engine.evaluate(proposal, anomaly_report),
+        "eager-models": lambda: _eager_models(engine.evaluate_record(proposal, anomaly_report))
+    }
+
+    results: Dict[str, EvalVariantStats] = {}
+    for name, run in variants.items():
+        for _ in range(warmup):
+            run()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1e6)
+
+        # Allocations are traced separately: tracing slows every allocation down
+        samples = max(1, iterations // 10)
+        peak = retained = 0
+        tracemalloc.start()
+        try:
+            for _ in range(samples):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                decision = run()
+                current, highest = tracemalloc.get_traced_memory()
+                peak += highest - baseline
+                retained += current - baseline
+                del decision
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        results[name] = EvalVariantStats(
+            meanUs=sum(timings) / len(timings),
+            p95Us=_percentile(timings, 0.95),
+            peakBytes=peak / samples,
+            retainedBytes=retained / samples
+        )
+    return EvalBenchReport(kind=kind, iterations=iterations, rules=len(policy.rules), variants=results)
+
+def _serve_socket(fd: int) -> None:
+    from .server import app
+    sock = socket.socket(fileno=fd)
+    uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False)).run(sockets=[sock])
+
+if __name__ == "__main__":
+    _serve_socket(int(sys.argv[1]))
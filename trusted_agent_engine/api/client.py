@@ -0,0 +1,283 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+import httpx
+
+from .. import TrustedGuard
+from ..engine.types import Proposal, Decision
+from ..engine.policy_watcher import PolicyRegistry
+
+RETRY_STATUS = (429, 503)
+
+class GovernanceAPIError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"Governance API error {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int, backoff: float) -> float:
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    # Exponential backoff with jitter
+    return backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+def _settle(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    # The caller may have been cancelled while its request was in flight
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+def _error_detail(response: httpx.Response) -> str:
+    try:
+        return str(response.json().get('detail', response.text))
+    except ValueError:
+        return response.text
+
+class AsyncGovernanceClient:
+    """
+    Async client for the governance API.
+
+    - One keep-alive connection pool per client.
+    - Concurrent `evaluate` calls made within `batch_window` seconds are coalesced
+      into a single `/v1/evaluate/batch` request (falls back to single calls if the
+      server has no batch endpoint).
+    - `429`/`503` responses are retried with exponential backoff (or Retry-After).
+    - Without `base_url`, proposals are evaluated in-process via TrustedGuard.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        workspace_root: Optional[str] = None,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.1,
+        batch_window: float = 0.002,
+        max_batch_size: int = 32,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        if base_url is None and workspace_root is None:
+            raise ValueError("Either base_url (remote) or workspace_root (in-process) is required")
+        self.workspace_root = workspace_root
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.batch_supported = max_batch_size > 1
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._registry: Optional[PolicyRegistry] = None
+        if base_url is not None:
+            self._http = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=timeout,
+                transport=transport,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        else:
+            self._registry = PolicyRegistry()
+
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> 'AsyncGovernanceClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if self._pending:
+            await self._flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+        if self._registry is not None:
+            self._registry.close()
+
+    async def evaluate(
+        self,
+        proposal: Proposal,
+        workspace_root: Optional[str] = None,
+        deadline_ms: Optional[float] = None
+    ) -> Decision:
+        root = workspace_root or self.workspace_root
+        if root is None:
+            raise ValueError("workspace_root is required")
+
+        if self._http is None:
+            return await TrustedGuard.evaluate(root, proposal, engine=self._registry.get(root), deadline_ms=deadline_ms)
+
+        body = {"workspaceRoot": root, "proposal": proposal.model_dump(mode='json')}
+        if deadline_ms is not None:
+            body["deadlineMs"] = deadline_ms
+        if not self.batch_supported:
+            return await self._evaluate_single(body)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((body, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.batch_window)
+        return await future
+
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        if len(pending) == 1 or not self.batch_supported:
+            await asyncio.gather(*(self._resolve_single(body, future) for body, future in pending))
+            return
+
+        try:
+            response = await self._post("/v1/evaluate/batch", {"requests": [body for body, _ in pending]})
+        except Exception as e:
+            for _, future in pending:
+                _settle(future, error=e)
+            return
+
+        if response.status_code in (404, 405):
+            # Older server without a batch endpoint
+            self.batch_supported = False
+            await asyncio.gather(*(self._resolve_single(body, future) for body, future in pending))
+            return
+        if response.status_code != 200:
+            error = GovernanceAPIError(response.status_code, _error_detail(response))
+            for _, future in pending:
+                _settle(future, error=error)
+            return
+
+        rate_limited = []
+        for (body, future), result in zip(pending, response.json()["results"]):
+            if result["status"] == 200:
+                _settle(future, Decision.model_validate(result["decision"]))
+            elif result["status"] == 429:
+                rate_limited.append((body, future))
+            else:
+                _settle(future, error=GovernanceAPIError(result["status"], result.get("error") or ""))
+        # Retried one by one, with the Retry-After backoff of single calls
+        await asyncio.gather(*(self._resolve_single(body, future) for body, future in rate_limited))
+
+    async def _resolve_single(self, body: Dict[str, Any], future: asyncio.Future) -> None:
+        try:
+            _settle(future, await self._evaluate_single(body))
+        except Exception as e:
+            _settle(future, error=e)
+
+    async def _evaluate_single(self, body: Dict[str, Any]) -> Decision:
+        response = await self._post("/v1/evaluate", body)
+        if response.status_code != 200:
+            raise GovernanceAPIError(response.status_code, _error_detail(response))
+        return Decision.model_validate_json(response.content)
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = await self._http.post(path, json=body)
+            if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                return response
+            await asyncio.sleep(_retry_delay(response, attempt, self.backoff))
+            attempt += 1
+
+class GovernanceClient:
+    """
+    Synchronous counterpart of AsyncGovernanceClient (pooled keep-alive
+    connections, 429/503 retries, in-process mode). Calls are not coalesced.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        workspace_root: Optional[str] = None,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.1,
+        http_client: Optional[httpx.Client] = None
+    ):
+        if base_url is None and workspace_root is None and http_client is None:
+            raise ValueError("Either base_url (remote) or workspace_root (in-process) is required")
+        self.workspace_root = workspace_root
+        self.retries = retries
+        self.backoff = backoff
+
+        self._http: Optional[httpx.Client] = http_client
+        self._registry: Optional[PolicyRegistry] = None
+        if self._http is None and base_url is not None:
+            self._http = httpx.Client(
+                base_url=base_url,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        elif self._http is None:
+            self._registry = PolicyRegistry()
+
+    def __enter__(self) -> 'GovernanceClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+        if self._registry is not None:
+            self._registry.close()
+
+    def evaluate(
+        self,
+        proposal: Proposal,
+        workspace_root: Optional[str] = None,
+        deadline_ms: Optional[float] = None
+    ) -> Decision:
+        root = workspace_root or self.workspace_root
+        if root is None:
+            raise ValueError("workspace_root is required")
+
+        if self._http is None:
+            return asyncio.run(TrustedGuard.evaluate(
+                root, proposal, engine=self._registry.get(root), deadline_ms=deadline_ms
+            ))
+
+        body = {"workspaceRoot": root, "proposal": proposal.model_dump(mode='json')}
+        if deadline_ms is not None:
+            body["deadlineMs"] = deadline_ms
+        attempt = 0
+        while True:
+            response = self._http.post("/v1/evaluate", json=body)
+            if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                break
+            time.sleep(_retry_delay(response, attempt, self.backoff))
+            attempt += 1
+
+        if response.status_code != 200:
+            raise GovernanceAPIError(response.status_code, _error_detail(response))
+        return Decision.model_validate_json(response.content)
@@ -0,0 +1,258 @@
+import time
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+
+# Request cost: one unit plus one per COST_UNIT characters of diff, so a huge
+# diff uses up an agent's budget and its share of the queue accordingly
+COST_UNIT = 64 * 1024
+# Credits that map to weight 1.0, and the weight bounds
+REFERENCE_CREDITS = 100.0
+MIN_WEIGHT = 0.1
+MAX_WEIGHT = 2.0
+DEFAULT_MAX_AGENTS = 1024
+
+class RateLimited(Exception):
+    def __init__(self, agent: str, retry_after: float, reason: str):
+        super().__init__(f"Rate limit exceeded for agent '{agent}': {reason}")
+        self.agent = agent
+        self.retry_after = retry_after
+
+class AgentMetrics(BaseModel):
+    weight: float
+    tokens: Optional[float]  # None when rate limiting is disabled
+    queued: int
+    inFlight: int
+    admitted: int
+    rateLimited: int
+    completed: int
+    meanWaitMs: float
+
+class SchedulerMetrics(BaseModel):
+    capacity: int
+    inFlight: int
+    queued: int
+    ratePerSecond: float
+    burst: float
+    maxQueuedPerAgent: int
+    agents: Dict[str, AgentMetrics]
+
+def request_cost(diff_size: int) -> float:
+    return 1.0 + diff_size / COST_UNIT
+
+def credit_weight(credits: float) -> float:
+    return min(MAX_WEIGHT, max(MIN_WEIGHT, credits / REFERENCE_CREDITS))
+
+class _Agent:
+    __slots__ = ('tokens', 'refilled_at', 'last_finish', 'weight', 'queued', 'in_flight',
+                 'admitted', 'rate_limited', 'completed', 'wait_total', 'last_seen')
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.refilled_at = now
+        self.last_finish = 0.0
+        self.weight = 1.0
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.last_seen = now
+
+class FairScheduler:
+    """
+    Admission control in front of evaluation.
+
+    1. Per-agent token bucket (`rate` cost units per second, up to `burst`):
+       an agent over budget gets RateLimited with a Retry-After hint.
+    2. Weighted fair queue (start-time fair queuing) for the `capacity`
+       evaluation slots: each request is tagged with a virtual finish time of
+       cost / weight after the agent's previous request, and the smallest tag
+       runs next. An agent flooding the server only lengthens its own queue.
+
+    Weights come from `weight_for(agent)` (e.g. derived from credits), cached
+    for `weight_ttl` seconds. Not thread-safe: use from one event loop.
+
+    State is kept for at most `max_agents` agents; beyond that the least
+    recently seen idle agents are forgotten, whatever their age. A forgotten
+    agent comes back with a full bucket, so the limits only hold if agent ids
+    come from an authenticated source rather than from the caller's say-so.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1,
+        rate: float = 0.0,
+        burst: float = 20.0,
+        max_queued_per_agent: int = 100,
+        weight_ttl: float = 5.0,
+        max_agents: int = DEFAULT_MAX_AGENTS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = max(1, capacity)
+        self.rate = rate
+        self.burst = burst
+        self.max_queued_per_agent = max_queued_per_agent
+        self.weight_ttl = weight_ttl
+        self.max_agents = max(1, max_agents)
+        self.clock = clock
+
+        # Least recently seen first
+        self.agents: 'OrderedDict[str, _Agent]' = OrderedDict()
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        # (finish tag, arrival, start tag, agent, future)
+        self._queue: List[Tuple[float, int, float, str, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._weights: Dict[str, Tuple[float, float]] = {}  # agent -> (weight, expires)
+        self._dispatch_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        agent: str,
+        cost: float = 1.0,
+        weight_for: Optional[Callable[[], float]] = None
+    ) -> AsyncIterator[None]:
+        """Admits the request (or raises RateLimited) and holds an evaluation slot."""
+        await self.acquire(agent, cost, weight_for)
+        try:
+            yield
+        finally:
+            self.release(agent)
+
+    async def acquire(self, agent: str, cost: float = 1.0, weight_for: Optional[Callable[[], float]] = None) -> None:
+        now = self.clock()
+        state = self._agent(agent, now)
+        self._admit(agent, state, cost, now)
+        state.weight = self._weight(agent, weight_for, now)
+
+        start = max(self.virtual_time, state.last_finish)
+        finish = start + cost / state.weight
+        state.last_finish = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._arrivals), start, agent, future))
+        state.queued += 1
+        # Dispatch on the next loop turn, so requests arriving together are
+        # ordered by tag rather than by whichever handler ran first
+        self._schedule_dispatch()
+
+        enqueued = self.clock()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                state.queued -= 1  # never dispatched
+            else:
+                self.release(agent)  # dispatched while being cancelled
+            raise
+        state.wait_total += self.clock() - enqueued
+
+    def release(self, agent: str) -> None:
+        state = self.agents.get(agent)
+        if state is not None:
+            state.in_flight -= 1
+            state.completed += 1
+        self.in_flight -= 1
+        self._schedule_dispatch()
+
+    def _admit(self, agent: str, state: _Agent, cost: float, now: float) -> None:
+        if state.queued >= self.max_queued_per_agent:
+            state.rate_limited += 1
+            raise RateLimited(agent, 1.0, f"{state.queued} requests already queued")
+        if self.rate > 0:
+            state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+            # A request costlier than the whole burst is admitted on a full bucket
+            needed = min(cost, self.burst)
+            if state.tokens < needed:
+                state.rate_limited += 1
+                raise RateLimited(agent, (needed - state.tokens) / self.rate, "token bucket empty")
+            state.tokens -= needed
+        state.admitted += 1
+
+    def _agent(self, agent: str, now: float) -> _Agent:
+        state = self.agents.get(agent)
+        if state is None:
+            if len(self.agents) >= self.max_agents:
+                self._evict()
+            state = self.agents[agent] = _Agent(self.burst, now)
+        else:
+            self.agents.move_to_end(agent)
+        state.last_seen = now
+        return state
+
+    def _evict(self) -> None:
+        # Least recently seen idle agents first; agents with queued or running requests stay
+        for agent, state in list(self.agents.items()):
+            if len(self.agents) < self.max_agents:
+                return
+            if not state.queued and not state.in_flight:
+                del self.agents[agent]
+                self._weights.pop(agent, None)
+
+    def _weight(self, agent: str, weight_for: Optional[Callable[[], float]], now: float) -> float:
+        if weight_for is None:
+            return 1.0
+        cached = self._weights.get(agent)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            weight = max(MIN_WEIGHT, weight_for())
+        except Exception as e:
+            print(f"[Governance Warning] Could not compute weight for agent '{agent}': {e}")
+            weight = 1.0
+        self._weights[agent] = (weight, now + self.weight_ttl)
+        return weight
+
+    def _schedule_dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._dispatch_loop is not loop:
+            self._dispatch_loop = loop
+            loop.call_soon(self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._dispatch_loop = None
+        while self.in_flight < self.capacity and self._queue:
+            _, _, start, agent, future = heapq.heappop(self._queue)
+            if future.done() or future.get_loop().is_closed():
+                continue  # caller went away
+            self.virtual_time = max(self.virtual_time, start)
+            state = self.agents[agent]
+            state.queued -= 1
+            state.in_flight += 1
+            self.in_flight += 1
+            future.set_result(None)
+
+    def metrics(self) -> SchedulerMetrics:
+        now = self.clock()
+        agents = {}
+        for agent, state in self.agents.items():
+            tokens = None
+            if self.rate > 0:
+                tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            served = state.admitted - state.queued
+            agents[agent] = AgentMetrics(
+                weight=state.weight,
+                tokens=tokens,
+                queued=state.queued,
+                inFlight=state.in_flight,
+                admitted=state.admitted,
+                rateLimited=state.rate_limited,
+                completed=state.completed,
+                meanWaitMs=state.wait_total / served * 1000 if served > 0 else 0.0
+            )
+        return SchedulerMetrics(
+            capacity=self.capacity,
+            inFlight=self.in_flight,
+            queued=sum(state.queued for state in self.agents.values()),
+            ratePerSecond=self.rate,
+            burst=self.burst,
+            maxQueuedPerAgent=self.max_queued_per_agent,
+            agents=agents
+        )
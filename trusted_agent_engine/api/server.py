@@ -1,39 +1,431 @@
-from fastapi import FastAPI, HTTPException, Body
-from pydantic import BaseModel
-from typing import Dict, Any
+from fastapi import FastAPI, HTTPException, Body, Request, Query, Response, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, List, Optional, Literal
 import uvicorn
+import codecs
+import json
+import zlib
+import time
+import random
 import os
+import asyncio
 
 from .. import TrustedGuard
-from ..engine.types import Proposal, Decision
+from ..engine.types import Proposal, Decision, HistoryPage
+from ..engine.context_bank import ContextBank, decode_cursor
+from ..engine.ledger_feed import LedgerFeed
+from ..engine.ledger_tail import LedgerTailer
+from ..engine.policy_watcher import PolicyRegistry, DEFAULT_MAX_WATCHERS
+from ..engine.diff_parser import DiffParser, count_file_lines
+from ..engine.anomaly_detector import DiffScanner
+from ..engine.profiler import ProfileCapture, DEFAULT_MAX_PROFILES
+from ..engine.shadow import ShadowMetrics, shadow_evaluator
+from .scheduler import FairScheduler, RateLimited, SchedulerMetrics, request_cost, credit_weight
 
 app = FastAPI(title="Trusted Governance API", version="2.0.0")
 
+# Verified policies stay resident and are hot-reloaded when their files change.
+# Workspaces preloaded with --workspace are always kept; of those first named by
+# a request, only the TRUSTED_ENGINE_MAX_WATCHED most recently used are.
+policy_registry = PolicyRegistry(
+    watch=os.environ.get("TRUSTED_ENGINE_WATCH_POLICIES", "1") != "0",
+    poll_interval=float(os.environ.get("TRUSTED_ENGINE_POLICY_POLL_INTERVAL", "1.0")),
+    max_watchers=int(os.environ.get("TRUSTED_ENGINE_MAX_WATCHED", str(DEFAULT_MAX_WATCHERS)))
+)
+
+# Fraction of evaluations to profile into <workspace>/.ai/profiles (0 disables sampling).
+# With TRUSTED_ENGINE_PROFILE_HEADER=1, a request can also ask for a profile with
+# `X-Trusted-Profile: 1`; off by default, since any client could then write files.
+# Only the newest TRUSTED_ENGINE_MAX_PROFILES profiles of a workspace are kept.
+PROFILE_SAMPLE_RATE = float(os.environ.get("TRUSTED_ENGINE_PROFILE_RATE", "0"))
+PROFILE_HEADER_ENABLED = os.environ.get("TRUSTED_ENGINE_PROFILE_HEADER", "0") == "1"
+MAX_PROFILES = int(os.environ.get("TRUSTED_ENGINE_MAX_PROFILES", str(DEFAULT_MAX_PROFILES)))
+
+# Per-agent token buckets and a weighted fair queue in front of evaluation.
+# Agents are identified by `X-Agent-Id`. Without it they fall back to the proposal
+# author, so all AI agents omitting the header share one 'ai-agent' bucket and
+# queue share; TRUSTED_ENGINE_REQUIRE_AGENT_ID=1 rejects such requests instead.
+# The header is taken as given: it must be set (or verified) by an authenticating
+# proxy in front of the server, since an agent free to pick it can rotate ids to
+# start over with a full bucket. State is kept for TRUSTED_ENGINE_MAX_AGENTS agents.
+scheduler = FairScheduler(
+    capacity=int(os.environ.get("TRUSTED_ENGINE_EVAL_CONCURRENCY", "1")),
+    rate=float(os.environ.get("TRUSTED_ENGINE_RATE_LIMIT", "0")),
+    burst=float(os.environ.get("TRUSTED_ENGINE_RATE_BURST", "20")),
+    max_queued_per_agent=int(os.environ.get("TRUSTED_ENGINE_MAX_QUEUED", "100")),
+    max_agents=int(os.environ.get("TRUSTED_ENGINE_MAX_AGENTS", "1024"))
+)
+# /v1/evaluate/stream: caps on the request body as sent and on the diff it
+# inflates to; larger uploads are answered with 413 as soon as they cross them
+MAX_STREAM_BODY_BYTES = int(os.environ.get("TRUSTED_ENGINE_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+MAX_STREAM_DIFF_BYTES = int(os.environ.get("TRUSTED_ENGINE_MAX_DIFF_BYTES", str(64 * 1024 * 1024)))
+
+REQUIRE_AGENT_ID = os.environ.get("TRUSTED_ENGINE_REQUIRE_AGENT_ID", "0") == "1"
+# /v1/evaluate/batch: most proposals accepted in one request
+MAX_BATCH_SIZE = int(os.environ.get("TRUSTED_ENGINE_MAX_BATCH", "256"))
+# AI agents of a workspace get a queue weight proportional to its credit score
+CREDIT_WEIGHTS = os.environ.get("TRUSTED_ENGINE_CREDIT_WEIGHTS", "1") != "0"
+
+# /v1/events: seconds between ledger polls for records of other workers (this
+# worker's own records are sent at once), and between keep-alive comments
+EVENTS_POLL_INTERVAL = float(os.environ.get("TRUSTED_ENGINE_EVENTS_POLL", "0.5"))
+EVENTS_KEEPALIVE = 15.0
+
+class ServerMetrics(SchedulerMetrics):
+    shadow: ShadowMetrics
+
 class EvaluationRequest(BaseModel):
     workspaceRoot: str
     proposal: Proposal
+    # Latency budget of this evaluation; overrides the policy's meta.deadline.totalMs
+    deadlineMs: Optional[float] = Field(default=None, gt=0)
+
+class BatchEvaluationRequest(BaseModel):
+    requests: List[EvaluationRequest] = Field(max_length=MAX_BATCH_SIZE)
+
+class BatchEvaluationResult(BaseModel):
+    status: int
+    decision: Optional[Decision] = None
+    error: Optional[str] = None
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchEvaluationResult]
+
+class StreamProposalMeta(BaseModel):
+    """
+    Proposal metadata for /v1/evaluate/stream, sent as JSON in the `X-Proposal-Meta`
+    header or as individual `X-*` headers. The diff itself is the request body.
+    """
+    workspaceRoot: str
+    id: str
+    author: Literal['ai-agent', 'human']
+    reasoning: str
+    files: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    timestamp: Optional[float] = None
+    # Counted from the end of the upload: the diff is scanned while it arrives
+    deadlineMs: Optional[float] = Field(default=None, gt=0)
+
+def _stream_meta_from_headers(request: Request) -> StreamProposalMeta:
+    headers = request.headers
+    if 'x-proposal-meta' in headers:
+        data = json.loads(headers['x-proposal-meta'])
+    else:
+        data = {
+            "workspaceRoot": headers.get('x-workspace-root'),
+            "id": headers.get('x-proposal-id'),
+            "author": headers.get('x-author'),
+            "reasoning": headers.get('x-reasoning', ''),
+        }
+        for key, header in (("files", 'x-files'), ("tags", 'x-tags')):
+            if header in headers:
+                data[key] = [v.strip() for v in headers[header].split(',') if v.strip()]
+        if 'x-deadline-ms' in headers:
+            data["deadlineMs"] = headers['x-deadline-ms']
+    return StreamProposalMeta.model_validate(data)
 
 @app.get("/health")
 async def health():
     return {"status": "ok", "engine": "trusted-agent-engine", "version": "2.0.0"}
 
-@app.post("/v1/evaluate", response_model=Decision)
-async def evaluate(request: EvaluationRequest = Body(...)):
+def _server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items())
+
+def _profile_for(workspace_root: str, proposal_id: str, requested: Optional[str]) -> Optional[ProfileCapture]:
+    if (PROFILE_HEADER_ENABLED and requested == '1') or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+        return ProfileCapture(workspace_root, proposal_id, MAX_PROFILES)
+    return None
+
+def _set_profile_header(response: Response, profile: Optional[ProfileCapture]) -> None:
+    if profile is not None and profile.path:
+        response.headers["X-Trusted-Profile"] = os.path.relpath(profile.path, profile.workspace_root)
+
+def _weight_source(engine, proposal: Proposal):
+    if not CREDIT_WEIGHTS or engine.liability is None or proposal.author != 'ai-agent':
+        return None
+    return lambda: credit_weight(engine.liability.get_credits())
+
+def _agent_key(agent_id: Optional[str], author: str) -> str:
+    if agent_id:
+        return agent_id
+    if REQUIRE_AGENT_ID:
+        raise HTTPException(status_code=400, detail="X-Agent-Id header is required")
+    return author
+
+def _rate_limited(e: RateLimited) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": f"{max(1, round(e.retry_after))}"})
+
+async def _evaluate_request(
+    request: EvaluationRequest,
+    timings: Optional[Dict[str, float]] = None,
+    profile: Optional[ProfileCapture] = None,
+    agent_id: Optional[str] = None
+) -> Decision:
     try:
         # Check if workspace exists
         if not os.path.exists(request.workspaceRoot):
             raise HTTPException(status_code=400, detail=f"Workspace root not found: {request.workspaceRoot}")
             
-        decision = await TrustedGuard.evaluate(request.workspaceRoot, request.proposal)
+        lookup_started = time.perf_counter()
+        engine = policy_registry.get(request.workspaceRoot)
+        lookup = time.perf_counter() - lookup_started
+
+        proposal = request.proposal
+        queued_at = time.perf_counter()
+        async with scheduler.slot(_agent_key(agent_id, proposal.author), request_cost(len(proposal.diff)),
+                                  _weight_source(engine, proposal)):
+            queue = time.perf_counter() - queued_at
+            decision = await TrustedGuard.evaluate(
+                request.workspaceRoot, proposal, engine=engine, timings=timings, profile=profile,
+                deadline_ms=request.deadlineMs, shadows=policy_registry.shadows(request.workspaceRoot),
+                in_thread=True
+            )
+        if timings is not None:
+            timings['policy'] += lookup
+            timings['queue'] = queue
         return decision
+    except RateLimited as e:
+        raise _rate_limited(e)
+    except HTTPException:
+        raise
     except Exception as e:
         # Log error in production
         print(f"[API Error] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def main():
-    port = int(os.environ.get("PORT", 3000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+@app.post("/v1/evaluate", response_model=Decision)
+async def evaluate(
+    response: Response,
+    request: EvaluationRequest = Body(...),
+    x_trusted_profile: Optional[str] = Header(None),
+    x_agent_id: Optional[str] = Header(None)
+):
+    timings: Dict[str, float] = {}
+    profile = _profile_for(request.workspaceRoot, request.proposal.id, x_trusted_profile)
+    decision = await _evaluate_request(request, timings, profile, x_agent_id)
+    # Stage breakdown for clients and load tests (see `trusted-engine bench-server`)
+    response.headers["Server-Timing"] = _server_timing(timings)
+    _set_profile_header(response, profile)
+    return decision
+
+@app.post("/v1/evaluate/batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(batch: BatchEvaluationRequest = Body(...), x_agent_id: Optional[str] = Header(None)):
+    """
+    Evaluates several proposals in one round trip; each result carries its own status.
+    Items are evaluated concurrently, admitted by the scheduler like single calls.
+    """
+    async def one(request: EvaluationRequest) -> BatchEvaluationResult:
+        try:
+            decision = await _evaluate_request(request, agent_id=x_agent_id)
+            return BatchEvaluationResult(status=200, decision=decision)
+        except HTTPException as e:
+            return BatchEvaluationResult(status=e.status_code, error=str(e.detail))
+
+    results = await asyncio.gather(*(one(request) for request in batch.requests))
+    return BatchEvaluationResponse(results=list(results))
+
+@app.post("/v1/evaluate/stream", response_model=Decision)
+async def evaluate_stream(request: Request, response: Response):
+    """
+    Evaluates a proposal whose diff is the raw (optionally gzip-encoded) request body.
+    Diff parsing and anomaly scanning run chunk by chunk while the body is uploaded,
+    so the diff is never JSON-escaped or buffered as a request document. The body
+    is capped (MAX_STREAM_BODY_BYTES sent, MAX_STREAM_DIFF_BYTES inflated).
+    """
+    try:
+        meta = _stream_meta_from_headers(request)
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid proposal metadata: {e}")
+
+    if not os.path.exists(meta.workspaceRoot):
+        raise HTTPException(status_code=400, detail=f"Workspace root not found: {meta.workspaceRoot}")
+    content_length = request.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > MAX_STREAM_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {MAX_STREAM_BODY_BYTES} bytes")
+
+    try:
+        engine = policy_registry.get(meta.workspaceRoot)
+
+        encoding = request.headers.get('content-encoding', '').lower()
+        inflater = zlib.decompressobj(wbits=31) if encoding == 'gzip' else None
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        parser = DiffParser()
+        scanner = DiffScanner()
+        # The diff as UTF-8, decoded into the proposal's string once at the end
+        body = bytearray()
+        sent = 0
+
+        def ingest(raw: bytes, final: bool = False) -> None:
+            if len(body) + len(raw) > MAX_STREAM_DIFF_BYTES:
+                raise HTTPException(status_code=413, detail=f"Diff exceeds {MAX_STREAM_DIFF_BYTES} bytes")
+            body.extend(raw)
+            text = decoder.decode(raw, final=final)
+            if text:
+                parser.feed(text)
+                scanner.feed(text)
+
+        async for raw in request.stream():
+            sent += len(raw)
+            if sent > MAX_STREAM_BODY_BYTES:
+                raise HTTPException(status_code=413, detail=f"Request body exceeds {MAX_STREAM_BODY_BYTES} bytes")
+            if inflater is None:
+                ingest(raw)
+                continue
+            # Never inflate more than the cap allows, however small the input
+            while raw:
+                ingest(inflater.decompress(raw, MAX_STREAM_DIFF_BYTES - len(body) + 1))
+                raw = inflater.unconsumed_tail
+        ingest(inflater.flush() if inflater else b'', final=True)
+
+        analysis = parser.finish()
+        files = meta.files if meta.files is not None else analysis.filesTouched
+        diff = body.decode('utf-8', errors='replace')
+        del body
+        proposal = Proposal(
+            id=meta.id,
+            timestamp=meta.timestamp or time.time(),
+            author=meta.author,
+            reasoning=meta.reasoning,
+            files=files,
+            diff=diff,
+            tags=meta.tags
+        )
+        del diff
+
+        file_stats = count_file_lines(proposal.diff) if engine.anomaly_detector.baselines is not None else None
+        anomaly_report = engine.anomaly_detector.report(scanner, files, file_stats, meta.author)
+        profile = _profile_for(meta.workspaceRoot, meta.id, request.headers.get('x-trusted-profile'))
+        agent = _agent_key(request.headers.get('x-agent-id'), meta.author)
+        async with scheduler.slot(agent, request_cost(len(proposal.diff)), _weight_source(engine, proposal)):
+            decision = await TrustedGuard.evaluate(
+                meta.workspaceRoot, proposal, engine=engine, anomaly_report=anomaly_report, profile=profile,
+                deadline_ms=meta.deadlineMs, shadows=policy_registry.shadows(meta.workspaceRoot),
+                in_thread=True
+            )
+        _set_profile_header(response, profile)
+        return decision
+    except RateLimited as e:
+        raise _rate_limited(e)
+    except HTTPException:
+        raise
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+    except Exception as e:
+        print(f"[API Error] {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/v1/metrics", response_model=ServerMetrics)
+async def metrics():
+    """
+    Rate limits and current queue state per agent, and shadow policy
+    disagreement statistics (this worker only).
+    """
+    return ServerMetrics(**dict(scheduler.metrics()), shadow=shadow_evaluator().metrics())
+
+@app.get("/v1/history", response_model=HistoryPage)
+async def history(
+    workspaceRoot: str,
+    since: Optional[float] = Query(None, description="Earliest time the trace was recorded (epoch seconds)"),
+    until: Optional[float] = Query(None, description="Latest time the trace was recorded (epoch seconds)"),
+    outcome: Optional[Literal['applied', 'rejected', 'pending']] = None,
+    riskLevel: Optional[Literal['low', 'medium', 'high']] = None,
+    ruleId: Optional[str] = None,
+    author: Optional[Literal['ai-agent', 'human']] = None,
+    file: Optional[str] = Query(None, description="Glob matched against the proposal's files"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    countOnly: bool = False
+):
+    if not os.path.exists(workspaceRoot):
+        raise HTTPException(status_code=400, detail=f"Workspace root not found: {workspaceRoot}")
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    bank = ContextBank.for_workspace(workspaceRoot)
+    return await bank.query(
+        since=since, until=until, outcome=outcome, risk_level=riskLevel, rule_id=ruleId,
+        author=author, file_glob=file, cursor=cursor, limit=limit, count_only=countOnly
+    )
+
+@app.get("/v1/events")
+async def events(
+    request: Request,
+    workspaceRoot: str,
+    since: str = Query("now", description="'now', or an event id to resume after ('0': from the start)"),
+    limit: Optional[int] = Query(None, ge=1, description="Close the stream after this many events"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-sent events of the decisions recorded to a workspace, across all
+    ledger shards. Each `decision` event's data is the trace JSON as stored and
+    its id a cursor of ledger byte offsets, so a reconnecting client (the
+    `Last-Event-ID` header) resumes exactly after the last event it received.
+    """
+    if not os.path.exists(workspaceRoot):
+        raise HTTPException(status_code=400, detail=f"Workspace root not found: {workspaceRoot}")
+    cursor = last_event_id or since
+    if cursor == "now":
+        tailer = LedgerTailer(workspaceRoot, from_end=True)
+    else:
+        try:
+            tailer = LedgerTailer.from_cursor(workspaceRoot, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    async def stream():
+        sent = 0
+        last_write = time.monotonic()
+        with LedgerFeed.for_workspace(workspaceRoot).subscription(max_queued=1) as wakeups:
+            while True:
+                for event in tailer.poll():
+                    yield b"id: " + tailer.cursor().encode() + b"\nevent: decision\ndata: " + event.record + b"\n\n"
+                    sent += 1
+                    if limit is not None and sent >= limit:
+                        return
+                    last_write = time.monotonic()
+                if await request.is_disconnected():
+                    return
+                try:
+                    await asyncio.wait_for(wakeups.get(), EVENTS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_write >= EVENTS_KEEPALIVE:
+                        yield b": keepalive\n\n"
+                        last_write = time.monotonic()
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def configured_workspaces() -> List[str]:
+    """Workspaces to preload, from TRUSTED_ENGINE_WORKSPACES (os.pathsep-separated)."""
+    value = os.environ.get("TRUSTED_ENGINE_WORKSPACES", "")
+    return [root for root in value.split(os.pathsep) if root]
+
+def main(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: int = 1,
+    workspaces: Optional[List[str]] = None
+):
+    host = host or os.environ.get("HOST", "0.0.0.0")
+    port = port if port is not None else int(os.environ.get("PORT", 3000))
+    workspaces = [os.path.abspath(root) for root in (workspaces or configured_workspaces())]
+
+    if workers > 1:
+        from .workers import WorkerSupervisor
+        WorkerSupervisor(
+            app, policy_registry, workspaces, host=host, port=port, workers=workers,
+            poll_interval=policy_registry.poll_interval, watch=policy_registry.watch
+        ).run()
+        return
+
+    # Verify policies up front so a broken policy fails at startup, not on the first request
+    policy_registry.preload(workspaces)
+    uvicorn.run(app, host=host, port=port)
 
 if __name__ == "__main__":
     main()
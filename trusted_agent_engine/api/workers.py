@@ -0,0 +1,227 @@
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+from typing import Dict, List, Optional
+import uvicorn
+
+from ..engine.context_bank import SHARD_ENV
+from ..engine.policy_watcher import PolicyRegistry
+
+# Seconds a stopping worker keeps its accepted connections open before shutting
+# them down, so that a request already on its way is served rather than dropped
+DRAIN_GRACE_SECONDS = 0.5
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that reports readiness to the supervisor through a pipe."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        os.write(self.ready_fd, b'1')
+        os.close(self.ready_fd)
+
+    async def shutdown(self, sockets=None) -> None:
+        # Stop accepting first: uvicorn closes connections with no request read yet
+        # right away, and a client that just connected would see it dropped
+        for server in self.servers:
+            server.close()
+        await asyncio.sleep(DRAIN_GRACE_SECONDS)
+        await super().shutdown(sockets=sockets)
+
+class WorkerSupervisor:
+    """
+    Pre-fork process manager for the governance API.
+
+    Policies of the given workspaces are loaded and verified once in the parent,
+    then inherited copy-on-write by every worker, so a worker serves its first
+    request without touching the policy files. Each worker slot appends to its own
+    ledger shard. When a preloaded policy changes (or on SIGHUP), the parent
+    verifies it and replaces the workers one at a time: the new worker is ready
+    before the old one drains, so capacity never drops. A policy that fails
+    verification is rejected and the current workers keep serving.
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: PolicyRegistry,
+        workspaces: List[str],
+        host: str = "0.0.0.0",
+        port: int = 3000,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        graceful_timeout: float = 30.0,
+        watch: bool = True
+    ):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("Multi-worker mode requires os.fork (POSIX only)")
+        self.app = app
+        self.registry = registry
+        self.workspaces = workspaces
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.graceful_timeout = graceful_timeout
+        self.watch = watch
+
+        self.sock: Optional[socket.socket] = None
+        self.slots: Dict[int, int] = {}  # slot -> pid
+        self.generation = 0
+        self._stopping = False
+        self._reload_requested = False
+
+    def run(self) -> None:
+        # No watcher threads in the parent: threads do not survive fork
+        self.registry.watch = False
+        self.registry.preload(self.workspaces)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.port = self.sock.getsockname()[1]
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for slot in range(self.workers):
+            pid = self._spawn(slot)
+            if pid is None:
+                self._shutdown()
+                raise RuntimeError(f"Worker {slot} failed to start")
+            self.slots[slot] = pid
+        print(f"[Governance] Serving on {self.host}:{self.port} with {self.workers} workers "
+              f"({len(self.workspaces)} preloaded workspace(s))")
+
+        try:
+            while not self._stopping:
+                time.sleep(self.poll_interval)
+                self._reap()
+                if self._stopping:
+                    break
+                changed = self.watch and self._check_policies()
+                if changed or self._reload_requested:
+                    self._reload_requested = False
+                    self.rolling_restart()
+        finally:
+            self._shutdown()
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+    def _check_policies(self) -> bool:
+        changed = False
+        for watcher in self.registry.watchers().values():
+            # Re-verifies on change; a rejected update keeps the last good engine
+            changed = watcher.reload() or changed
+        return changed
+
+    def rolling_restart(self) -> None:
+        self.generation += 1
+        print(f"[Governance] Rolling restart of {len(self.slots)} workers (generation {self.generation})")
+        for slot, old_pid in list(self.slots.items()):
+            if self._stopping:
+                return
+            pid = self._spawn(slot)
+            if pid is None:
+                # The old worker keeps serving; the next change or SIGHUP retries
+                print(f"[Governance Error] Replacement of worker {slot} failed to start; "
+                      f"keeping pid {old_pid} and stopping the rolling restart")
+                return
+            self.slots[slot] = pid
+            self._stop_worker(old_pid)
+
+    def _spawn(self, slot: int) -> Optional[int]:
+        """Forks a worker and waits until it serves. None if it died during startup."""
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            self._run_worker(slot, ready_write)  # never returns
+
+        os.close(ready_write)
+        # Wait for the worker's startup to finish before relying on it
+        try:
+            ready = os.read(ready_read, 1)
+        finally:
+            os.close(ready_read)
+        if ready != b'1':  # the pipe closed without a word: the worker exited
+            _, status = os.waitpid(pid, 0)
+            print(f"[Governance Error] Worker {slot} (pid {pid}) exited during startup with status {status}")
+            return None
+        return pid
+
+    def _run_worker(self, slot: int, ready_fd: int) -> None:
+        code = 0
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            # Stable per slot, so restarts reuse the slot's shard instead of adding files
+            os.environ[SHARD_ENV] = f"w{slot}"
+            # Workspaces first seen by this worker are watched by the worker itself
+            self.registry.watch = self.watch
+            config = uvicorn.Config(
+                self.app, log_level="warning", timeout_graceful_shutdown=self.graceful_timeout
+            )
+            _WorkerServer(config, ready_fd).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"[Governance Error] Worker {slot} crashed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop_worker(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.time() + self.graceful_timeout + 5
+        while time.time() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                return  # already reaped
+            if done:
+                return
+            time.sleep(0.05)
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    def _reap(self) -> None:
+        # Replace workers that died unexpectedly (or failed to start last time)
+        for slot in range(self.workers):
+            pid = self.slots.get(slot)
+            if pid is not None:
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if not done:
+                    continue
+                print(f"[Governance Alert] Worker {slot} (pid {pid}) exited with status {status}; respawning")
+                del self.slots[slot]
+            if self._stopping:
+                continue
+            pid = self._spawn(slot)
+            if pid is not None:
+                self.slots[slot] = pid
+
+    def _shutdown(self) -> None:
+        for pid in self.slots.values():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self.slots.values():
+            self._stop_worker(pid)
+        self.slots.clear()
+        if self.sock is not None:
+            self.sock.close()
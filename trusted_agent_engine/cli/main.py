@@ -6,6 +6,7 @@ import json
 import yaml
 import asyncio
 import argparse
+from datetime import datetime
 from typing import Optional, List
 from rich.console import Console
 from rich.table import Table
@@ -13,13 +14,16 @@ from rich.panel import Panel
 
 from ..engine.evaluator import PolicyEngine
 from ..engine.diff_parser import parse_unified_diff
-from ..engine.policy_loader import load_policy
+from ..engine.policy_loader import load_policy, load_workspace_bundle, load_compiled_workspace, POLICY_FILE
+from ..engine.policy_bundle import BUNDLE_FILE, compile_bundle, parse_bundle
 from ..engine.types import Proposal, DecisionTrace, PolicyConfig, ValueManifesto
-from ..engine.context_bank import ContextBank
+from ..engine.context_bank import ContextBank, ledger_shards
+from ..engine.ledger_index import LedgerIndex
+from ..engine.ledger_integrity import verify_ledger, verify_inclusion
 from ..engine.asset_manager import AssetManager
 from ..engine.self_audit import SelfAuditor
 from ..engine.sovereign import SovereignManager
-from ..api.server import main as run_server
+from ..engine.shadow import summarize_shadow_ledger
 
 console = Console()
 
@@ -48,15 +52,19 @@ async def check_command(args):
         with open(pub_key_path, 'r', encoding='utf-8') as f:
             public_key = f.read()
             
+    bundle = None
     try:
-        config = load_policy(policy_path, public_key=public_key)
+        # A current compiled bundle of the workspace policy skips YAML parsing
+        if args.policy == POLICY_FILE:
+            bundle = load_workspace_bundle(cwd, public_key)
+        config = bundle.policy if bundle else load_policy(policy_path, public_key=public_key)
     except Exception as e:
         console.print(f"[bold red]Error loading policy:[/bold red] {e}")
         sys.exit(1)
 
     manifesto_path = os.path.join(cwd, 'value_manifesto.yaml')
-    manifesto = None
-    if os.path.exists(manifesto_path):
+    manifesto = bundle.manifesto if bundle else None
+    if bundle is None and os.path.exists(manifesto_path):
         try:
             with open(manifesto_path, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f)
@@ -64,7 +72,7 @@ async def check_command(args):
         except Exception as e:
             console.print(f"[yellow]Warning: Failed to load value_manifesto.yaml: {e}[/yellow]")
 
-    engine = PolicyEngine(config, manifesto, cwd)
+    engine = PolicyEngine(config, manifesto, cwd, compiled=bundle.compiled if bundle else None)
     bank = ContextBank(cwd)
 
     diff = get_git_diff()
@@ -84,15 +92,22 @@ async def check_command(args):
         diff=diff
     )
 
-    decision = engine.evaluate(proposal)
+    if args.profile:
+        from ..engine.profiler import ProfileCapture
+        profile = ProfileCapture(cwd, proposal.id)
+        with profile:
+            decision = engine.evaluate(proposal)
+        console.print(f"[dim]Profile written to {os.path.relpath(profile.save(), cwd)}[/dim]")
+    else:
+        decision = engine.evaluate(proposal)
 
-    trace = DecisionTrace(
-        **decision.model_dump(),
-        proposal=proposal,
+    trace = DecisionTrace.from_decision(
+        decision,
+        proposal,
         outcome='applied' if decision.allowed else 'rejected'
     )
     
-    await bank.record(trace)
+    await bank.record(trace, learn=engine.anomaly_detector.baselines is not None)
     
     history = await bank.get_history()
     asset_manager = AssetManager()
@@ -109,11 +124,12 @@ async def check_command(args):
 
     result_text = "✅ ALLOWED" if decision.allowed else "❌ BLOCKED"
     result_color = "green" if decision.allowed else "red"
+    value_score = f"{decision.valueScore:.2f}" if decision.valueScore is not None else 'N/A'
     
     console.print(Panel(
         f"[bold {result_color}]Result: {result_text}[/bold {result_color}]\n"
         f"Risk Level: {decision.riskLevel.upper()}\n"
-        f"Value Score: {decision.valueScore:.2f if decision.valueScore is not None else 'N/A'}",
+        f"Value Score: {value_score}",
         title="Trusted Agent Policy Report",
         expand=False
     ))
@@ -168,7 +184,392 @@ def sign_command(args):
         
     console.print(f"[green]Signed {policy_path}. Signature saved to {sig_path}[/green]")
 
+def compile_command(args):
+    ai_dir = os.path.join(os.getcwd(), '.ai')
+    priv_key_path = os.path.join(ai_dir, 'sovereign.key')
+
+    if not os.path.exists(priv_key_path):
+        console.print("[bold red]Error: Private key not found. Run 'init' first.[/bold red]")
+        sys.exit(1)
+
+    policy_path = args.policy
+    if not os.path.exists(policy_path):
+        console.print(f"[bold red]Error: Policy file not found: {policy_path}[/bold red]")
+        sys.exit(1)
+
+    with open(priv_key_path, 'r', encoding='utf-8') as f:
+        private_key = f.read()
+    with open(policy_path, 'r', encoding='utf-8') as f:
+        policy_text = f.read()
+    manifesto_text = None
+    if os.path.exists(args.manifesto):
+        with open(args.manifesto, 'r', encoding='utf-8') as f:
+            manifesto_text = f.read()
+
+    try:
+        data = compile_bundle(policy_text, manifesto_text, private_key)
+        # Load it back the way consumers will, so a bundle that cannot serve is never written
+        bundle = parse_bundle(data)
+        PolicyEngine(bundle.policy, bundle.manifesto, compiled=bundle.compiled)
+    except Exception as e:
+        console.print(f"[bold red]Error compiling policy:[/bold red] {e}")
+        sys.exit(1)
+
+    output = args.output or os.path.join(os.path.dirname(policy_path), BUNDLE_FILE)
+    # Atomic replace: running servers watch this file
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, output)
+
+    console.print(f"[green]Compiled {policy_path} ({len(bundle.policy.rules)} rules"
+                  f"{', with manifesto' if bundle.manifesto else ''}) into {output} ({len(data)} bytes)[/green]")
+
+def replay_command(args):
+    from ..engine.replay import ReplayRunner, iter_ledger_records, iter_git_records
+    cwd = os.getcwd()
+    try:
+        # The candidate is replayed before it is signed, so no signature check here
+        config = load_policy(os.path.join(cwd, args.policy))
+        manifesto = None
+        manifesto_path = os.path.join(cwd, args.manifesto)
+        if os.path.exists(manifesto_path):
+            with open(manifesto_path, 'r', encoding='utf-8') as f:
+                manifesto = ValueManifesto.model_validate(yaml.safe_load(f))
+    except Exception as e:
+        console.print(f"[bold red]Error loading candidate policy:[/bold red] {e}")
+        sys.exit(1)
+
+    if args.source == 'git':
+        if not args.range:
+            console.print("[bold red]Error: --range is required for --source git[/bold red]")
+            sys.exit(1)
+        records = iter_git_records(args.range, cwd=cwd, author='ai-agent' if args.author == 'ai' else 'human')
+    else:
+        records = iter_ledger_records(cwd)
+
+    runner = ReplayRunner(config, manifesto, workers=args.workers, batch_size=args.batch_size, evaluation_mode=args.mode)
+    started = time.perf_counter()
+    report = runner.run(records)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(report.model_dump_json(indent=2))
+        return
+
+    console.print(Panel(
+        f"Replayed: {report.total} proposals in {elapsed:.2f}s\n"
+        f"Unchanged: {report.unchanged}\n"
+        f"[red]Newly blocked: {report.newlyBlocked}[/red]\n"
+        f"[green]Newly allowed: {report.newlyAllowed}[/green]\n"
+        f"Errors: {report.errors}",
+        title=f"What-if Replay: {args.policy}",
+        expand=False
+    ))
+
+    if report.perRule:
+        table = Table(title="Rule Trigger Changes")
+        table.add_column("Rule")
+        table.add_column("Newly triggered", justify="right")
+        table.add_column("No longer triggered", justify="right")
+        for rule_id, delta in sorted(report.perRule.items()):
+            table.add_row(rule_id, str(delta.added), str(delta.removed))
+        console.print(table)
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Accepts epoch seconds or an ISO 8601 timestamp."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+async def history_command(args):
+    bank = ContextBank(os.getcwd())
+    author = {'ai': 'ai-agent', 'human': 'human'}.get(args.author) if args.author else None
+    try:
+        page = await bank.query(
+            since=parse_time(args.since), until=parse_time(args.until), outcome=args.outcome,
+            risk_level=args.risk, rule_id=args.rule, author=author, file_glob=args.file,
+            cursor=args.cursor, limit=args.limit, count_only=args.count
+        )
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(page.model_dump_json(indent=2, exclude={'traces': {'__all__': {'proposal': {'diff'}}}}))
+        return
+    if args.count:
+        console.print(f"{page.count} matching decisions")
+        return
+
+    table = Table(title="Decision History")
+    table.add_column("Time")
+    table.add_column("Proposal")
+    table.add_column("Outcome")
+    table.add_column("Risk")
+    table.add_column("Rules")
+    table.add_column("Files")
+    for trace in page.traces:
+        table.add_row(
+            datetime.fromtimestamp(trace.proposal.timestamp).isoformat(timespec='seconds'),
+            trace.proposal.id,
+            trace.outcome,
+            trace.riskLevel,
+            ", ".join(v.ruleId for v in trace.violations),
+            ", ".join(trace.proposal.files[:3]) + (" ..." if len(trace.proposal.files) > 3 else "")
+        )
+    console.print(table)
+    if page.nextCursor:
+        console.print(f"More results: --cursor {page.nextCursor}")
+
+def verify_ledger_command(args):
+    cwd = os.getcwd()
+    public_key = None
+    pub_key_path = os.path.join(cwd, '.ai', 'sovereign.pub')
+    if os.path.exists(pub_key_path):
+        with open(pub_key_path, 'r', encoding='utf-8') as f:
+            public_key = f.read()
+
+    if args.prove is not None:
+        try:
+            proof = ContextBank(cwd, shard=args.shard).prove(args.prove)
+        except ValueError as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            sys.exit(1)
+        # Only a signed checkpoint can be checked against the sovereign key
+        valid = verify_inclusion(proof, public_key if proof.signature else None)
+        if args.json:
+            print(proof.model_dump_json(indent=2))
+        else:
+            signed = "signed checkpoint" if proof.signature else "unsigned tree head"
+            console.print(f"Record {proof.position} of shard '{proof.shard or 'main'}' against {signed} "
+                          f"(size {proof.treeSize}, root {proof.root[:16]}...): {len(proof.path)} hashes")
+            console.print("[green]Inclusion proof valid[/green]" if valid else "[bold red]Inclusion proof INVALID[/bold red]")
+        sys.exit(0 if valid else 1)
+
+    if args.checkpoint:
+        private_key = None
+        priv_key_path = os.path.join(cwd, '.ai', 'sovereign.key')
+        if os.path.exists(priv_key_path):
+            with open(priv_key_path, 'r', encoding='utf-8') as f:
+                private_key = f.read()
+        for shard, path in ledger_shards(cwd).items():
+            index = LedgerIndex.for_ledger(path)
+            with index.exclusive():
+                checkpoint = index.write_checkpoint(private_key)
+            if checkpoint:
+                console.print(f"Checkpointed shard '{shard or 'main'}' at {checkpoint.size} records"
+                              f"{' (signed)' if checkpoint.signature else ''}")
+
+    report = verify_ledger(cwd, public_key=public_key, workers=args.workers)
+    if args.json:
+        print(report.model_dump_json(indent=2))
+    else:
+        table = Table(title=f"Ledger Verification ({report.durationMs:.0f} ms)")
+        table.add_column("Shard")
+        table.add_column("Records", justify="right")
+        table.add_column("Checkpoints", justify="right")
+        table.add_column("Status")
+        for shard in report.shards:
+            status = "[green]OK[/green]" if shard.ok else (
+                f"[bold red]CORRUPT at position {shard.firstCorruptPosition}"
+                f"{f' (byte {shard.firstCorruptOffset})' if shard.firstCorruptOffset is not None else ''}"
+                f"[/bold red]: {shard.error}"
+            )
+            if shard.legacyRecords or shard.tornRecords:
+                status += f" [dim]({shard.legacyRecords} unchained, {shard.tornRecords} torn)[/dim]"
+            signatures = f"{shard.signedCheckpoints} signed"
+            if shard.unverifiedCheckpoints:
+                signatures += f", {shard.unverifiedCheckpoints} unverified"
+            table.add_row(shard.shard or "main", str(shard.records), f"{shard.checkpoints} ({signatures})", status)
+        console.print(table)
+    if not report.ok:
+        sys.exit(1)
+
+def analytics_command(args):
+    from ..engine.analytics import LedgerAnalytics, BUCKETS
+    try:
+        since, until = parse_time(args.since), parse_time(args.until)
+        analytics = LedgerAnalytics(os.getcwd(), rebuild=args.rebuild)
+    except (RuntimeError, ValueError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+
+    bucket = BUCKETS[args.bucket]
+    reports = {}
+    if args.report in ('summary', 'all'):
+        reports['summary'] = analytics.summary(since=since, until=until)
+    if args.report in ('directories', 'all'):
+        reports['directories'] = analytics.success_by_directory(depth=args.depth, since=since, until=until, limit=args.limit)
+    if args.report in ('rules', 'all'):
+        reports['rules'] = analytics.rule_hits_over_time(bucket=bucket, since=since, until=until, limit=args.limit)
+    if args.report in ('credits', 'all'):
+        reports['credits'] = analytics.credit_trajectory(bucket=bucket)
+
+    if args.json:
+        def dump(value):
+            return [v.model_dump() for v in value] if isinstance(value, list) else value.model_dump()
+        print(json.dumps({name: dump(value) for name, value in reports.items()}, indent=2))
+        return
+
+    if 'summary' in reports:
+        summary = reports['summary']
+        console.print(f"[bold]{summary.records} decisions[/bold] | outcomes {summary.outcomes} | "
+                      f"risk {summary.riskLevels} | authors {summary.authors}")
+    if 'directories' in reports:
+        table = Table(title="Success Rate by Directory")
+        table.add_column("Directory")
+        table.add_column("Decisions", justify="right")
+        table.add_column("Applied", justify="right")
+        table.add_column("Success", justify="right")
+        for d in reports['directories']:
+            table.add_row(d.directory, str(d.total), str(d.applied), f"{d.successRate:.0%}")
+        console.print(table)
+    if 'rules' in reports:
+        timeline = reports['rules']
+        table = Table(title=f"Rule Hits per {args.bucket}")
+        table.add_column("Rule")
+        table.add_column("Total", justify="right")
+        table.add_column(f"Last {min(7, len(timeline.buckets))} {args.bucket}s")
+        for series in timeline.rules:
+            table.add_row(series.ruleId, str(series.total), " ".join(str(c) for c in series.counts[-7:]))
+        console.print(table)
+    if 'credits' in reports:
+        table = Table(title=f"Credit Trajectory per {args.bucket}")
+        table.add_column("From")
+        table.add_column("Change", justify="right")
+        table.add_column("Credits", justify="right")
+        for point in reports['credits'][-(args.limit or 20):]:
+            table.add_row(datetime.fromtimestamp(point.time).isoformat(timespec='minutes'),
+                          f"{point.change:+.1f}", f"{point.credits:.1f}")
+        console.print(table)
+
+def bench_server_command(args):
+    from ..api.bench import run_benchmark, local_server, parse_mix
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+
+    def run(url: str, workspace_root: str):
+        return asyncio.run(run_benchmark(
+            url, workspace_root, concurrency=args.concurrency, rate=args.rate,
+            duration=args.duration if args.duration is not None or args.requests else 10.0,
+            max_requests=args.requests, mix=mix, warmup=args.warmup
+        ))
+
+    if args.url:
+        if not args.workspace:
+            console.print("[bold red]Error: --workspace is required with --url (a path on the server)[/bold red]")
+            sys.exit(1)
+        report = run(args.url, args.workspace)
+    else:
+        with local_server(os.path.abspath(args.workspace) if args.workspace else None) as (url, workspace_root):
+            report = run(url, workspace_root)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report.model_dump_json(indent=2))
+    if args.json:
+        print(report.model_dump_json(indent=2))
+        return
+
+    table = Table(title=f"Governance API Benchmark ({report.mode}, {report.requests} requests)")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Throughput", f"{report.throughputRps:.1f} req/s")
+    for name, value in report.latencyMs.items():
+        table.add_row(f"Latency {name}", f"{value:.2f} ms")
+    table.add_row("Error rate", f"{report.errorRate * 100:.2f}%")
+    for stage, stats in report.serverStages.items():
+        table.add_row(f"Server {stage} (mean / p95)", f"{stats.meanMs:.2f} / {stats.p95Ms:.2f} ms")
+    console.print(table)
+
+def bench_eval_command(args):
+    from ..api.bench import benchmark_evaluation
+    policy, manifesto = None, None
+    if args.workspace:
+        try:
+            policy, manifesto, _ = load_compiled_workspace(os.path.abspath(args.workspace))
+        except (FileNotFoundError, ValueError) as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            sys.exit(1)
+
+    report = benchmark_evaluation(policy, manifesto, kind=args.kind, iterations=args.iterations, warmup=args.warmup)
+    if args.json:
+        print(report.model_dump_json(indent=2))
+        return
+
+    table = Table(title=f"PolicyEngine Evaluation ({report.kind} proposal, {report.rules} rules, {report.iterations} runs)")
+    table.add_column("Variant")
+    table.add_column("Mean", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Peak alloc", justify="right")
+    table.add_column("Retained", justify="right")
+    for name, stats in report.variants.items():
+        table.add_row(name, f"{stats.meanUs:.1f} µs", f"{stats.p95Us:.1f} µs",
+                      f"{stats.peakBytes / 1024:.1f} KiB", f"{stats.retainedBytes / 1024:.1f} KiB")
+    console.print(table)
+
+def shadow_report_command(args):
+    stats = summarize_shadow_ledger(os.getcwd(), since=parse_time(args.since))
+    if args.json:
+        print(json.dumps([s.model_dump() for s in stats], indent=2))
+        return
+    if not stats:
+        console.print("[yellow]No shadow evaluations recorded. Add candidate policies as agent.shadow.<name>.yaml.[/yellow]")
+        return
+
+    for policy in stats:
+        compared = policy.evaluated - policy.errors
+        agreement = policy.agreed / compared if compared else 0.0
+        console.print(f"\n[bold]{policy.policy}[/bold]: {policy.evaluated} evaluated, "
+                      f"{agreement * 100:.1f}% agreement, {policy.errors} errors")
+        if policy.outcomes:
+            table = Table(title="Outcome changes (primary -> shadow)")
+            table.add_column("Change")
+            table.add_column("Count", justify="right")
+            for change, count in sorted(policy.outcomes.items(), key=lambda item: -item[1]):
+                table.add_row(change, str(count))
+            console.print(table)
+        if policy.perRule:
+            table = Table(title="Rule firing differences")
+            table.add_column("Rule")
+            table.add_column("Only shadow", justify="right")
+            table.add_column("Only primary", justify="right")
+            for rule_id, delta in sorted(policy.perRule.items(), key=lambda item: -(item[1].added + item[1].removed)):
+                table.add_row(rule_id, str(delta.added), str(delta.removed))
+            console.print(table)
+
+def profile_report_command(args):
+    from ..engine.profiler import list_profiles, aggregate_profiles
+    paths = args.profiles or list_profiles(os.getcwd())
+    if not paths:
+        console.print("[yellow]No profiles found. Capture some with `trusted-engine check --profile`.[/yellow]")
+        return
+
+    hot = aggregate_profiles(paths, sort=args.sort, limit=args.limit)
+    if args.json:
+        print(json.dumps([h.model_dump() for h in hot], indent=2))
+        return
+
+    table = Table(title=f"Hot functions across {len(paths)} profile(s), by {args.sort}")
+    table.add_column("Function")
+    table.add_column("Calls", justify="right")
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("Cumulative (ms)", justify="right")
+    table.add_column("Profiles", justify="right")
+    for h in hot:
+        table.add_row(h.function, str(h.calls), f"{h.totalTimeMs:.2f}", f"{h.cumulativeTimeMs:.2f}", str(h.profiles))
+    console.print(table)
+
 def main():
+    # Command modules (replay, analytics, bench, profiler) are imported by their
+    # command functions, so the choices below are spelled out rather than imported
     parser = argparse.ArgumentParser(description="Trusted Agent Engine CLI")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
@@ -176,6 +577,7 @@ def main():
     check_parser = subparsers.add_parser("check", help="Evaluate current changes")
     check_parser.add_argument("--policy", default="agent.policy.yaml", help="Path to policy file")
     check_parser.add_argument("--author", choices=["human", "ai"], default="human", help="Author of changes")
+    check_parser.add_argument("--profile", action="store_true", help="Profile the evaluation into .ai/profiles/")
 
     # Init
     init_parser = subparsers.add_parser("init", help="Initialize sovereign keys")
@@ -185,8 +587,99 @@ def main():
     sign_parser = subparsers.add_parser("sign", help="Sign a policy file")
     sign_parser.add_argument("policy", nargs="?", default="agent.policy.yaml", help="Path to policy file")
 
+    # Compile
+    compile_parser = subparsers.add_parser("compile", help="Compile a policy into a signed bundle")
+    compile_parser.add_argument("policy", nargs="?", default="agent.policy.yaml", help="Path to policy file")
+    compile_parser.add_argument("--manifesto", default="value_manifesto.yaml", help="Path to value manifesto (optional)")
+    compile_parser.add_argument("--output", help=f"Bundle path (default: {BUNDLE_FILE} next to the policy)")
+
+    # Replay
+    replay_parser = subparsers.add_parser("replay", help="Replay past proposals against a candidate policy")
+    replay_parser.add_argument("--policy", default="agent.policy.yaml", help="Path to candidate policy file")
+    replay_parser.add_argument("--manifesto", default="value_manifesto.yaml", help="Path to value manifesto")
+    replay_parser.add_argument("--source", choices=["ledger", "git"], default="ledger", help="Where to read proposals from")
+    replay_parser.add_argument("--range", help="Git revision range for --source git (e.g. main~100..main)")
+    replay_parser.add_argument("--author", choices=["human", "ai"], default="human", help="Author assumed for git commits")
+    replay_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    replay_parser.add_argument("--batch-size", type=int, default=256, help="Proposals per worker batch")
+    replay_parser.add_argument("--mode", choices=["full", "fail-fast"], default=None, help="Evaluation mode")
+    replay_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    # History
+    history_parser = subparsers.add_parser("history", help="Query recorded decisions")
+    history_parser.add_argument("--since", help="Recorded at or after this time (epoch seconds or ISO 8601)")
+    history_parser.add_argument("--until", help="Recorded at or before this time (epoch seconds or ISO 8601)")
+    history_parser.add_argument("--outcome", choices=["applied", "rejected", "pending"], help="Filter by outcome")
+    history_parser.add_argument("--risk", choices=["low", "medium", "high"], help="Filter by risk level")
+    history_parser.add_argument("--rule", help="Filter by violated rule id")
+    history_parser.add_argument("--author", choices=["human", "ai"], help="Filter by proposal author")
+    history_parser.add_argument("--file", help="Glob matched against touched files")
+    history_parser.add_argument("--cursor", help="Cursor returned by the previous page")
+    history_parser.add_argument("--limit", type=int, default=20, help="Page size")
+    history_parser.add_argument("--count", action="store_true", help="Only count matching decisions")
+    history_parser.add_argument("--json", action="store_true", help="Print the page as JSON")
+
+    # Verify ledger
+    verify_parser = subparsers.add_parser("verify-ledger", help="Verify the ledger hash chain and Merkle checkpoints")
+    verify_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    verify_parser.add_argument("--checkpoint", action="store_true", help="Checkpoint every ledger file before verifying")
+    verify_parser.add_argument("--prove", type=int, default=None, metavar="POSITION",
+                               help="Print and check an inclusion proof for one record instead")
+    verify_parser.add_argument("--shard", default="", help="Ledger shard for --prove (default: main ledger)")
+    verify_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    # Analytics
+    analytics_parser = subparsers.add_parser("analytics", help="Governance reports over the columnar ledger cache")
+    analytics_parser.add_argument("--report", choices=["summary", "directories", "rules", "credits", "all"],
+                                  default="all", help="Report to compute")
+    analytics_parser.add_argument("--bucket", choices=["hour", "day", "week"], default="day", help="Time bucket for rules/credits")
+    analytics_parser.add_argument("--depth", type=int, default=None, help="Roll directories up to this many components")
+    analytics_parser.add_argument("--since", help="Start time (epoch seconds or ISO 8601)")
+    analytics_parser.add_argument("--until", help="End time (epoch seconds or ISO 8601)")
+    analytics_parser.add_argument("--limit", type=int, default=20, help="Rows per report")
+    analytics_parser.add_argument("--rebuild", action="store_true", help="Re-export the column cache from scratch")
+    analytics_parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+
+    # Bench
+    bench_parser = subparsers.add_parser("bench-server", help="Load-test the governance API")
+    bench_parser.add_argument("--url", help="Target server (default: start one on localhost)")
+    bench_parser.add_argument("--workspace", help="Workspace whose policy to load: with --url, its path on that server; otherwise its policy files are copied into a throwaway workspace")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests")
+    bench_parser.add_argument("--rate", type=float, default=None, help="Target request rate (req/s); open loop")
+    bench_parser.add_argument("--duration", type=float, default=None, help="Run time in seconds (default: 10, unbounded with only --requests)")
+    bench_parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    bench_parser.add_argument("--mix", help="Proposal mix, e.g. small=70,large=10,docs=10,obfuscated=5,out-of-scope=5")
+    bench_parser.add_argument("--warmup", type=int, default=10, help="Warm-up requests excluded from results")
+    bench_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    bench_parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    # Evaluation microbenchmark
+    bench_eval_parser = subparsers.add_parser("bench-eval", help="Microbenchmark a single in-process evaluation")
+    bench_eval_parser.add_argument("--workspace", help="Workspace whose policy to evaluate (default: the benchmark policy)")
+    bench_eval_parser.add_argument("--kind", choices=["small", "large", "docs", "obfuscated", "out-of-scope"], default="small", help="Synthetic proposal kind")
+    bench_eval_parser.add_argument("--iterations", type=int, default=2000, help="Timed evaluations per variant")
+    bench_eval_parser.add_argument("--warmup", type=int, default=100, help="Untimed evaluations per variant")
+    bench_eval_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    # Profile report
+    profile_parser = subparsers.add_parser("profile-report", help="Aggregate hot functions across captured profiles")
+    profile_parser.add_argument("profiles", nargs="*", help="Profile files (default: .ai/profiles/*.prof)")
+    profile_parser.add_argument("--sort", choices=["tottime", "cumtime", "calls"], default="tottime", help="Ranking column")
+    profile_parser.add_argument("--limit", type=int, default=20, help="Number of functions to show")
+    profile_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    # Shadow report
+    shadow_parser = subparsers.add_parser("shadow-report", help="Disagreements of shadow policies with the primary policy")
+    shadow_parser.add_argument("--since", help="Only evaluations since this time (ISO 8601 or epoch seconds)")
+    shadow_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
     # Serve
     serve_parser = subparsers.add_parser("serve", help="Start governance API server")
+    serve_parser.add_argument("--host", default=None, help="Bind address (default: $HOST or 0.0.0.0)")
+    serve_parser.add_argument("--port", type=int, default=None, help="Port (default: $PORT or 3000)")
+    serve_parser.add_argument("--workers", type=int, default=1, help="Worker processes (pre-forked, policies shared)")
+    serve_parser.add_argument("--workspace", action="append", default=None,
+                              help="Workspace whose policy is preloaded before forking (repeatable)")
     
     args = parser.parse_args()
 
@@ -196,11 +689,30 @@ def main():
         init_command(args)
     elif args.command == "sign":
         sign_command(args)
+    elif args.command == "compile":
+        compile_command(args)
+    elif args.command == "replay":
+        replay_command(args)
+    elif args.command == "history":
+        asyncio.run(history_command(args))
+    elif args.command == "verify-ledger":
+        verify_ledger_command(args)
+    elif args.command == "analytics":
+        analytics_command(args)
+    elif args.command == "bench-server":
+        bench_server_command(args)
+    elif args.command == "bench-eval":
+        bench_eval_command(args)
+    elif args.command == "profile-report":
+        profile_report_command(args)
+    elif args.command == "shadow-report":
+        shadow_report_command(args)
     elif args.command == "serve":
-        run_server()
+        from ..api.server import main as run_server
+        run_server(host=args.host, port=args.port, workers=args.workers, workspaces=args.workspace)
     else:
         # Default to check if no command provided
-        asyncio.run(check_command(argparse.Namespace(policy="agent.policy.yaml", author="human")))
+        asyncio.run(check_command(argparse.Namespace(policy="agent.policy.yaml", author="human", profile=False)))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,205 @@
+import math
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .columnar import ColumnarLedger, ColumnPart, COMPLETION_CODE, OUTCOMES, RISK_LEVELS, AUTHORS, np, require_numpy
+
+BUCKETS = {'hour': 3600.0, 'day': 86400.0, 'week': 7 * 86400.0}
+INITIAL_CREDITS = 100.0  # see LiabilityManager
+
+class LedgerSummary(BaseModel):
+    records: int
+    first: Optional[float]
+    last: Optional[float]
+    outcomes: Dict[str, int]
+    riskLevels: Dict[str, int]
+    authors: Dict[str, int]
+
+class DirectoryStats(BaseModel):
+    directory: str
+    total: int
+    applied: int
+    successRate: float
+
+class RuleSeries(BaseModel):
+    ruleId: str
+    total: int
+    counts: List[int]  # per bucket
+
+class RuleTimeline(BaseModel):
+    bucketSeconds: float
+    buckets: List[float]  # bucket start times
+    rules: List[RuleSeries]
+
+class CreditPoint(BaseModel):
+    time: float  # bucket start
+    change: float
+    credits: float  # balance at the end of the bucket
+
+def _row_mask(part: ColumnPart, since: Optional[float], until: Optional[float]) -> Optional['np.ndarray']:
+    # Decisions only: a background completion repeats the deadline decision it completes
+    mask = part.outcome != COMPLETION_CODE
+    if since is None and until is None:
+        return None if mask.all() else mask
+    timestamps = part.timestamp
+    if since is not None:
+        mask &= timestamps >= since
+    if until is not None:
+        mask &= timestamps <= until
+    return mask
+
+def _ragged(part: ColumnPart, name: str, mask: Optional['np.ndarray']) -> Tuple['np.ndarray', 'np.ndarray']:
+    """(row of each code, code) of a CSR column, restricted to the masked rows."""
+    offsets = getattr(part, f'{name}_offsets')
+    codes = getattr(part, f'{name}_codes')
+    rows = np.repeat(np.arange(part.rows, dtype=np.int64), np.diff(offsets))
+    if mask is not None:
+        keep = mask[rows]
+        return rows[keep], codes[keep]
+    return rows, np.asarray(codes)
+
+class LedgerAnalytics:
+    """
+    Governance reports computed with vectorized group-bys over the columnar
+    ledger cache. Parts are processed one at a time from memory-mapped files,
+    so memory stays bounded by the part size, not by the ledger size.
+    """
+
+    def __init__(self, workspace_root: str, update: bool = True, rebuild: bool = False):
+        require_numpy()
+        self.columns = ColumnarLedger(workspace_root)
+        if update or rebuild:
+            self.columns.update(rebuild=rebuild)
+        self.dictionaries = self.columns.dictionaries()
+
+    def summary(self, since: Optional[float] = None, until: Optional[float] = None) -> LedgerSummary:
+        outcomes = np.zeros(len(OUTCOMES), dtype=np.int64)
+        risks = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        authors = np.zeros(len(AUTHORS), dtype=np.int64)
+        first, last = math.inf, -math.inf
+        for part in self.columns.parts():
+            mask = _row_mask(part, since, until)
+            select = (lambda a: a[mask]) if mask is not None else np.asarray
+            timestamps = select(part.timestamp)
+            if not len(timestamps):
+                continue
+            first, last = min(first, float(timestamps.min())), max(last, float(timestamps.max()))
+            outcomes += np.bincount(select(part.outcome), minlength=len(OUTCOMES))
+            risks += np.bincount(select(part.risk), minlength=len(RISK_LEVELS))
+            authors += np.bincount(select(part.author), minlength=len(AUTHORS))
+        return LedgerSummary(
+            records=int(outcomes.sum()),
+            first=first if first != math.inf else None,
+            last=last if last != -math.inf else None,
+            outcomes=dict(zip(OUTCOMES, outcomes.tolist())),
+            riskLevels=dict(zip(RISK_LEVELS, risks.tolist())),
+            authors=dict(zip(AUTHORS, authors.tolist()))
+        )
+
+    def success_by_directory(
+        self,
+        depth: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[DirectoryStats]:
+        """
+        Share of applied decisions per directory touched, busiest first. With
+        `depth`, directories are rolled up to their first `depth` components;
+        a decision counts once per (rolled-up) directory.
+        """
+        names = self.dictionaries['directories']
+        if depth is not None:
+            rolled_names = sorted({'/'.join(n.split('/')[:depth]) for n in names})
+            rolled_code = {n: i for i, n in enumerate(rolled_names)}
+            mapping = np.array([rolled_code['/'.join(n.split('/')[:depth])] for n in names], dtype=np.int64)
+            names = rolled_names
+        else:
+            mapping = None
+
+        size = len(names)
+        totals = np.zeros(size, dtype=np.int64)
+        applied = np.zeros(size, dtype=np.int64)
+        applied_code = OUTCOMES.index('applied')
+        for part in self.columns.parts():
+            rows, codes = _ragged(part, 'dir', _row_mask(part, since, until))
+            codes = codes.astype(np.int64)
+            if mapping is not None:
+                codes = mapping[codes]
+                # Files in sibling directories may roll up to the same one
+                pairs = np.unique(rows * size + codes)
+                rows, codes = pairs // size, pairs % size
+            totals += np.bincount(codes, minlength=size)
+            applied += np.bincount(codes, weights=part.outcome[rows] == applied_code, minlength=size).astype(np.int64)
+
+        order = np.argsort(-totals, kind='stable')
+        order = order[totals[order] > 0][:limit]
+        return [
+            DirectoryStats(
+                directory=names[i], total=int(totals[i]), applied=int(applied[i]),
+                successRate=float(applied[i] / totals[i])
+            )
+            for i in order
+        ]
+
+    def rule_hits_over_time(
+        self,
+        bucket: float = BUCKETS['day'],
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> RuleTimeline:
+        """Decisions each rule fired on, per time bucket (aligned to the epoch), most frequent rules first."""
+        keys: List['np.ndarray'] = []
+        for part in self.columns.parts():
+            rows, codes = _ragged(part, 'rule', _row_mask(part, since, until))
+            if not len(rows):
+                continue
+            buckets = np.floor(part.timestamp[rows] / bucket).astype(np.int64)
+            # Pre-aggregate per part: only distinct (bucket, rule) pairs are kept
+            pairs, counts = np.unique(np.stack([buckets, codes.astype(np.int64)]), axis=1, return_counts=True)
+            keys.append(np.vstack([pairs, counts]))
+        if not keys:
+            return RuleTimeline(bucketSeconds=bucket, buckets=[], rules=[])
+
+        merged = np.concatenate(keys, axis=1)
+        first, last = int(merged[0].min()), int(merged[0].max())
+        width = last - first + 1
+        rule_codes, rule_index = np.unique(merged[1], return_inverse=True)
+        matrix = np.zeros((len(rule_codes), width), dtype=np.int64)
+        np.add.at(matrix, (rule_index, merged[0] - first), merged[2])
+
+        totals = matrix.sum(axis=1)
+        order = np.argsort(-totals, kind='stable')[:limit]
+        names = self.dictionaries['rules']
+        return RuleTimeline(
+            bucketSeconds=bucket,
+            buckets=((np.arange(width) + first) * bucket).tolist(),
+            rules=[
+                RuleSeries(ruleId=names[rule_codes[i]], total=int(totals[i]), counts=matrix[i].tolist())
+                for i in order
+            ]
+        )
+
+    def credit_trajectory(self, bucket: float = BUCKETS['day'], initial: float = INITIAL_CREDITS) -> List[CreditPoint]:
+        """Agent credit balance over time, replayed from the charged credit changes (by record time)."""
+        sums: Dict[int, float] = {}
+        for part in self.columns.parts():
+            credit = np.asarray(part.credit)
+            charged = ~np.isnan(credit)
+            if not charged.any():
+                continue
+            buckets = np.floor(part.recorded_at[charged] / bucket).astype(np.int64)
+            keys, inverse = np.unique(buckets, return_inverse=True)
+            totals = np.bincount(inverse, weights=credit[charged].astype(np.float64))
+            for key, total in zip(keys.tolist(), totals.tolist()):
+                sums[key] = sums.get(key, 0.0) + total
+        if not sums:
+            return []
+
+        keys = np.array(sorted(sums), dtype=np.int64)
+        changes = np.array([sums[k] for k in keys.tolist()])
+        balances = initial + np.cumsum(changes)
+        return [
+            CreditPoint(time=float(k * bucket), change=float(c), credits=float(b))
+            for k, c, b in zip(keys.tolist(), changes.tolist(), balances.tolist())
+        ]
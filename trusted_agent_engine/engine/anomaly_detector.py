@@ -1,6 +1,114 @@
+import os
 import re
-from typing import List
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
 from .types import Proposal, AnomalyReport
+from .diff_parser import count_file_lines
+from .baselines import BaselineStore, directory_samples
+from .deadline import Deadline
+
+HEX_PATTERN = re.compile(r'[0-9a-fA-F]{50,}')
+BASE64_PATTERN = re.compile(r'[A-Za-z0-9+/]{100,}={0,2}')
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7F]')
+
+# Longest minimum run of the blob patterns, minus one: a run spanning a chunk
+# boundary is always fully contained in this overlap plus the next chunk.
+CHUNK_OVERLAP = 99
+NON_ASCII_LIMIT = 20
+
+DEFAULT_PARALLEL_THRESHOLD = 4 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_BASELINE_MIN_SAMPLES = 20
+DEFAULT_BASELINE_Z_THRESHOLD = 3.0
+
+class DiffScanner:
+    """
+    Incremental scan of diff text for the anomaly signals.
+    Chunks may be split anywhere; results equal a scan of the whole text.
+    """
+
+    def __init__(self):
+        self.newlines = 0
+        self.has_encoded_blob = False
+        self.non_ascii = 0
+        self._carry = ''
+
+    @property
+    def line_count(self) -> int:
+        return self.newlines + 1
+
+    @property
+    def is_obfuscated(self) -> bool:
+        return self.has_encoded_blob or self.non_ascii > NON_ASCII_LIMIT
+
+    def feed(self, chunk: str) -> None:
+        self.newlines += chunk.count('\n')
+
+        # Only count what matters: once over the limit the answer is known
+        if self.non_ascii <= NON_ASCII_LIMIT:
+            for _ in NON_ASCII_PATTERN.finditer(chunk):
+                self.non_ascii += 1
+                if self.non_ascii > NON_ASCII_LIMIT:
+                    break
+
+        if not self.has_encoded_blob:
+            window = self._carry + chunk if self._carry else chunk
+            if HEX_PATTERN.search(window) or BASE64_PATTERN.search(window):
+                self.has_encoded_blob = True
+            self._carry = window[-CHUNK_OVERLAP:]
+
+def split_diff(diff: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits a diff into (start, end) ranges of about `chunk_size` characters,
+    preferring file boundaries, then hunk boundaries, then line boundaries.
+    """
+    ranges: List[Tuple[int, int]] = []
+    start, length = 0, len(diff)
+    while start < length:
+        end = start + chunk_size
+        if end >= length:
+            ranges.append((start, length))
+            break
+        for marker in ('\ndiff --git ', '\n@@', '\n'):
+            cut = diff.rfind(marker, start + chunk_size // 2, end)
+            if cut != -1:
+                end = cut + 1
+                break
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def _scan_chunk(text: str, overlap: int) -> Tuple[int, bool, int]:
+    # The first `overlap` chars belong to the previous chunk: they only extend
+    # blob runs that cross the boundary and are not counted again.
+    scanner = DiffScanner()
+    scanner._carry = text[:overlap]
+    scanner.feed(text[overlap:])
+    return scanner.newlines, scanner.has_encoded_blob, scanner.non_ascii
+
+# Start method of the engine's process pools. Not fork: the server runs policy
+# watchers, to_thread workers and background threads, and a child forked while
+# one of them holds a lock would deadlock on it
+PROCESS_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# One pool per `meta.anomalyScan.workers` value (None: CPU count), shared by
+# every engine asking for that many workers
+_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+def _shared_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers, mp_context=PROCESS_POOL_CONTEXT)
+            atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+        return pool
 
 class AnomalyDetector:
     """
@@ -8,47 +116,173 @@ class AnomalyDetector:
     1. Size Variance: Flags unusually large diffs.
     2. Obfuscation/Entropy: Detects potential code obfuscation.
     3. Complexity: Checks for excessive number of files modified.
+
+    Diffs larger than `parallel_threshold` characters are split into chunks that
+    are scanned on a process pool; the merged result equals the serial scan.
+
+    With `baselines`, size and dispersion are scored by z-score against what is
+    normal for the touched directories and the author kind ('ai-agent' or
+    'human'). The fixed thresholds only
+    apply until a baseline has `baseline_min_samples` observations.
     """
-    
-    def detect(self, proposal: Proposal) -> AnomalyReport:
+
+    def __init__(
+        self,
+        parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        baselines: Optional[BaselineStore] = None,
+        baseline_min_samples: int = DEFAULT_BASELINE_MIN_SAMPLES,
+        baseline_z_threshold: float = DEFAULT_BASELINE_Z_THRESHOLD
+    ):
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = max(chunk_size, 2 * CHUNK_OVERLAP)
+        self.max_workers = max_workers
+        self._executor = executor
+        self.baselines = baselines
+        self.baseline_min_samples = baseline_min_samples
+        self.baseline_z_threshold = baseline_z_threshold
+
+    def detect(self, proposal: Proposal, deadline: Optional[Deadline] = None) -> AnomalyReport:
+        """With a `deadline`, raises DeadlineExceeded once the scan or anomaly stage is over budget."""
+        if deadline is not None:
+            deadline.enter('scan')
+        scanner = self.scan(proposal.diff, deadline)
+        if deadline is not None:
+            deadline.enter('anomaly')
+        # Per-file line counts are only needed to score against baselines
+        file_stats = count_file_lines(proposal.diff) if self.baselines is not None else None
+        if deadline is not None:
+            deadline.check()
+        return self.report(scanner, proposal.files, file_stats, proposal.author)
+
+    def scan(self, diff: str, deadline: Optional[Deadline] = None) -> DiffScanner:
+        scanner = DiffScanner()
+        if len(diff) < self.parallel_threshold:
+            if deadline is None:
+                scanner.feed(diff)
+                return scanner
+            # Chunked so that the budget is checked while scanning
+            for start in range(0, len(diff), self.chunk_size):
+                deadline.check()
+                scanner.feed(diff[start:start + self.chunk_size])
+            return scanner
+
+        executor = self._executor or _shared_pool(self.max_workers)
+        futures = []
+        for start, end in split_diff(diff, self.chunk_size):
+            overlap_start = max(0, start - CHUNK_OVERLAP)
+            futures.append(executor.submit(_scan_chunk, diff[overlap_start:end], start - overlap_start))
+
+        for future in futures:
+            try:
+                newlines, has_encoded_blob, non_ascii = future.result(
+                    timeout=deadline.remaining() if deadline is not None else None
+                )
+            except FutureTimeout:
+                for pending in futures:
+                    pending.cancel()
+                deadline.check()
+                raise
+            scanner.newlines += newlines
+            scanner.has_encoded_blob = scanner.has_encoded_blob or has_encoded_blob
+            scanner.non_ascii += non_ascii
+        return scanner
+
+    def report(
+        self,
+        scanner: DiffScanner,
+        files: List[str],
+        file_stats: Optional[Dict[str, List[int]]] = None,
+        author: Optional[str] = None
+    ) -> AnomalyReport:
+        """
+        Scores a completed scan. Streaming callers feed a DiffScanner chunk by chunk
+        and call this once the diff is complete. `file_stats` (see
+        `count_file_lines`) and `author` enable baseline scoring.
+        """
         reasons: List[str] = []
         score = 0.0
 
+        size_z = files_z = None
+        if self.baselines is not None and file_stats is not None:
+            size_z, files_z = self._baseline_scores(files, file_stats, author)
+
         # 1. Size Detection
-        lines = proposal.diff.split('\n')
-        line_count = len(lines)
-        if line_count > 500:
+        line_count = scanner.line_count
+        if size_z is not None:
+            z, where = size_z
+            if z >= self.baseline_z_threshold:
+                score += 0.4
+                reasons.append(f"Diff size is {z:.1f}σ above the baseline for {where}. Potential smuggling.")
+        elif line_count > 500:
             score += 0.4
             reasons.append(f"Unusually large diff ({line_count} lines). Potential smuggling.")
 
         # 2. Obfuscation Analysis
-        if self._detect_obfuscation(proposal.diff):
+        if scanner.is_obfuscated:
             score += 0.6
             reasons.append("Possible code obfuscation or binary smuggling detected.")
 
         # 3. File Dispersion
-        if len(proposal.files) > 10:
+        if files_z is not None:
+            z, where = files_z
+            if z >= self.baseline_z_threshold:
+                score += 0.3
+                reasons.append(f"Touches {len(files)} files, {z:.1f}σ above the baseline for {where}. High collateral risk.")
+        elif len(files) > 10:
             score += 0.3
-            reasons.append(f"Too many files touched ({len(proposal.files)}). High collateral risk.")
+            reasons.append(f"Too many files touched ({len(files)}). High collateral risk.")
 
+        baseline_z = [pair[0] for pair in (size_z, files_z) if pair is not None]
         return AnomalyReport(
             isAnomaly=score >= 0.7,
             score=min(1.0, score),
-            reasons=reasons
+            reasons=reasons,
+            baselineZ=max(baseline_z) if baseline_z else None,
+            fileStats=file_stats
         )
 
-    def _detect_obfuscation(self, diff: str) -> bool:
-        # Check for long hex or base64 patterns
-        hex_pattern = r'[0-9a-fA-F]{50,}'
-        base64_pattern = r'[A-Za-z0-9+/]{100,}={0,2}'
-        
-        if re.search(hex_pattern, diff) or re.search(base64_pattern, diff):
-            return True
-
-        # Check for excessive non-ASCII characters
-        non_ascii_pattern = r'[^\x00-\x7F]'
-        matches = re.findall(non_ascii_pattern, diff)
-        if matches and len(matches) > 20:
-            return True
-
-        return False
+    def _baseline_scores(
+        self,
+        files: List[str],
+        file_stats: Dict[str, List[int]],
+        author: Optional[str]
+    ) -> Tuple[Optional[Tuple[float, str]], Optional[Tuple[float, str]]]:
+        """
+        Highest (z-score, baseline name) for size and for file count, over the
+        touched directories and the author. None when no baseline is learned yet.
+        """
+        samples = directory_samples(files, file_stats)
+        size_z: Optional[Tuple[float, str]] = None
+        files_z: Optional[Tuple[float, str]] = None
+
+        def consider(stats, sample, where):
+            nonlocal size_z, files_z
+            name = f"{where} (n={stats['files'].count})"
+            z = max(stats['added'].zscore(sample[0]), stats['removed'].zscore(sample[1]))
+            if size_z is None or z > size_z[0]:
+                size_z = (z, name)
+            z = stats['files'].zscore(sample[2])
+            if files_z is None or z > files_z[0]:
+                files_z = (z, name)
+
+        seen = set()
+        leaves = {os.path.dirname(path) for path in set(files) | set(file_stats)}
+        for leaf in leaves:
+            found = self.baselines.baseline_for(leaf, self.baseline_min_samples)
+            if found is None or found[0] in seen:
+                continue
+            directory, stats = found
+            seen.add(directory)
+            consider(stats, samples[directory], directory)
+
+        if author is not None:
+            stats = self.baselines.author_baseline(author, self.baseline_min_samples)
+            if stats is not None:
+                added = sum(counts[0] for counts in file_stats.values())
+                removed = sum(counts[1] for counts in file_stats.values())
+                consider(stats, (added, removed, len(files)), f"author {author}")
+
+        return size_z, files_z
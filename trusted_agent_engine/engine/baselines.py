@@ -0,0 +1,252 @@
+import os
+import json
+import math
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from .types import DecisionTrace
+from .diff_parser import count_file_lines
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are POSIX-only
+    fcntl = None
+
+BASELINE_FILE = 'baselines.json'
+# Samples since the last snapshot, one JSON line each; folded into the
+# snapshot once the journal grows past JOURNAL_COMPACT_BYTES
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_COMPACT_BYTES = 1 << 20
+METRICS = ('added', 'removed', 'files')
+
+# (lines added, lines removed, files touched)
+Sample = Tuple[int, int, int]
+
+class RunningStats:
+    """Welford's online mean/variance: O(1) update, three numbers of state."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def zscore(self, value: float, min_std: float = 1.0) -> float:
+        # The floor keeps a perfectly uniform history from making every change infinite
+        return (value - self.mean) / max(self.std, min_std)
+
+    def to_list(self) -> List[float]:
+        return [self.count, round(self.mean, 6), round(self.m2, 6)]
+
+def _ancestors(directory: str) -> Iterator[str]:
+    while directory:
+        yield directory
+        directory = os.path.dirname(directory)
+    yield '.'
+
+def directory_samples(files: List[str], file_stats: Dict[str, List[int]]) -> Dict[str, Sample]:
+    """
+    Per-directory sample of one change: lines added/removed and files touched
+    under each directory (a directory's sample includes its subdirectories).
+    """
+    samples: Dict[str, List[int]] = {}
+    for path in set(files) | set(file_stats):
+        added, removed = file_stats.get(path, (0, 0))
+        for directory in _ancestors(os.path.dirname(path)):
+            sample = samples.setdefault(directory, [0, 0, 0])
+            sample[0] += added
+            sample[1] += removed
+            sample[2] += 1
+    return {d: tuple(s) for d, s in samples.items()}
+
+class BaselineStore:
+    """
+    Learned size baselines per directory and per author, persisted in
+    `.ai/baselines.json`. The author is the proposal's `author` field ('ai-agent'
+    or 'human'), not the identity of an individual agent: all agents share the
+    'ai-agent' baseline. Each applied trace updates the running statistics in
+    place; the history is never rescanned. Its sample is appended to a journal
+    next to the snapshot, so recording costs the same however large the store
+    grows; the journal is folded into the snapshot every JOURNAL_COMPACT_BYTES.
+    Processes serialize on a lock file and replay each other's journal lines.
+    """
+
+    _instances: Dict[str, 'BaselineStore'] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, workspace_root: str) -> 'BaselineStore':
+        """Process-wide instance per workspace."""
+        path = os.path.abspath(os.path.join(workspace_root, '.ai', BASELINE_FILE))
+        with cls._instances_lock:
+            store = cls._instances.get(path)
+            if store is None:
+                store = cls._instances[path] = cls(path)
+            return store
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = f"{path}{JOURNAL_SUFFIX}"
+        self.directories: Dict[str, Dict[str, RunningStats]] = {}
+        self.authors: Dict[str, Dict[str, RunningStats]] = {}
+        self._loaded_stat: Optional[Tuple[int, int, int]] = None
+        self._journal_offset = 0  # journal bytes already applied
+        self._lock = threading.RLock()
+
+    # -----------------------------
+    # Learning
+    # -----------------------------
+    def observe(self, trace: DecisionTrace) -> None:
+        """
+        Folds an applied trace into the baselines. Rejected changes are not learned.
+        Per-file line counts come from the trace's anomaly report when the scan
+        already measured them; the diff is only counted again otherwise.
+        """
+        if trace.outcome != 'applied':
+            return
+        proposal = trace.proposal
+        report = trace.anomalyReport
+        file_stats = report.fileStats if report is not None and report.fileStats is not None else None
+        if file_stats is None:
+            file_stats = count_file_lines(proposal.diff)
+        samples = directory_samples(proposal.files, file_stats)
+        total = (
+            sum(counts[0] for counts in file_stats.values()),
+            sum(counts[1] for counts in file_stats.values()),
+            len(proposal.files)
+        )
+        line = json.dumps(
+            {"directories": samples, "author": proposal.author, "total": total}, separators=(',', ':')
+        ).encode('utf-8') + b'\n'
+
+        with self._file_lock():
+            self._refresh_locked()  # apply other writers' samples first
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.journal_path, 'ab') as f:
+                f.write(line)
+                journal_size = f.tell()
+            self._journal_offset = journal_size
+            self._apply(samples, proposal.author, total)
+            if journal_size > JOURNAL_COMPACT_BYTES:
+                self._compact()
+
+    def _apply(self, samples: Dict[str, Sample], author: str, total: Sample) -> None:
+        for directory, sample in samples.items():
+            self._update(self.directories, directory, sample)
+        self._update(self.authors, author, total)
+
+    @staticmethod
+    def _update(table: Dict[str, Dict[str, RunningStats]], key: str, sample: Sample) -> None:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = {metric: RunningStats() for metric in METRICS}
+        for metric, value in zip(METRICS, sample):
+            stats[metric].update(value)
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    def baseline_for(self, directory: str, min_samples: int) -> Optional[Tuple[str, Dict[str, RunningStats]]]:
+        """Deepest directory at or above `directory` with at least `min_samples` observations."""
+        self.refresh()
+        for candidate in _ancestors(directory):
+            stats = self.directories.get(candidate)
+            if stats is not None and stats['files'].count >= min_samples:
+                return candidate, stats
+        return None
+
+    def author_baseline(self, author: str, min_samples: int) -> Optional[Dict[str, RunningStats]]:
+        self.refresh()
+        stats = self.authors.get(author)
+        if stats is not None and stats['files'].count >= min_samples:
+            return stats
+        return None
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def refresh(self) -> None:
+        """Picks up what other processes have written since the last read: O(new journal lines)."""
+        if not os.path.exists(self.path) and not os.path.exists(self.journal_path):
+            return  # nothing learned yet; don't create the lock file just to read
+        with self._file_lock(shared=True):
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        try:
+            st = os.stat(self.path)
+            # A compaction replaces the snapshot (new inode) and empties the journal
+            stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stat_key = None
+        if stat_key != self._loaded_stat:
+            data = {}
+            if stat_key is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            self.directories = self._decode(data.get('directories', {}))
+            self.authors = self._decode(data.get('authors', {}))
+            self._loaded_stat = stat_key
+            self._journal_offset = 0
+
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._journal_offset += len(line)
+                    entry = json.loads(line)
+                    self._apply(entry['directories'], entry['author'], entry['total'])
+        except FileNotFoundError:
+            pass
+
+    def _compact(self) -> None:
+        # Caller holds the file lock and has applied the whole journal
+        self._save()
+        with open(self.journal_path, 'wb'):
+            pass
+        self._journal_offset = 0
+
+    @staticmethod
+    def _decode(table: Dict[str, Dict[str, List[float]]]) -> Dict[str, Dict[str, RunningStats]]:
+        return {key: {metric: RunningStats(*values) for metric, values in stats.items()} for key, stats in table.items()}
+
+    @staticmethod
+    def _encode(table: Dict[str, Dict[str, RunningStats]]) -> Dict[str, Dict[str, List[float]]]:
+        return {key: {metric: s.to_list() for metric, s in stats.items()} for key, stats in table.items()}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"version": 1, "directories": self._encode(self.directories), "authors": self._encode(self.authors)}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        st = os.stat(self.path)
+        self._loaded_stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,332 @@
+import os
+import re
+import json
+import shutil
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List
+from .context_bank import ledger_shards, MAIN_SHARD
+from .ledger_index import IndexEntry, LedgerIndex, parse_index_line, read_index_file
+
+try:
+    import numpy as np
+except ImportError:  # columnar analytics are optional: pip install trusted-agent-engine[analytics]
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are POSIX-only
+    fcntl = None
+
+COLUMNS_DIR = os.path.join('.ai', 'columns')
+COLUMNS_VERSION = 1
+# Rows per part; the last part is topped up by later updates before a new one starts
+PART_ROWS = 1 << 20
+
+OUTCOMES = ('applied', 'rejected', 'pending')
+# Outcome code of background completions, which analytics leave out of decision counts
+COMPLETION_CODE = len(OUTCOMES)
+RISK_LEVELS = ('low', 'medium', 'high')
+AUTHORS = ('ai-agent', 'human')
+
+# Accountability is serialized before the proposal, and JSON-escaped strings
+# cannot contain these quoted keys, so the first match is the top-level field
+CREDIT_PATTERN = re.compile(rb'"responsibleEntity":"([a-z-]+)","signature":"[^"]*","creditImpact":(-?[0-9.eE+-]+)')
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Columnar analytics require numpy: pip install 'trusted-agent-engine[analytics]'")
+
+def _directory(path: str) -> str:
+    return os.path.dirname(path) or '.'
+
+class ColumnPart:
+    """One part of a shard's column cache; arrays are memory-mapped on first access."""
+
+    def __init__(self, path: str, rows: int):
+        self.path = path
+        self.rows = rows
+        self._arrays: Dict[str, 'np.ndarray'] = {}
+
+    def __getattr__(self, name: str) -> 'np.ndarray':
+        if name.startswith('_'):
+            raise AttributeError(name)
+        array = self._arrays.get(name)
+        if array is None:
+            try:
+                array = self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+            except FileNotFoundError:
+                raise AttributeError(name) from None
+        return array
+
+class ColumnarLedger:
+    """
+    Columnar cache of a workspace's ledger under `.ai/columns/`, one directory
+    per ledger shard holding parts of memory-mapped `.npy` columns. Rule ids and
+    directories are dictionary-encoded with one dictionary for the workspace.
+    `update()` appends only the records added since the last update; a ledger
+    that was rewritten underneath the cache is re-exported from scratch.
+    """
+
+    def __init__(self, workspace_root: str):
+        require_numpy()
+        self.workspace_root = workspace_root
+        self.root = os.path.join(workspace_root, COLUMNS_DIR)
+        self.dictionary_path = os.path.join(self.root, 'dictionaries.json')
+        self._lock = threading.RLock()
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    def update(self, rebuild: bool = False) -> int:
+        """Brings the cache up to date with every shard. Returns the number of rows added."""
+        added = 0
+        with self._file_lock():
+            dictionaries = self._load_dictionaries()
+            if rebuild:
+                for shard in list(self._shard_dirs()):
+                    shutil.rmtree(os.path.join(self.root, shard))
+                dictionaries = {'rules': [], 'directories': []}
+            for shard, path in ledger_shards(self.workspace_root).items():
+                added += self._update_shard(shard, path, dictionaries)
+        return added
+
+    def _update_shard(self, shard: str, ledger_path: str, dictionaries: Dict[str, List[str]]) -> int:
+        # The `.idx` file is streamed one part at a time, so memory is bounded by
+        # PART_ROWS whatever the ledger size; meta.json keeps the byte offsets
+        # to resume from
+        directory = os.path.join(self.root, self._shard_dir(shard))
+        index_path = f"{ledger_path}.idx"
+        self._index_ledger_tail(ledger_path, index_path)
+        meta = self._load_meta(directory)
+
+        if meta['records'] and not self._locate(index_path, meta):
+            print(f"[Governance Warning] Ledger shard '{shard or 'main'}' changed under its column cache; re-exporting.")
+            shutil.rmtree(directory)
+            meta = self._load_meta(directory)
+        cached = meta['records']
+        if not self._has_line_at(index_path, meta['indexOffset']):
+            return 0
+
+        rules = {name: code for code, name in enumerate(dictionaries['rules'])}
+        directories = {name: code for code, name in enumerate(dictionaries['directories'])}
+        parts = meta['parts']
+        records, offset = cached, meta['indexOffset']
+        # Top up a partial last part rather than leaving many small ones
+        if parts and parts[-1]['rows'] < PART_ROWS:
+            retired = parts.pop()
+            records -= retired['rows']
+            offset = retired['offset']
+        else:
+            retired = None
+
+        os.makedirs(directory, exist_ok=True)
+        stream = read_index_file(index_path, offset)
+        with open(ledger_path, 'rb') as ledger:
+            while True:
+                batch = list(islice(stream, PART_ROWS))
+                if not batch:
+                    break
+                name = f"part-{meta['nextPart']:06d}"
+                meta['nextPart'] += 1
+                self._write_part(os.path.join(directory, name), ledger, [e for _, _, e in batch], rules, directories)
+                parts.append({'name': name, 'rows': len(batch), 'offset': batch[0][0]})
+                records += len(batch)
+                last_start, last_end, last = batch[-1]
+
+        # Dictionaries before metadata: codes in a part must always resolve
+        dictionaries['rules'] = list(rules)
+        dictionaries['directories'] = list(directories)
+        self._write_json(self.dictionary_path, dictionaries)
+        meta.update(records=records, lastHash=last.entryHash, lastOffset=last_start, indexOffset=last_end)
+        self._write_json(os.path.join(directory, 'meta.json'), meta)
+        if retired is not None:
+            shutil.rmtree(os.path.join(directory, retired['name']), ignore_errors=True)
+        return records - cached
+
+    @staticmethod
+    def _index_ledger_tail(ledger_path: str, index_path: str) -> None:
+        # Records without an index line (older ledgers, or a crash between the
+        # two appends) are indexed first; only then is the whole index loaded
+        try:
+            with open(index_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                tail = b''
+                while size and tail.count(b'\n') < 2:
+                    step = min(size, 64 * 1024)
+                    size -= step
+                    f.seek(size)
+                    tail = f.read(step) + tail
+        except FileNotFoundError:
+            tail = b''
+        lines = [line for line in tail.split(b'\n')[:-1] if line]
+        covered = 0
+        if lines:
+            last = parse_index_line(lines[-1])
+            covered = last.offset + last.length + 1
+        if os.path.getsize(ledger_path) > covered:
+            LedgerIndex.for_ledger(ledger_path).sync()
+
+    @staticmethod
+    def _locate(index_path: str, meta: Dict) -> bool:
+        """
+        Checks that the cached rows are still the start of the index, filling in
+        the index offsets of caches written before they were kept.
+        """
+        if 'indexOffset' not in meta:
+            starts, row = {}, 0
+            for part in meta['parts']:
+                starts[row] = part
+                row += part['rows']
+            for position, (start, end, entry) in enumerate(read_index_file(index_path)):
+                if position in starts:
+                    starts[position]['offset'] = start
+                if position == meta['records'] - 1:
+                    meta.update(lastOffset=start, indexOffset=end)
+                    break
+            else:
+                return False
+        stream = read_index_file(index_path, meta['lastOffset'])
+        start, end, entry = next(stream, (None, None, None))
+        return end == meta['indexOffset'] and entry.entryHash == meta['lastHash']
+
+    @staticmethod
+    def _has_line_at(index_path: str, offset: int) -> bool:
+        return next(read_index_file(index_path, offset), None) is not None
+
+    def _write_part(
+        self,
+        path: str,
+        ledger: BinaryIO,
+        entries: List[IndexEntry],
+        rules: Dict[str, int],
+        directories: Dict[str, int]
+    ) -> None:
+        # Columns: timestamp, recorded_at (float64); outcome, risk, author (uint8 codes
+        # into OUTCOMES or COMPLETION_CODE, RISK_LEVELS, AUTHORS); credit (float32, NaN when nothing was
+        # charged); rule_* and dir_* as CSR pairs of offsets (rows + 1) and codes
+        rows = len(entries)
+        outcome_codes = {name: code for code, name in enumerate(OUTCOMES)}
+        risk_codes = {name: code for code, name in enumerate(RISK_LEVELS)}
+        author_codes = {name: code for code, name in enumerate(AUTHORS)}
+
+        def record(entry: IndexEntry) -> bytes:
+            ledger.seek(entry.offset)
+            return ledger.read(entry.length)
+
+        columns = {
+            'timestamp': np.fromiter((e.timestamp for e in entries), np.float64, rows),
+            'recorded_at': np.fromiter((e.recordedAt for e in entries), np.float64, rows),
+            'outcome': np.fromiter(
+                (COMPLETION_CODE if e.completion else outcome_codes[e.outcome] for e in entries), np.uint8, rows
+            ),
+            'risk': np.fromiter((risk_codes[e.riskLevel] for e in entries), np.uint8, rows),
+            'author': np.fromiter((author_codes[e.author] for e in entries), np.uint8, rows),
+            # The only field not in the ledger index: read from the records themselves
+            'credit': np.fromiter((self._credit(record(e)) for e in entries), np.float32, rows)
+        }
+
+        for name, values_of, dictionary in (
+            ('rule', lambda e: e.ruleIds, rules),
+            ('dir', lambda e: map(_directory, e.files), directories)
+        ):
+            offsets = np.empty(rows + 1, dtype=np.int64)
+            offsets[0] = 0
+            codes: List[int] = []
+            for row, entry in enumerate(entries):
+                for value in dict.fromkeys(values_of(entry)):  # distinct, in order
+                    code = dictionary.get(value)
+                    if code is None:
+                        code = dictionary[value] = len(dictionary)
+                    codes.append(code)
+                offsets[row + 1] = len(codes)
+            columns[f'{name}_offsets'] = offsets
+            columns[f'{name}_codes'] = np.array(codes, dtype=np.int32)
+
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, array in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _credit(raw: bytes) -> float:
+        match = CREDIT_PATTERN.search(raw)
+        # System faults are recorded but never charged (see PolicyEngine.evaluate)
+        if match is None or match.group(1) == b'system-fault':
+            return float('nan')
+        return float(match.group(2))
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+    def parts(self) -> Iterator[ColumnPart]:
+        for shard in self._shard_dirs():
+            directory = os.path.join(self.root, shard)
+            for part in self._load_meta(directory)['parts']:
+                yield ColumnPart(os.path.join(directory, part['name']), part['rows'])
+
+    def dictionaries(self) -> Dict[str, List[str]]:
+        return self._load_dictionaries()
+
+    def records(self) -> int:
+        return sum(part.rows for part in self.parts())
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+    @staticmethod
+    def _shard_dir(shard: str) -> str:
+        return 'ledger' if shard == MAIN_SHARD else f'ledger.{shard}'
+
+    def _shard_dirs(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for name in sorted(os.listdir(self.root)):
+            if (name == 'ledger' or name.startswith('ledger.')) and os.path.isdir(os.path.join(self.root, name)):
+                yield name
+
+    @staticmethod
+    def _load_meta(directory: str) -> Dict:
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') == COLUMNS_VERSION:
+                return meta
+        except FileNotFoundError:
+            pass
+        return {
+            'version': COLUMNS_VERSION, 'records': 0, 'lastHash': None, 'lastOffset': None, 'indexOffset': 0,
+            'nextPart': 0, 'parts': []
+        }
+
+    def _load_dictionaries(self) -> Dict[str, List[str]]:
+        try:
+            with open(self.dictionary_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'rules': [], 'directories': []}
+
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
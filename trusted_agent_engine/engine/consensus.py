@@ -1,4 +1,4 @@
-from typing import List, Set
+from typing import List, Set, Tuple
 from .types import Vote, ConsensusResult, Decision, Violation
 
 class ConsensusEngine:
@@ -68,10 +68,10 @@ class ConsensusEngine:
         )
 
     def _unique_violations(self, violations: List[Violation]) -> List[Violation]:
-        seen: Set[str] = set()
+        seen: Set[Tuple[str, str]] = set()
         unique = []
         for v in violations:
-            key = f"{v.ruleId}-{v.level}"
+            key = (v.ruleId, v.level)
             if key not in seen:
                 seen.add(key)
                 unique.append(v)
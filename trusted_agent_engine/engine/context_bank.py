@@ -1,12 +1,130 @@
 import os
-import json
-from typing import List
-from .types import DecisionTrace
+import re
+import glob
+import time
+import heapq
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from pydantic_core import to_json
+from .types import DecisionTrace, HistoryPage, InclusionProof, LedgerCheckpoint
+from .ledger_index import LedgerIndex
+from .ledger_feed import DEFAULT_SUBSCRIBER_QUEUE, LedgerFeed
+from .baselines import BaselineStore
+from .merkle import MerkleTree, entry_hash
+
+LEDGER_FILE = 'ledger.jsonl'
+MAIN_SHARD = ''
+# Per-worker shard for this process (e.g. set by `trusted-engine serve --workers N`)
+SHARD_ENV = 'TRUSTED_ENGINE_LEDGER_SHARD'
+PRIVATE_KEY_FILE = os.path.join('.ai', 'sovereign.key')
+
+def ledger_path(workspace_root: str, shard: str = MAIN_SHARD) -> str:
+    if shard == MAIN_SHARD:
+        return os.path.join(workspace_root, '.ai', LEDGER_FILE)
+    if not re.fullmatch(r'[A-Za-z0-9_-]+', shard):
+        raise ValueError(f"Invalid ledger shard name: {shard}")
+    return os.path.join(workspace_root, '.ai', f'ledger.{shard}.jsonl')
+
+def ledger_shards(workspace_root: str) -> Dict[str, str]:
+    """Existing ledger files of a workspace: shard name -> path ('' is the main ledger)."""
+    shards = {}
+    main = ledger_path(workspace_root)
+    if os.path.exists(main):
+        shards[MAIN_SHARD] = main
+    for path in sorted(glob.glob(os.path.join(workspace_root, '.ai', 'ledger.*.jsonl'))):
+        shards[os.path.basename(path)[len('ledger.'):-len('.jsonl')]] = path
+    return shards
+
+def iter_merged(workspace_root: str, newest_first: bool = False) -> Iterator[bytes]:
+    """
+    Raw records of all ledger shards, k-way merged by (recordedAt, shard, sequence)
+    using the shard indexes; only the records themselves are read from the ledgers.
+    """
+    indexes = {shard: LedgerIndex.for_ledger(path) for shard, path in ledger_shards(workspace_root).items()}
+
+    def keys(shard: str, index: LedgerIndex) -> Iterator[Tuple[float, str, int]]:
+        index.sync()
+        entries = index.entries
+        positions = range(len(entries) - 1, -1, -1) if newest_first else range(len(entries))
+        for position in positions:
+            yield entries[position].recordedAt, shard, position
+
+    merged = heapq.merge(*(keys(shard, index) for shard, index in indexes.items()), reverse=newest_first)
+    handles = {}
+    try:
+        for _, shard, position in merged:
+            f = handles.get(shard)
+            if f is None:
+                f = handles[shard] = open(indexes[shard].ledger_path, 'rb')
+            entry = indexes[shard].entries[position]
+            f.seek(entry.offset)
+            yield f.read(entry.length)
+    finally:
+        for f in handles.values():
+            f.close()
+
+def decode_cursor(cursor: str) -> Dict[str, int]:
+    """History cursor -> per-shard position bound. Raises ValueError if malformed."""
+    if cursor.isdigit():
+        return {MAIN_SHARD: int(cursor)}
+    bounds = {}
+    for part in cursor.split(','):
+        shard, separator, position = part.rpartition(':')
+        if not separator or not position.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+        bounds[shard] = int(position)
+    return bounds
+
+def encode_cursor(bounds: Dict[str, int]) -> str:
+    if set(bounds) == {MAIN_SHARD}:
+        return str(bounds[MAIN_SHARD])  # single ledger: plain position
+    return ','.join(f"{shard}:{position}" for shard, position in sorted(bounds.items()))
 
 class ContextBank:
-    def __init__(self, workspace_root: str):
-        self.storage_path = os.path.join(workspace_root, '.ai', 'ledger.jsonl')
+    """
+    Append-only decision ledger of a workspace.
+    Without a shard, every process appends to `.ai/ledger.jsonl` under an advisory
+    lock. With a shard (argument or TRUSTED_ENGINE_LEDGER_SHARD), the process
+    appends to its own `.ai/ledger.<shard>.jsonl` so workers never contend;
+    reads merge all shards.
+
+    Each record carries the hash of its predecessor in the same file, and every
+    CHECKPOINT_INTERVAL records a Merkle checkpoint is appended (signed when the
+    workspace holds the sovereign private key).
+    """
+
+    CHECKPOINT_INTERVAL = 1024
+    # Banks kept by for_workspace, least recently used evicted first
+    MAX_CACHED = 256
+
+    _instances: 'OrderedDict[Tuple[str, str], ContextBank]' = OrderedDict()
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, workspace_root: str, shard: Optional[str] = None) -> 'ContextBank':
+        """Process-wide bank per workspace and shard, so requests skip the storage checks."""
+        shard = shard if shard is not None else os.environ.get(SHARD_ENV, MAIN_SHARD)
+        key = (os.path.abspath(workspace_root), shard)
+        with cls._instances_lock:
+            bank = cls._instances.get(key)
+            if bank is None:
+                bank = cls._instances[key] = cls(workspace_root, shard)
+                if len(cls._instances) > cls.MAX_CACHED:
+                    cls._instances.popitem(last=False)
+            else:
+                cls._instances.move_to_end(key)
+            return bank
+
+    def __init__(self, workspace_root: str, shard: Optional[str] = None):
+        self.workspace_root = workspace_root
+        self.shard = shard if shard is not None else os.environ.get(SHARD_ENV, MAIN_SHARD)
+        self.storage_path = ledger_path(workspace_root, self.shard)
         self._ensure_storage_exists()
+        self.index = LedgerIndex.for_ledger(self.storage_path)
+        self.baselines = BaselineStore.for_workspace(workspace_root)
+        self.feed = LedgerFeed.for_workspace(workspace_root)
 
     def _ensure_storage_exists(self):
         directory = os.path.dirname(self.storage_path)
@@ -16,28 +134,186 @@ class ContextBank:
             with open(self.storage_path, 'w', encoding='utf-8') as f:
                 pass
 
-    async def record(self, trace: DecisionTrace) -> None:
+    async def record(self, trace: DecisionTrace, learn: bool = True) -> None:
         """
-        Records a decision trace (Append-only JSONL).
+        Records a decision trace (Append-only JSONL), indexes it and, with
+        `learn` (False when the policy disables `anomalyBaseline`), folds it
+        into the anomaly baselines. Sets the trace's `sequence`, `recordedAt`
+        and `prevHash`, and publishes it to this process's subscribers.
+        The file I/O and locking run on a worker thread, off the event loop.
         """
-        log_entry = trace.model_dump_json() + '\n'
-        with open(self.storage_path, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
+        await asyncio.to_thread(self._record, trace, learn)
+
+    def _record(self, trace: DecisionTrace, learn: bool) -> None:
+        # The shard lock keeps large records from interleaving across processes
+        with self.index.exclusive() as sequence:
+            trace.sequence = sequence
+            trace.recordedAt = time.time()
+            trace.prevHash = self.index.last_hash()
+            # Serialize straight to UTF-8 bytes: no intermediate str, no concatenated copy
+            log_entry = to_json(trace)
+            with open(self.storage_path, 'ab') as f:
+                offset = f.tell()
+                f.write(log_entry)
+                f.write(b'\n')
+            self.index.append(offset, len(log_entry), trace, entry_hash(log_entry))
+            if (sequence + 1) % self.CHECKPOINT_INTERVAL == 0:
+                self.index.write_checkpoint(self._signing_key())
+        if learn:
+            self.baselines.observe(trace)
+        self.feed.publish(self.shard, trace)
 
-    async def get_history(self) -> List[DecisionTrace]:
+    async def subscribe(
+        self,
+        since: Optional[int] = None,
+        max_queued: int = DEFAULT_SUBSCRIBER_QUEUE,
+        poll_interval: Optional[float] = 1.0
+    ) -> AsyncIterator[DecisionTrace]:
         """
-        Retrieves historical decisions.
+        Traces of this bank's ledger file in sequence order, from sequence `since`
+        (None: from now on), then live as they are recorded. Live traces come
+        straight from `record`; older ones, and any the subscriber fell too far
+        behind on or that another process appended, are read from the ledger.
+        Without local records, the ledger is checked every `poll_interval` seconds.
         """
-        if not os.path.exists(self.storage_path):
-            return []
-        
-        traces = []
-        with open(self.storage_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    traces.append(DecisionTrace.model_validate_json(line))
-        
-        return traces[::-1]  # Return most recent first
+        with self.feed.subscription(self.shard, max_queued) as live:
+            self.index.sync()
+            next_sequence = len(self.index.entries) if since is None else since
+            while True:
+                self.index.sync()
+                end = len(self.index.entries)
+                if next_sequence < end:
+                    for raw in self.index.read_raw(range(next_sequence, end)):
+                        yield DecisionTrace.model_validate_json(raw)
+                    next_sequence = end
+                try:
+                    trace = await asyncio.wait_for(live.get(), poll_interval)
+                except asyncio.TimeoutError:
+                    continue
+                if trace.sequence == next_sequence:
+                    yield trace
+                    next_sequence += 1
+                # Already read from the ledger, or a gap the next pass reads
+
+    def checkpoint(self) -> Optional[LedgerCheckpoint]:
+        """Checkpoints this bank's ledger file now (None if nothing new to cover)."""
+        with self.index.exclusive():
+            return self.index.write_checkpoint(self._signing_key())
+
+    def prove(self, position: int, shard: Optional[str] = None, tree_size: Optional[int] = None) -> InclusionProof:
+        """
+        Inclusion proof of the record at `position` of a ledger file (default:
+        this bank's). It is made against the latest checkpoint covering the
+        record, or against the current tree if none does yet.
+        """
+        shard = self.shard if shard is None else shard
+        index = LedgerIndex.for_ledger(ledger_path(self.workspace_root, shard))
+        index.sync()
+        checkpoints = index.checkpoints()
+        if tree_size is None:
+            covering = [c for c in checkpoints if c.size > position]
+            tree_size = covering[-1].size if covering else len(index.entries)
+        checkpoint = next((c for c in reversed(checkpoints) if c.size == tree_size), None)
+        if not 0 <= position < tree_size <= len(index.entries):
+            raise ValueError(f"No record at position {position} of a {tree_size}-record tree in shard '{shard}'")
+
+        entries = index.entries
+        root = MerkleTree(lambda i: entries[i].entryHash, index.merkle.chunk_roots).root(tree_size)
+        return InclusionProof(
+            shard=shard,
+            position=position,
+            entryHash=entries[position].entryHash,
+            treeSize=tree_size,
+            root=root,
+            path=index.inclusion_path(position, tree_size),
+            signature=checkpoint.signature if checkpoint is not None and checkpoint.root == root else None
+        )
+
+    def _signing_key(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.workspace_root, PRIVATE_KEY_FILE), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def get_history(self, completions: bool = False) -> List[DecisionTrace]:
+        """
+        Retrieves historical decisions of all shards, most recent first.
+        Background completions are left out unless `completions` is set: the
+        deadline decision they complete is already in the history.
+        """
+        traces = (DecisionTrace.model_validate_json(raw) for raw in iter_merged(self.workspace_root, newest_first=True))
+        return [t for t in traces if completions or not t.backgroundCompletion]
+
+    def _indexes(self) -> Dict[str, LedgerIndex]:
+        return {shard: LedgerIndex.for_ledger(path) for shard, path in ledger_shards(self.workspace_root).items()}
+
+    async def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        outcome: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        author: Optional[str] = None,
+        file_glob: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        count_only: bool = False
+    ) -> HistoryPage:
+        """
+        Filtered, paginated history (most recent first) served from the ledger index.
+        `cursor` is the `nextCursor` of the previous page.
+        """
+        filters = dict(
+            since=since, until=until, file_glob=file_glob,
+            outcome=outcome, riskLevel=risk_level, ruleId=rule_id, author=author
+        )
+        indexes = self._indexes()
+        if cursor:
+            # Shards created after the first page only hold newer records
+            bounds = decode_cursor(cursor)
+            bounds = {shard: bounds.get(shard, 0) for shard in indexes}
+        else:
+            # Pin every shard's current end so later appends don't shift the pages
+            bounds = {}
+            for shard, index in indexes.items():
+                index.sync()
+                bounds[shard] = len(index.entries)
+
+        if count_only:
+            return HistoryPage(traces=[], count=sum(
+                index.count(before=bounds[shard] if cursor else None, **filters) for shard, index in indexes.items()
+            ))
+
+        def matches(shard: str, index: LedgerIndex) -> Iterator[Tuple[float, str, int]]:
+            entries = index.entries
+            for position in index.iter_matches(before=bounds[shard], **filters):
+                yield entries[position].recordedAt, shard, position
+
+        picked: List[Tuple[str, int]] = []
+        has_more = False
+        for _, shard, position in heapq.merge(*(matches(s, i) for s, i in indexes.items()), reverse=True):
+            if len(picked) == limit:
+                has_more = True
+                break
+            picked.append((shard, position))
+
+        by_shard: Dict[str, List[int]] = {}
+        for shard, position in picked:
+            by_shard.setdefault(shard, []).append(position)
+            bounds[shard] = position
+        read = {
+            (shard, position): trace
+            for shard, positions in by_shard.items()
+            for position, trace in zip(positions, indexes[shard].read(positions))
+        }
+
+        return HistoryPage(
+            traces=[read[key] for key in picked],
+            count=len(picked),
+            nextCursor=encode_cursor(bounds) if has_more else None
+        )
 
     async def get_success_rate(self) -> float:
         """
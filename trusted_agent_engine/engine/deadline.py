@@ -0,0 +1,80 @@
+import time
+from typing import Any, Dict, Optional
+
+# Evaluation stages with their own budget: scanning the diff text, scoring the
+# anomaly report (line counts, baselines) and evaluating the rules
+STAGES = ('scan', 'anomaly', 'rules')
+# Floor of per-call deadlines (`meta.deadline.minMs` overrides it): a caller must
+# not be able to time every evaluation out with a near-zero budget
+DEFAULT_MIN_DEADLINE_MS = 5.0
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str, budget_ms: float, elapsed_ms: float, overall: bool = False):
+        if overall:
+            message = f"Evaluation deadline of {budget_ms:g}ms passed during stage '{stage}' ({elapsed_ms:.1f}ms elapsed)"
+        else:
+            message = f"Evaluation stage '{stage}' exceeded its {budget_ms:g}ms budget ({elapsed_ms:.1f}ms elapsed)"
+        super().__init__(message)
+        self.stage = stage
+        self.budget_ms = budget_ms
+        self.elapsed_ms = elapsed_ms
+
+class Deadline:
+    """
+    Wall-clock budget of one evaluation: an overall deadline and optional
+    per-stage budgets. Checks are cooperative, made between units of work
+    (diff chunks, rules), so a stage stops at its next check once over budget.
+    """
+
+    __slots__ = ('total_ms', 'stages', 'started', 'stage', 'stage_started')
+
+    def __init__(self, total_ms: Optional[float] = None, stages: Optional[Dict[str, float]] = None):
+        unknown = set(stages or {}) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown evaluation stages: {sorted(unknown)}. Expected some of {STAGES}.")
+        self.total_ms = total_ms
+        self.stages = stages or {}
+        self.started = time.perf_counter()
+        self.stage: Optional[str] = None
+        self.stage_started = self.started
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], total_ms: Optional[float] = None) -> Optional['Deadline']:
+        """
+        Builds the deadline of a call from the policy's `meta.deadline` block
+        (`totalMs`, `stages`); a per-call `total_ms` overrides `totalMs`, but
+        never goes below `minMs`. None when nothing is configured.
+        """
+        if total_ms is not None:
+            total_ms = max(total_ms, config.get('minMs', DEFAULT_MIN_DEADLINE_MS))
+        else:
+            total_ms = config.get('totalMs')
+        stages = config.get('stages') or {}
+        if total_ms is None and not stages:
+            return None
+        return cls(total_ms, stages)
+
+    def enter(self, stage: str) -> None:
+        self.stage = stage
+        self.stage_started = time.perf_counter()
+        self.check()
+
+    def check(self) -> None:
+        now = time.perf_counter()
+        stage = self.stage or STAGES[0]
+        budget = self.stages.get(stage)
+        if budget is not None and (now - self.stage_started) * 1000 > budget:
+            raise DeadlineExceeded(stage, budget, (now - self.stage_started) * 1000)
+        if self.total_ms is not None and (now - self.started) * 1000 > self.total_ms:
+            raise DeadlineExceeded(stage, self.total_ms, (now - self.started) * 1000, overall=True)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the current stage (None: unbounded)."""
+        now = time.perf_counter()
+        limits = []
+        budget = self.stages.get(self.stage or STAGES[0])
+        if budget is not None:
+            limits.append(self.stage_started + budget / 1000 - now)
+        if self.total_ms is not None:
+            limits.append(self.started + self.total_ms / 1000 - now)
+        return max(0.0, min(limits)) if limits else None
@@ -1,4 +1,4 @@
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Optional
 from pydantic import BaseModel
 
 class DiffAnalysis(BaseModel):
@@ -7,56 +7,147 @@ class DiffAnalysis(BaseModel):
     deletions: int
     hunks: int
 
-def parse_unified_diff(diff: str) -> DiffAnalysis:
+class DiffParser:
     """
-    Parse unified diff and extract factual change data.
+    Incremental unified diff parser.
+    Chunks can be fed as they arrive (e.g. from a streamed request body);
+    only the current partial line is buffered.
     """
-    files: Set[str] = set()
-    additions = 0
-    deletions = 0
-    hunks = 0
 
-    lines = diff.split('\n')
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.additions = 0
+        self.deletions = 0
+        self.hunks = 0
+        self._partial = ''
+
+    def feed(self, chunk: str) -> None:
+        # Walk line offsets instead of split('\n'): a list of every line would
+        # cost several times the diff's own size for large diffs.
+        text = self._partial + chunk if self._partial else chunk
+        start = 0
+        find = text.find
+        while True:
+            end = find('\n', start)
+            if end == -1:
+                break
+            self._consume(text[start:end])
+            start = end + 1
+        self._partial = text[start:]
+
+    def finish(self) -> DiffAnalysis:
+        self._consume(self._partial)
+        self._partial = ''
+        return DiffAnalysis(
+            filesTouched=list(self.files),
+            additions=self.additions,
+            deletions=self.deletions,
+            hunks=self.hunks
+        )
 
-    for line in lines:
+    def _consume(self, line: str) -> None:
         # 1. diff --git header
         if line.startswith('diff --git '):
             parts = line.split(' ')
             b_path = parts[-1]  # b/path
             if b_path.startswith('b/'):
-                files.add(b_path[2:])
-            continue
+                self.files.add(b_path[2:])
+            return
 
         # 2. --- and +++ headers
         if line.startswith('--- ') or line.startswith('+++ '):
             path_part = line[4:].strip()
             if path_part.startswith('a/') or path_part.startswith('b/'):
-                files.add(path_part[2:])
+                self.files.add(path_part[2:])
             elif path_part != '/dev/null' and path_part != '':
-                files.add(path_part)
-            continue
+                self.files.add(path_part)
+            return
 
         # Support for 4+ pluses/minuses
         if line.startswith('----') or line.startswith('++++'):
-            continue
+            return
 
         # 3. Hunk header
         if line.startswith('@@'):
-            hunks += 1
-            continue
+            self.hunks += 1
+            return
 
         # 4. Content stats
         if line.startswith('---') or line.startswith('+++') or line.startswith('diff --git'):
-            continue
+            return
 
         if line.startswith('+'):
-            additions += 1
+            self.additions += 1
         elif line.startswith('-'):
-            deletions += 1
-
-    return DiffAnalysis(
-        filesTouched=list(files),
-        additions=additions,
-        deletions=deletions,
-        hunks=hunks
-    )
+            self.deletions += 1
+
+def parse_unified_diff(diff: str) -> DiffAnalysis:
+    """
+    Parse unified diff and extract factual change data.
+    """
+    parser = DiffParser()
+    parser.feed(diff)
+    return parser.finish()
+
+def _strip_prefix(path: str) -> Optional[str]:
+    path = path.split('\t', 1)[0].strip()
+    if path == '/dev/null' or not path:
+        return None
+    return path[2:] if path.startswith(('a/', 'b/')) else path
+
+def count_file_lines(diff: str) -> Dict[str, List[int]]:
+    """
+    Lines added/removed per file, as path -> [additions, deletions].
+    Sections between file headers are counted with str.count, so no line is
+    materialized; this is much cheaper than a full parse on large diffs.
+    """
+    git = diff.startswith('diff --git ') or '\ndiff --git ' in diff
+    start = 0 if _is_file_header(diff, 0, git) else _next_file_header(diff, 0, git)
+    if start == -1:
+        return {}
+
+    stats: Dict[str, List[int]] = {}
+    while start < len(diff):
+        next_header = _next_file_header(diff, start + 1, git)
+        end = len(diff) if next_header == -1 else next_header
+        header_lines = diff[start:min(end, start + 8192)].split('\n', 2)
+        if git:
+            path = _strip_prefix(header_lines[0].split(' ')[-1])
+        else:
+            # '--- old' then '+++ new'; deletions only name the old path
+            new = header_lines[1] if len(header_lines) > 1 else ''
+            path = (_strip_prefix(new[4:]) if new.startswith('+++ ') else None) or _strip_prefix(header_lines[0][4:])
+        # Every '\n+'/'\n-' starts a content line except the ---/+++ file headers,
+        # which precede the first hunk; '--- ' in a hunk is a removed '-- ' line
+        hunk = diff.find('\n@@', start, end)
+        header_end = end if hunk == -1 else hunk
+        counts = stats.setdefault(path or '', [0, 0])
+        counts[0] += diff.count('\n+', start, end) - diff.count('\n+++ ', start, header_end)
+        counts[1] += diff.count('\n-', start, end) - diff.count('\n--- ', start, header_end)
+        start = end
+    return stats
+
+def _is_file_header(diff: str, position: int, git: bool) -> bool:
+    if git:
+        return diff.startswith('diff --git ', position)
+    # Without git headers, '--- ' opens a file only when '+++ ' and then a hunk
+    # header follow it: content lines never start with '@', so a removed '-- '
+    # line followed by an added '++ ' one is not mistaken for a header
+    if not diff.startswith('--- ', position):
+        return False
+    line_end = diff.find('\n', position)
+    if line_end == -1 or not diff.startswith('+++ ', line_end + 1):
+        return False
+    line_end = diff.find('\n', line_end + 1)
+    return line_end != -1 and diff.startswith('@@', line_end + 1)
+
+def _next_file_header(diff: str, position: int, git: bool) -> int:
+    """Start of the first file header line at or after `position` (-1 if none)."""
+    marker = '\ndiff --git ' if git else '\n--- '
+    while True:
+        found = diff.find(marker, position - 1)
+        if found == -1:
+            return -1
+        if _is_file_header(diff, found + 1, git):
+            return found + 1
+        position = found + 2
@@ -0,0 +1,84 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+from .types import Proposal, AnomalyReport
+
+PAYLOAD_FIELDS = ('id', 'timestamp', 'author', 'reasoning', 'files', 'diff', 'tags')
+ANOMALY_FIELDS = ('isAnomaly', 'score', 'reasons', 'baselineZ')
+
+class EvaluationContext:
+    """
+    Lazily computed signals available to policy rules and mercy hooks.
+    Each signal is computed at most once, and only if a rule references it.
+    """
+
+    def __init__(
+        self,
+        proposal: Proposal,
+        risk_level: str,
+        detect_anomaly: Callable[[Proposal], AnomalyReport],
+        is_within_scope: Callable[[List[str]], bool],
+        anomaly_report: Optional[AnomalyReport] = None
+    ):
+        self.proposal = proposal
+        self.risk_level = risk_level
+        self._detect_anomaly = detect_anomaly
+        self._is_within_scope = is_within_scope
+        self._anomaly_report = anomaly_report
+
+    @property
+    def anomaly_report(self) -> AnomalyReport:
+        if self._anomaly_report is None:
+            self._anomaly_report = self._detect_anomaly(self.proposal)
+        return self._anomaly_report
+
+    @property
+    def computed_anomaly_report(self) -> Optional[AnomalyReport]:
+        """The anomaly report if some rule needed it, without forcing a scan."""
+        return self._anomaly_report
+
+    def engine_signal(self, name: str) -> Any:
+        if name == 'riskLevel':
+            return self.risk_level
+        if name == 'isAnomaly':
+            return self.anomaly_report.isAnomaly
+        if name == 'anomalyScore':
+            return self.anomaly_report.score
+        if name == 'isOnlyDocs':
+            return all(f.endswith('.md') or f.startswith('docs/') for f in self.proposal.files)
+        if name == 'isScoped':
+            return self._is_within_scope(self.proposal.files)
+        raise KeyError(name)
+
+    def materialize(self, paths: Optional[Set[str]]) -> Dict[str, Any]:
+        """
+        Builds the JSON Logic data dict holding only the entries `paths` reach.
+        `None` means the dependencies are unknown and everything is computed.
+        Payload values are references to the proposal's fields, not copies.
+        """
+        if paths is None:
+            paths = {'payload', 'engine', 'anomaly'}
+
+        context: Dict[str, Any] = {}
+        for path in paths:
+            section, _, rest = path.partition('.')
+            field = rest.split('.', 1)[0]
+
+            if section == 'payload':
+                payload = context.setdefault('payload', {})
+                for name in ([field] if field else PAYLOAD_FIELDS):
+                    if name in PAYLOAD_FIELDS:
+                        payload[name] = getattr(self.proposal, name)
+            elif section == 'engine':
+                engine = context.setdefault('engine', {})
+                for name in ([field] if field else ('riskLevel', 'isAnomaly', 'anomalyScore', 'isOnlyDocs', 'isScoped')):
+                    if name not in engine:
+                        try:
+                            engine[name] = self.engine_signal(name)
+                        except KeyError:
+                            pass
+            elif section == 'anomaly':
+                anomaly = context.setdefault('anomaly', {})
+                for name in ([field] if field else ANOMALY_FIELDS):
+                    if name in ANOMALY_FIELDS:
+                        anomaly[name] = getattr(self.anomaly_report, name)
+
+        return context
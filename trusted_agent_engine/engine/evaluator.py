@@ -1,59 +1,134 @@
 import json
-import fnmatch
+import time
+import threading
 from typing import List, Optional, Any, Dict
-from .types import Proposal, PolicyConfig, Decision, Violation, ValueManifesto, Accountability, AnomalyReport
-from .anomaly_detector import AnomalyDetector
+from .types import Proposal, PolicyConfig, Decision, ValueManifesto, AnomalyReport
+from .records import AccountabilityRecord, DecisionRecord, ViolationRecord
+from .anomaly_detector import (
+    AnomalyDetector, DEFAULT_PARALLEL_THRESHOLD, DEFAULT_CHUNK_SIZE,
+    DEFAULT_BASELINE_MIN_SAMPLES, DEFAULT_BASELINE_Z_THRESHOLD
+)
+from .baselines import BaselineStore
 from .liability_manager import LiabilityManager
 from .safe_evaluator import SafeEvaluator
+from .evaluation_context import EvaluationContext
+from .rule_stats import RuleStats, SEALING_ACTIONS
+from .policy_bundle import CompiledPolicy
+from .deadline import Deadline, DeadlineExceeded
+
+EVALUATION_MODES = ('full', 'fail-fast')
 
 class PolicyEngine:
-    def __init__(self, policy: PolicyConfig, manifesto: Optional[ValueManifesto] = None, workspace_root: Optional[str] = None):
+    # Fail-fast mode re-sorts rules by measured cost after this many evaluations
+    REORDER_INTERVAL = 100
+
+    def __init__(
+        self,
+        policy: PolicyConfig,
+        manifesto: Optional[ValueManifesto] = None,
+        workspace_root: Optional[str] = None,
+        evaluation_mode: Optional[str] = None,
+        compiled: Optional[CompiledPolicy] = None
+    ):
         self.policy = policy
         self.manifesto = manifesto
-        self.anomaly_detector = AnomalyDetector()
+        # Glob matchers, rule dependencies and value weights; a bundle ships them precompiled
+        self.compiled = compiled or CompiledPolicy.from_policy(policy, manifesto)
+        scan_config = policy.meta.get('anomalyScan', {})
+        # Learned per-directory/author baselines need a workspace to persist them in
+        baseline_config = policy.meta.get('anomalyBaseline', {})
+        use_baselines = workspace_root is not None and baseline_config.get('enabled', True)
+        self.anomaly_detector = AnomalyDetector(
+            parallel_threshold=scan_config.get('parallelThreshold', DEFAULT_PARALLEL_THRESHOLD),
+            chunk_size=scan_config.get('chunkSize', DEFAULT_CHUNK_SIZE),
+            max_workers=scan_config.get('workers'),
+            baselines=BaselineStore.for_workspace(workspace_root) if use_baselines else None,
+            baseline_min_samples=baseline_config.get('minSamples', DEFAULT_BASELINE_MIN_SAMPLES),
+            baseline_z_threshold=baseline_config.get('zThreshold', DEFAULT_BASELINE_Z_THRESHOLD)
+        )
         self.liability = LiabilityManager(workspace_root) if workspace_root else None
+        # Context paths referenced by rules and mercy hooks (None: unknown, build everything)
+        self.dependencies = self.compiled.dependencies
+
+        # 'full' evaluates every rule in declaration order; 'fail-fast' orders rules by
+        # cost/selectivity and stops once the `allowed` outcome is sealed
+        self.evaluation_mode = evaluation_mode or policy.meta.get('evaluationMode', 'full')
+        if self.evaluation_mode not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {self.evaluation_mode}. Expected one of {EVALUATION_MODES}.")
+        # Optional latency budgets: {totalMs, minMs, stages: {scan, anomaly, rules}, completeInBackground}
+        self.deadline_config: Dict[str, Any] = policy.meta.get('deadline') or {}
+        Deadline.from_config(self.deadline_config)  # fail on unknown stages at load time
+        self.rule_stats = RuleStats()
+        # Engines are shared by concurrent evaluations (threads): reordering is locked
+        self._order_lock = threading.Lock()
+        self._rule_order = self.rule_stats.order(policy.rules)
+        self._evaluations_since_reorder = 0
 
-    def evaluate(self, proposal: Proposal) -> Decision:
-        violations: List[Violation] = []
+    def evaluate(
+        self,
+        proposal: Proposal,
+        anomaly_report: Optional[AnomalyReport] = None,
+        deadline_ms: Optional[float] = None,
+        use_deadline: bool = True
+    ) -> Decision:
+        """
+        Evaluates a proposal. `anomaly_report` may carry a scan already performed
+        while the diff was being received (see DiffScanner).
+
+        `deadline_ms` (or `meta.deadline` of the policy) bounds the evaluation:
+        a stage over its budget stops and the decision is a conservative
+        require_human naming the stage in `timedOutStage`. `use_deadline=False`
+        evaluates to completion regardless.
+        """
+        return self.evaluate_record(proposal, anomaly_report, deadline_ms, use_deadline).to_model()
+
+    def evaluate_record(
+        self,
+        proposal: Proposal,
+        anomaly_report: Optional[AnomalyReport] = None,
+        deadline_ms: Optional[float] = None,
+        use_deadline: bool = True
+    ) -> DecisionRecord:
+        """Same as `evaluate`, returning the engine's internal (unvalidated) decision."""
+        violations: List[ViolationRecord] = []
         actions: List[str] = []
+        deadline = Deadline.from_config(self.deadline_config, deadline_ms) if use_deadline else None
 
         # -----------------------------
         # 1. Signals Preparation
         # -----------------------------
-        risk_level = 'low'
-        for risk in self.policy.risks:
-            for pattern in risk.match:
-                if any(fnmatch.fnmatch(f, pattern) for f in proposal.files):
-                    risk_level = risk.level
-                    break
-
-        anomaly_report = self.anomaly_detector.detect(proposal)
-        
-        evaluation_context = {
-            "payload": proposal.model_dump(),
-            "engine": {
-                "riskLevel": risk_level,
-                "isAnomaly": anomaly_report.isAnomaly,
-                "anomalyScore": anomaly_report.score,
-                "isOnlyDocs": all(f.endswith('.md') or f.startswith('docs/') for f in proposal.files),
-                "isScoped": self._is_within_scope(proposal.files),
-            },
-            "anomaly": anomaly_report.model_dump()
-        }
+        risk_level = self.compiled.risk_level(proposal.files)
 
-        # -----------------------------
-        # 2. Rule Evaluation
-        # -----------------------------
-        for rule in self.policy.rules:
-            # condition: if matched, execute action
-            if rule.condition:
-                if SafeEvaluator.evaluate(rule.condition, evaluation_context):
-                    self._apply_rule_action(rule, actions, violations)
+        # Only the signals the policy references are computed (e.g. no anomaly scan
+        # of a huge diff when no rule reads `engine.isAnomaly` or `anomaly.*`)
+        detect = self.anomaly_detector.detect
+        if deadline is not None:
+            detect = lambda p: self.anomaly_detector.detect(p, deadline)
+        signals = EvaluationContext(
+            proposal, risk_level, detect, self._is_within_scope,
+            anomaly_report=anomaly_report
+        )
+
+        skipped_rules: Optional[List[str]] = None
+        try:
+            evaluation_context = signals.materialize(self.dependencies)
 
-            # check: if NOT matched, execute action
-            if rule.check:
-                if not SafeEvaluator.evaluate(rule.check, evaluation_context):
-                    self._apply_rule_action(rule, actions, violations)
+            # -----------------------------
+            # 2. Rule Evaluation
+            # -----------------------------
+            if deadline is not None:
+                deadline.enter('rules')
+            if self.evaluation_mode == 'fail-fast':
+                skipped_rules = self._evaluate_rules_fail_fast(evaluation_context, actions, violations, deadline)
+            else:
+                for rule in self.policy.rules:
+                    if deadline is not None:
+                        deadline.check()
+                    self._evaluate_rule(rule, evaluation_context, actions, violations)
+            if deadline is not None:
+                deadline.check()
+        except DeadlineExceeded as e:
+            return self._timed_out(proposal, risk_level, signals.computed_anomaly_report, e)
 
         # -----------------------------
         # 3. Value & Mercy
@@ -61,13 +136,12 @@ class PolicyEngine:
         value_score = 1.0
         if self.manifesto:
             # Calculate value score
+            value_weights = self.compiled.value_weights
             for v in violations:
-                rule = next((r for r in self.policy.rules if r.id == v.ruleId), None)
-                if rule and rule.valueId:
-                    val_item = next((vi for vi in self.manifesto.values if vi.id == rule.valueId), None)
-                    if val_item:
-                        v.valueWeight = val_item.weight
-                        value_score -= (val_item.weight * 0.2)
+                weight = value_weights.get(v.ruleId)
+                if weight is not None:
+                    v.valueWeight = weight
+                    value_score -= (weight * 0.2)
 
             # Mercy hooks
             for hook in self.manifesto.mercy_hooks:
@@ -87,14 +161,15 @@ class PolicyEngine:
         is_hard_blocked = 'block' in actions
         requires_human = 'require_human' in actions
 
-        decision = Decision(
+        decision = DecisionRecord(
             allowed=not is_hard_blocked and not requires_human,
             requiresHuman=requires_human,
             riskLevel=risk_level,
             actions=actions,
             violations=violations,
             valueScore=max(0.0, value_score),
-            anomalyReport=anomaly_report,
+            anomalyReport=signals.computed_anomaly_report,
+            skippedRules=skipped_rules,
             auditLog=""
         )
 
@@ -102,16 +177,16 @@ class PolicyEngine:
             responsible_entity = self.liability.attribute(decision)
             credit_impact = self.liability.calculate_credit_impact(decision)
             
-            decision.accountability = Accountability(
-                responsibleEntity=responsible_entity,
-                signature=self.liability.generate_signature(proposal, decision),
-                creditImpact=credit_impact
+            decision.accountability = AccountabilityRecord(
+                responsible_entity,
+                self.liability.generate_signature(proposal, decision),
+                credit_impact
             )
-            
+
             if responsible_entity != 'system-fault':
                 self.liability.update_credits(credit_impact)
 
-        decision.audit_log = self._build_audit_log(proposal, actions, violations)
+        decision.auditLog = self._build_audit_log(proposal, actions, violations)
 
         if self.policy.requiresConsensus:
             raise RuntimeError(
@@ -121,36 +196,113 @@ class PolicyEngine:
 
         return decision
 
-    def _apply_rule_action(self, rule: Any, actions: List[str], violations: List[Violation]):
+    def _evaluate_rule(self, rule: Any, context: Dict[str, Any], actions: List[str], violations: List[ViolationRecord]) -> bool:
+        triggered = False
+
+        # condition: if matched, execute action
+        if rule.condition:
+            if SafeEvaluator.evaluate(rule.condition, context):
+                self._apply_rule_action(rule, actions, violations)
+                triggered = True
+
+        # check: if NOT matched, execute action
+        if rule.check:
+            if not SafeEvaluator.evaluate(rule.check, context):
+                self._apply_rule_action(rule, actions, violations)
+                triggered = True
+
+        return triggered
+
+    def _evaluate_rules_fail_fast(
+        self,
+        context: Dict[str, Any],
+        actions: List[str],
+        violations: List[ViolationRecord],
+        deadline: Optional[Deadline] = None
+    ) -> List[str]:
+        """
+        Evaluates rules cheapest-expected-blocker first and stops once the decision
+        is sealed. After the first block or require_human only the sealing rules of
+        the kind not seen yet still run, so `allowed`, `requiresHuman` and the
+        liability attribution and credit impact all equal full mode's. Warnings and
+        further violations of the skipped rules are not collected: `violations`,
+        `actions`, `valueScore` and `auditLog` may list less than full mode. A mercy
+        hook still applies as in full mode. Returns the ids of the skipped rules.
+        """
+        with self._order_lock:
+            self._evaluations_since_reorder += 1
+            if self._evaluations_since_reorder >= self.REORDER_INTERVAL:
+                self._rule_order = self.rule_stats.order(self.policy.rules)
+                self._evaluations_since_reorder = 0
+            rules = self._rule_order
+
+        skipped: List[str] = []
+        sealed = False
+        for index, rule in enumerate(rules):
+            if sealed and (rule.action not in SEALING_ACTIONS or rule.action in actions):
+                skipped.append(rule.id)
+                continue
+            if deadline is not None:
+                deadline.check()
+            start = time.perf_counter_ns()
+            triggered = self._evaluate_rule(rule, context, actions, violations)
+            self.rule_stats.record(rule.id, time.perf_counter_ns() - start, triggered)
+
+            if triggered and all(a in actions for a in SEALING_ACTIONS):
+                return skipped + [r.id for r in rules[index + 1:]]
+            sealed = sealed or (triggered and any(a in SEALING_ACTIONS for a in actions))
+        return skipped
+
+    def _timed_out(
+        self,
+        proposal: Proposal,
+        risk_level: str,
+        anomaly_report: Optional[AnomalyReport],
+        exceeded: DeadlineExceeded
+    ) -> DecisionRecord:
+        """
+        Conservative decision for an evaluation cut short: a human decides. No
+        credits are charged, since the outcome says nothing about the proposal;
+        TrustedGuard charges them by completing the evaluation in the background.
+        """
+        actions = ['require_human']
+        violations = [ViolationRecord('deadline-exceeded', str(exceeded), 'block')]
+        return DecisionRecord(
+            allowed=False,
+            requiresHuman=True,
+            riskLevel=risk_level,
+            actions=actions,
+            violations=violations,
+            anomalyReport=anomaly_report,
+            timedOutStage=exceeded.stage,
+            auditLog=self._build_audit_log(proposal, actions, violations)
+        )
+
+    def _apply_rule_action(self, rule: Any, actions: List[str], violations: List[ViolationRecord]):
         high_risk_actions = ['block', 'require_human']
         
         # Privilege check
         privileges = self.policy.meta.get('privileges', [])
         if rule.action in high_risk_actions and 'high-risk-decision' not in privileges:
-            violations.append(Violation(
-                ruleId='privilege-violation',
-                description=f'Policy rule "{rule.id}" lacks privilege for action: {rule.action}.',
-                level='block'
+            violations.append(ViolationRecord(
+                'privilege-violation',
+                f'Policy rule "{rule.id}" lacks privilege for action: {rule.action}.',
+                'block'
             ))
             actions.append('block')
             return
 
         actions.append(rule.action)
         level = 'block' if rule.action in high_risk_actions else 'warn'
-        violations.append(Violation(
-            ruleId=rule.id,
-            description=rule.description or rule.id,
-            level=level
-        ))
+        violations.append(ViolationRecord(rule.id, rule.description or rule.id, level))
 
     def _is_within_scope(self, files: List[str]) -> bool:
-        allowed_patterns = [p for s in self.policy.scopes for p in s.allow]
-        return all(any(fnmatch.fnmatch(f, p) for p in allowed_patterns) for f in files)
+        return self.compiled.is_within_scope(files)
 
-    def _build_audit_log(self, proposal: Proposal, actions: List[str], violations: List[Violation]) -> str:
+    def _build_audit_log(self, proposal: Proposal, actions: List[str], violations: List[ViolationRecord]) -> str:
         return json.dumps({
             "proposalId": proposal.id,
             "timestamp": proposal.timestamp,
             "actions": actions,
-            "violations": [v.model_dump() for v in violations]
+            "violations": [v.to_dict() for v in violations]
         }, indent=2)
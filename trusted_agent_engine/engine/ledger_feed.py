@@ -0,0 +1,91 @@
+import os
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from .types import DecisionTrace
+
+DEFAULT_SUBSCRIBER_QUEUE = 1024
+
+class FeedSubscription:
+    """
+    Queue of traces recorded after it was opened, owned by one event loop.
+    When the consumer falls `max_queued` traces behind, the oldest are dropped
+    (and counted): the ledger still holds them, so consumers refill gaps from it.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, shard: Optional[str], max_queued: int):
+        self.loop = loop
+        self.shard = shard
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+    def _offer(self, shard: str, trace: DecisionTrace) -> None:
+        # Runs on the subscriber's loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((shard, trace))
+
+    async def get(self) -> DecisionTrace:
+        _, trace = await self.queue.get()
+        return trace
+
+class LedgerFeed:
+    """
+    In-process fan-out of the traces recorded to a workspace's ledger. ContextBank
+    publishes every trace right after appending it; subscribers get it on their
+    own event loop without touching the ledger file. Records written by other
+    processes are not seen here (see LedgerTailer).
+    """
+
+    _instances: Dict[str, 'LedgerFeed'] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, workspace_root: str) -> 'LedgerFeed':
+        """Process-wide instance per workspace."""
+        path = os.path.abspath(workspace_root)
+        with cls._instances_lock:
+            feed = cls._instances.get(path)
+            if feed is None:
+                feed = cls._instances[path] = cls()
+            return feed
+
+    def __init__(self):
+        self._subscribers: List[FeedSubscription] = []
+        self._lock = threading.Lock()
+
+    def publish(self, shard: str, trace: DecisionTrace) -> None:
+        """Hands a recorded trace to the subscribers; safe to call from any thread."""
+        if not self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.shard is not None and subscriber.shard != shard:
+                continue
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._offer, shard, trace)
+            except RuntimeError:  # its loop is closed
+                self._remove(subscriber)
+
+    @contextmanager
+    def subscription(
+        self,
+        shard: Optional[str] = None,
+        max_queued: int = DEFAULT_SUBSCRIBER_QUEUE
+    ) -> Iterator[FeedSubscription]:
+        """Subscribes the running event loop to one shard's traces (None: every shard)."""
+        subscriber = FeedSubscription(asyncio.get_running_loop(), shard, max_queued)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self._remove(subscriber)
+
+    def _remove(self, subscriber: FeedSubscription) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
@@ -0,0 +1,366 @@
+import os
+import json
+import time
+import bisect
+import fnmatch
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .types import DecisionTrace, LedgerCheckpoint
+from .merkle import GENESIS_HASH, MerkleAccumulator, MerkleTree, entry_hash
+from .sovereign import SovereignManager
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are POSIX-only
+    fcntl = None
+
+class IndexEntry(NamedTuple):
+    offset: int
+    length: int
+    timestamp: float
+    outcome: str
+    riskLevel: str
+    ruleIds: Tuple[str, ...]
+    author: str
+    files: Tuple[str, ...]
+    recordedAt: float
+    entryHash: str  # sha256 of the record bytes; the next record's prevHash
+    completion: bool  # background completion of a deadline decision (not a decision itself)
+
+def parse_index_line(line: bytes) -> IndexEntry:
+    offset, length, timestamp, outcome, risk, rules, author, files, recorded_at, digest, completion = json.loads(line)
+    return IndexEntry(
+        offset, length, timestamp, outcome, risk, tuple(rules), author, tuple(files), recorded_at, digest, completion
+    )
+
+def read_index_file(index_path: str, offset: int = 0) -> Iterator[Tuple[int, int, IndexEntry]]:
+    """
+    Streams `(start, end, entry)` for the lines of an index file from byte
+    `offset`, up to the first incomplete line; nothing is kept in memory.
+    """
+    try:
+        f = open(index_path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            yield offset, offset + len(line), parse_index_line(line)
+            offset += len(line)
+
+def checkpoint_message(ledger_name: str, size: int, root: str) -> str:
+    """What a checkpoint signature covers: the ledger file, its size and Merkle root."""
+    return f"trusted-ledger-checkpoint:{ledger_name}:{size}:{root}"
+
+# Fields with posting lists (value -> ascending entry positions)
+POSTING_FIELDS = ('outcome', 'riskLevel', 'ruleId', 'author')
+
+class LedgerIndex:
+    """
+    Secondary index over an append-only ledger file.
+    One compact line per trace is appended to `<ledger>.idx` on record, holding the
+    trace's byte range and the filterable fields. Queries scan posting lists and
+    index entries only; the ledger is read just for the records that are returned.
+
+    The index lock also serializes writers of the ledger itself (see `exclusive`),
+    so an entry's position is the record's sequence number within its ledger.
+    Entry hashes feed an incremental Merkle tree, from which checkpoints
+    (`<ledger>.checkpoints`) and inclusion proofs are produced.
+    """
+
+    # Ledgers whose index stays loaded; the least recently used is dropped beyond this
+    MAX_CACHED = 256
+
+    _instances: 'OrderedDict[str, LedgerIndex]' = OrderedDict()
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_ledger(cls, ledger_path: str) -> 'LedgerIndex':
+        """Process-wide instance per ledger, so the in-memory index is built once."""
+        path = os.path.abspath(ledger_path)
+        with cls._instances_lock:
+            index = cls._instances.get(path)
+            if index is None:
+                index = cls._instances[path] = cls(path)
+                if len(cls._instances) > cls.MAX_CACHED:
+                    cls._instances.popitem(last=False)
+            else:
+                cls._instances.move_to_end(path)
+            return index
+
+    def __init__(self, ledger_path: str):
+        self.ledger_path = ledger_path
+        self.index_path = f"{ledger_path}.idx"
+        self.checkpoint_path = f"{ledger_path}.checkpoints"
+        self.entries: List[IndexEntry] = []
+        # Running maximum of recordedAt: non-decreasing, so time ranges are bisected
+        self.recorded_max: List[float] = []
+        self.merkle = MerkleAccumulator()
+        self.completions = 0  # entries that are background completions
+        self.postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in POSTING_FIELDS}
+        self._read_offset = 0  # bytes of the index file already loaded
+        self._indexed_end = 0  # ledger bytes covered by the index
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+
+    # -----------------------------
+    # Maintenance
+    # -----------------------------
+    @contextmanager
+    def exclusive(self) -> Iterator[int]:
+        """
+        Holds the ledger's write lock, with the index caught up to the end of the
+        ledger. Yields the sequence number of the next record.
+        """
+        with self._file_lock():
+            self._catch_up()
+            if self._ledger_size() > self._indexed_end:
+                # Torn record from a writer that died mid-append: terminate it so
+                # the next record starts on its own line
+                with open(self.ledger_path, 'ab') as f:
+                    f.write(b'\n')
+                self._catch_up()
+            yield len(self.entries)
+
+    def append(self, offset: int, length: int, trace: DecisionTrace, record_hash: str) -> None:
+        """Indexes a trace that was just appended to the ledger at `offset`."""
+        with self._file_lock():
+            self._catch_up(until=offset)
+            self._write([self._entry_for(offset, length, trace, record_hash)])
+
+    def last_hash(self) -> str:
+        """Hash the next record chains to. Call under `exclusive`."""
+        return self.entries[-1].entryHash if self.entries else GENESIS_HASH
+
+    def sync(self) -> None:
+        """Loads entries appended by other writers and indexes any unindexed ledger tail."""
+        with self._lock:
+            self._load_new_entries()
+            if self._ledger_size() > self._indexed_end:
+                with self._file_lock():
+                    self._catch_up()
+
+    def _catch_up(self, until: Optional[int] = None) -> None:
+        # Caller holds the file lock. Indexes ledger records written without an
+        # index line (older ledgers, or a crash between the two appends).
+        self._load_new_entries()
+        end = self._ledger_size() if until is None else until
+        if self._indexed_end >= end:
+            return
+
+        new_entries = []
+        with open(self.ledger_path, 'rb') as f:
+            f.seek(self._indexed_end)
+            offset = self._indexed_end
+            while offset < end:
+                line = f.readline()
+                if not line or not line.endswith(b'\n'):
+                    break  # a record still being written
+                if line.strip():
+                    try:
+                        trace = DecisionTrace.model_validate_json(line)
+                        record = line[:-1]
+                        new_entries.append(self._entry_for(offset, len(record), trace, entry_hash(record)))
+                    except ValueError:
+                        print(f"[Governance Warning] Skipping unreadable ledger record at byte {offset} of {self.ledger_path}")
+                offset += len(line)
+        self._write(new_entries)
+        self._indexed_end = max(self._indexed_end, offset)
+
+    def _write(self, entries: List[IndexEntry]) -> None:
+        if not entries:
+            return
+        data = ''.join(json.dumps(list(e), separators=(',', ':')) + '\n' for e in entries)
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(data)
+        self._load_new_entries()
+
+    def _load_new_entries(self) -> None:
+        with self._lock:
+            for _, end, entry in read_index_file(self.index_path, self._read_offset):
+                self._read_offset = end
+                self._add(entry)
+
+    def _add(self, entry: IndexEntry) -> None:
+        position = len(self.entries)
+        self.entries.append(entry)
+        self.recorded_max.append(max(entry.recordedAt, self.recorded_max[-1]) if self.recorded_max else entry.recordedAt)
+        self.merkle.append(entry.entryHash)
+        self.completions += entry.completion
+        self._indexed_end = max(self._indexed_end, entry.offset + entry.length + 1)
+        self.postings['outcome'].setdefault(entry.outcome, []).append(position)
+        self.postings['riskLevel'].setdefault(entry.riskLevel, []).append(position)
+        self.postings['author'].setdefault(entry.author, []).append(position)
+        for rule_id in set(entry.ruleIds):
+            self.postings['ruleId'].setdefault(rule_id, []).append(position)
+
+    @staticmethod
+    def _entry_for(offset: int, length: int, trace: DecisionTrace, record_hash: str) -> IndexEntry:
+        return IndexEntry(
+            offset, length, trace.proposal.timestamp, trace.outcome, trace.riskLevel,
+            tuple(v.ruleId for v in trace.violations), trace.proposal.author, tuple(trace.proposal.files),
+            trace.recordedAt if trace.recordedAt is not None else trace.proposal.timestamp,
+            record_hash, bool(trace.backgroundCompletion)
+        )
+
+    def _ledger_size(self) -> int:
+        try:
+            return os.path.getsize(self.ledger_path)
+        except FileNotFoundError:
+            return 0
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with self._lock:
+            # Reentrant: flock on a second descriptor would wait for ourselves
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(f"{self.index_path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -----------------------------
+    # Integrity
+    # -----------------------------
+    def write_checkpoint(self, private_key: Optional[str] = None) -> Optional[LedgerCheckpoint]:
+        """
+        Appends a Merkle checkpoint of the ledger as it is now, signed when a
+        sovereign private key is given. Returns None if the ledger is empty or
+        already checkpointed at this size. Call under `exclusive` (or it takes the lock).
+        """
+        with self._file_lock():
+            self._catch_up()
+            size = self.merkle.size
+            checkpoints = self.checkpoints()
+            if size == 0 or (checkpoints and checkpoints[-1].size == size):
+                return None
+            root = self.merkle.root()
+            signature = None
+            if private_key:
+                message = checkpoint_message(os.path.basename(self.ledger_path), size, root)
+                signature = SovereignManager.sign_policy(message, private_key)
+            checkpoint = LedgerCheckpoint(
+                size=size, root=root, lastHash=self.entries[-1].entryHash, createdAt=time.time(), signature=signature
+            )
+            with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+                f.write(checkpoint.model_dump_json() + '\n')
+            return checkpoint
+
+    def checkpoints(self) -> List[LedgerCheckpoint]:
+        try:
+            with open(self.checkpoint_path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        return [LedgerCheckpoint.model_validate_json(line) for line in lines if line.endswith(b'\n')]
+
+    def inclusion_path(self, position: int, size: int) -> List[str]:
+        """Audit path proving entry `position` in the tree of the first `size` entries."""
+        self.sync()
+        with self._lock:
+            if size > len(self.entries):
+                raise ValueError(f"Tree size {size} exceeds the {len(self.entries)} indexed records")
+            entries = self.entries
+            return MerkleTree(lambda i: entries[i].entryHash, self.merkle.chunk_roots).inclusion_path(position, size)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def iter_matches(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        before: Optional[int] = None,
+        file_glob: Optional[str] = None,
+        completions: bool = False,
+        **equals: Optional[str]
+    ) -> Iterator[int]:
+        """
+        Yields matching entry positions, newest first, strictly below `before`.
+        `since` and `until` bound the time the engine recorded the trace (the
+        order pages are served in), not the client-supplied proposal timestamp;
+        they are bisected before any entry is scanned. The most selective
+        posting list drives the scan; other filters are checked on the index
+        entries. Background completions are skipped unless `completions` is
+        set: their deadline decision is already counted.
+        """
+        self.sync()
+        # Entries and posting lists are append-only: a copy of the driving
+        # posting list taken under the lock stays valid without holding it,
+        # so the lock is never held while the caller consumes the results
+        with self._lock:
+            entries = self.entries
+            limit = len(entries) if before is None else min(before, len(entries))
+            # recordedAt is stamped under the shard lock, so it only moves back
+            # with the clock; the running maximum keeps the bisection valid
+            start = 0 if since is None else bisect.bisect_left(self.recorded_max, since, 0, limit)
+            if until is not None:
+                limit = bisect.bisect_right(self.recorded_max, until, start, limit)
+            filters = {k: v for k, v in equals.items() if v is not None}
+
+            driver: Optional[List[int]] = None
+            for field, value in filters.items():
+                postings = self.postings[field].get(value, [])
+                if driver is None or len(postings) < len(driver):
+                    driver = postings
+            if driver is None:
+                candidates = range(limit - 1, start - 1, -1)
+            else:
+                candidates = reversed(driver[bisect.bisect_left(driver, start):bisect.bisect_left(driver, limit)])
+
+        for position in candidates:
+            entry = entries[position]
+            if entry.completion and not completions:
+                continue
+            if since is not None and entry.recordedAt < since:
+                continue
+            if not self._matches_fields(entry, filters):
+                continue
+            if file_glob and not any(fnmatch.fnmatch(f, file_glob) for f in entry.files):
+                continue
+            yield position
+
+    @staticmethod
+    def _matches_fields(entry: IndexEntry, filters: Dict[str, str]) -> bool:
+        for field, value in filters.items():
+            if field == 'ruleId':
+                if value not in entry.ruleIds:
+                    return False
+            elif getattr(entry, field) != value:
+                return False
+        return True
+
+    def count(self, **filters) -> int:
+        equals = {k: v for k, v in filters.items() if k in POSTING_FIELDS and v is not None}
+        others = {k: v for k, v in filters.items() if k not in POSTING_FIELDS and v is not None}
+        self.sync()
+        if len(equals) == 1 and not others and not self.completions:
+            # Pure posting-list count, no entry is touched
+            field, value = next(iter(equals.items()))
+            return len(self.postings[field].get(value, []))
+        return sum(1 for _ in self.iter_matches(**filters))
+
+    def read(self, positions: List[int]) -> List[DecisionTrace]:
+        return [DecisionTrace.model_validate_json(raw) for raw in self.read_raw(positions)]
+
+    def read_raw(self, positions: Iterable[int]) -> Iterator[bytes]:
+        """Raw JSON of the records at `positions`, without parsing them."""
+        with open(self.ledger_path, 'rb') as f:
+            for position in positions:
+                entry = self.entries[position]
+                f.seek(entry.offset)
+                yield f.read(entry.length)
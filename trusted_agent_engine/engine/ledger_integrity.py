@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from .types import InclusionProof, LedgerCheckpoint, LedgerVerification, ShardVerification
+from .context_bank import ledger_path, ledger_shards
+from .ledger_index import LedgerIndex, checkpoint_message
+from .merkle import GENESIS_HASH, MerkleAccumulator, root_from_path
+from .sovereign import SovereignManager
+
+# Ledgers smaller than this are verified in one segment, in-process
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+PREV_MARKER = b'"prevHash":"'
+HASH_HEX_LENGTH = 64
+
+class SegmentScan(NamedTuple):
+    records: int  # excluding torn ones
+    digests: bytes  # 32-byte entry hashes, concatenated
+    first_prev: Optional[str]  # prevHash of the first record (None: unchained)
+    first_offset: int
+    last_offset: int
+    chained: bool  # any chained record in the segment
+    legacy: int
+    torn: int
+    # First problem inside the segment: (record index within segment, byte offset, reason)
+    issue: Optional[Tuple[int, int, str]]
+
+def _prev_hash(record: bytes) -> Optional[str]:
+    # prevHash is serialized after the proposal, so the last occurrence is the
+    # top-level field (JSON-escaped strings cannot contain the quoted marker)
+    at = record.rfind(PREV_MARKER)
+    if at < 0:
+        return None
+    start = at + len(PREV_MARKER)
+    value = record[start:start + HASH_HEX_LENGTH]
+    if record[start + HASH_HEX_LENGTH:start + HASH_HEX_LENGTH + 1] != b'"':
+        return None
+    return value.decode('ascii', errors='replace')
+
+def _scan_segment(path: str, start: int, end: int) -> SegmentScan:
+    """
+    Hashes the records starting in [start, end) and checks the chain links
+    inside the segment; links across segments are checked by the caller.
+    """
+    digests = bytearray()
+    records = legacy = torn = 0
+    first_prev: Optional[str] = None
+    first_offset = last_offset = -1
+    chained = False
+    issue: Optional[Tuple[int, int, str]] = None
+    previous: Optional[bytes] = None
+
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # the record straddling `start` belongs to the previous segment
+        offset = f.tell()
+        while offset < end:
+            line = f.readline()
+            if not line.endswith(b'\n'):
+                break  # a record still being written
+            record = line[:-1]
+            record_offset, offset = offset, offset + len(line)
+            if not record.strip():
+                continue
+
+            prev = _prev_hash(record) if record.endswith(b'}') else None
+            if prev is None:
+                try:
+                    json.loads(record)
+                except ValueError:
+                    torn += 1  # partial record of a crashed writer, never indexed
+                    continue
+                legacy += 1
+                if chained and issue is None:
+                    issue = (records, record_offset, "unchained record after chained records")
+            else:
+                if previous is not None and prev != previous.hex() and issue is None:
+                    issue = (records - 1, last_offset, "record does not match the hash stored in its successor")
+                chained = True
+
+            if records == 0:
+                first_prev, first_offset = prev, record_offset
+            previous = hashlib.sha256(record).digest()
+            digests += previous
+            last_offset = record_offset
+            records += 1
+
+    return SegmentScan(records, bytes(digests), first_prev, first_offset, last_offset, chained, legacy, torn, issue)
+
+def _segments(size: int, workers: int, segment_bytes: int) -> List[Tuple[int, int]]:
+    length = max(segment_bytes, -(-size // max(1, workers)))
+    return [(start, min(size, start + length)) for start in range(0, size, length)] or [(0, 0)]
+
+def verify_ledger(
+    workspace_root: str,
+    public_key: Optional[str] = None,
+    workers: Optional[int] = None,
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES
+) -> LedgerVerification:
+    """
+    Verifies every ledger file of a workspace: the hash chain record by record,
+    then each Merkle checkpoint (and its signature, given the sovereign public
+    key). Large ledgers are split into byte segments hashed in parallel.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    shards = ledger_shards(workspace_root)
+    tasks: List[Tuple[str, int, int]] = []
+    for shard, path in shards.items():
+        tasks.extend((shard, start, end) for start, end in _segments(os.path.getsize(path), workers, segment_bytes))
+
+    paths = [shards[shard] for shard, _, _ in tasks]
+    starts = [start for _, start, _ in tasks]
+    ends = [end for _, _, end in tasks]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            scans = list(pool.map(_scan_segment, paths, starts, ends))
+    else:
+        scans = list(map(_scan_segment, paths, starts, ends))
+
+    by_shard: Dict[str, List[SegmentScan]] = {}
+    for (shard, _, _), scan in zip(tasks, scans):
+        by_shard.setdefault(shard, []).append(scan)
+
+    results = [
+        _verify_shard(shard, by_shard.get(shard, []), LedgerIndex.for_ledger(path).checkpoints(), public_key)
+        for shard, path in shards.items()
+    ]
+    return LedgerVerification(
+        ok=all(r.ok for r in results),
+        shards=results,
+        durationMs=(time.perf_counter() - started) * 1000
+    )
+
+def _verify_shard(
+    shard: str,
+    scans: List[SegmentScan],
+    checkpoints: List[LedgerCheckpoint],
+    public_key: Optional[str]
+) -> ShardVerification:
+    result = ShardVerification(
+        shard=shard, ok=True, records=0, legacyRecords=0, tornRecords=0,
+        checkpoints=len(checkpoints), signedCheckpoints=0, unverifiedCheckpoints=0
+    )
+
+    def corrupt(position: int, offset: Optional[int], reason: str) -> None:
+        if result.ok:
+            result.ok = False
+            result.firstCorruptPosition = position
+            result.firstCorruptOffset = offset
+            result.error = reason
+
+    # 1. Chain: stitch the segments together
+    last_digest: Optional[bytes] = None
+    last_offset = -1
+    chained = False
+    for scan in scans:
+        result.legacyRecords += scan.legacy
+        result.tornRecords += scan.torn
+        if not scan.records:
+            continue
+        base = result.records
+        if scan.first_prev is not None:
+            expected = last_digest.hex() if last_digest is not None else GENESIS_HASH
+            if scan.first_prev != expected:
+                if base:
+                    corrupt(base - 1, last_offset, "record does not match the hash stored in its successor")
+                else:
+                    corrupt(0, scan.first_offset, "first record does not start the chain")
+        elif chained:
+            corrupt(base, scan.first_offset, "unchained record after chained records")
+        if scan.issue is not None:
+            index, offset, reason = scan.issue
+            corrupt(base + index, offset, reason)
+        chained = chained or scan.chained
+        last_digest = scan.digests[-32:]
+        last_offset = scan.last_offset
+        result.records += scan.records
+
+    # 2. Checkpoints: one pass over the entry hashes
+    pending = sorted(checkpoints, key=lambda c: c.size)
+    ledger_name = os.path.basename(ledger_path('', shard))
+    merkle = MerkleAccumulator()
+    verified_size = 0
+    digests = b''.join(scan.digests for scan in scans)
+    for checkpoint in pending:
+        if checkpoint.size > result.records:
+            corrupt(result.records, None, f"checkpoint covers {checkpoint.size} records but the ledger has "
+                                          f"{result.records} (truncated)")
+            break
+        while merkle.size < checkpoint.size:
+            merkle.append_digest(digests[merkle.size * 32:(merkle.size + 1) * 32])
+        if merkle.root() != checkpoint.root or digests[(checkpoint.size - 1) * 32:checkpoint.size * 32].hex() != checkpoint.lastHash:
+            corrupt(verified_size, None, f"records {verified_size}..{checkpoint.size - 1} do not match "
+                                         f"the Merkle root of checkpoint {checkpoint.size}")
+            break
+        if checkpoint.signature:
+            message = checkpoint_message(ledger_name, checkpoint.size, checkpoint.root)
+            if not public_key:
+                result.unverifiedCheckpoints += 1  # signed, but nothing to check the signature against
+            elif SovereignManager.verify_policy(message, checkpoint.signature, public_key):
+                result.signedCheckpoints += 1
+            else:
+                corrupt(verified_size, None, f"signature of checkpoint {checkpoint.size} is invalid")
+                break
+        verified_size = checkpoint.size
+    return result
+
+def verify_inclusion(proof: InclusionProof, public_key: Optional[str] = None) -> bool:
+    """
+    Checks an inclusion proof in O(log n). With a public key, the proof must
+    also be against a checkpoint signed by the sovereign key.
+    """
+    try:
+        root = root_from_path(proof.entryHash, proof.position, proof.treeSize, proof.path)
+    except ValueError:
+        return False
+    if root != proof.root:
+        return False
+    if public_key is None:
+        return True
+    if not proof.signature:
+        return False
+    message = checkpoint_message(os.path.basename(ledger_path('', proof.shard)), proof.treeSize, proof.root)
+    return SovereignManager.verify_policy(message, proof.signature, public_key)
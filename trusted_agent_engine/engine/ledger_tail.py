@@ -0,0 +1,114 @@
+import os
+import json
+import asyncio
+from typing import AsyncIterator, Dict, Iterator, NamedTuple, Optional
+from .types import DecisionTrace
+from .context_bank import MAIN_SHARD, ledger_shards, decode_cursor, encode_cursor
+from .ledger_feed import LedgerFeed
+
+READ_CHUNK = 1 << 20
+
+class TailEvent(NamedTuple):
+    shard: str
+    offset: int  # of the record in its ledger file
+    record: bytes  # raw JSON, as written
+
+    def trace(self) -> DecisionTrace:
+        return DecisionTrace.model_validate_json(self.record)
+
+class LedgerTailer:
+    """
+    Follows every ledger file of a workspace by byte offset, for consumers in
+    another process (or another server worker) than the writers. Each poll reads
+    only what was appended since the previous one, and only complete lines: the
+    start of a record still being written is buffered, and the record is
+    yielded by the poll that sees its newline. Lines that do not parse (torn
+    records) are skipped. `cursor()` is the position to resume from, e.g. after
+    a restart.
+    """
+
+    def __init__(self, workspace_root: str, offsets: Optional[Dict[str, int]] = None, from_end: bool = False):
+        self.workspace_root = workspace_root
+        # Shards missing from `offsets` (e.g. created since) are read from the start
+        self.offsets: Dict[str, int] = dict(offsets or {})
+        # Bytes read past each offset that do not form a complete line yet
+        self._partial: Dict[str, bytes] = {}
+        if from_end:
+            for shard, path in ledger_shards(workspace_root).items():
+                self.offsets.setdefault(shard, os.path.getsize(path))
+
+    @classmethod
+    def from_cursor(cls, workspace_root: str, cursor: str) -> 'LedgerTailer':
+        """Resumes after the event a `cursor()` was taken at. Raises ValueError if malformed."""
+        return cls(workspace_root, decode_cursor(cursor))
+
+    def cursor(self) -> str:
+        return encode_cursor(self.offsets or {MAIN_SHARD: 0})
+
+    def poll(self) -> Iterator[TailEvent]:
+        """Records appended since the last poll; the cursor advances as each is yielded."""
+        for shard, path in ledger_shards(self.workspace_root).items():
+            offset = self.offsets.get(shard, 0)
+            pending = self._partial.pop(shard, b'')
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            if size < offset + len(pending):
+                print(f"[Governance Warning] Ledger shard '{shard or 'main'}' shrank below the tail offset; "
+                      f"following it from the start.")
+                offset = self.offsets[shard] = 0
+                pending = b''
+
+            if offset + len(pending) < size:
+                with open(path, 'rb') as f:
+                    f.seek(offset + len(pending))
+                    while offset + len(pending) < size:
+                        chunk = f.read(min(READ_CHUNK, size - offset - len(pending)))
+                        if not chunk:
+                            break
+                        data = pending + chunk
+                        start = 0
+                        end = data.find(b'\n')
+                        while end >= 0:
+                            line = data[start:end]
+                            if line.strip():
+                                self.offsets[shard] = offset + end + 1
+                                if self._readable(line):
+                                    yield TailEvent(shard, offset + start, line)
+                                else:
+                                    print(f"[Governance Warning] Skipping unreadable ledger record at byte "
+                                          f"{offset + start} of {path}")
+                            start = end + 1
+                            end = data.find(b'\n', start)
+                        offset += start
+                        pending = data[start:]
+                self.offsets[shard] = offset
+            if pending:
+                # A record still being written: keep its bytes until the newline arrives
+                self._partial[shard] = pending
+
+    @staticmethod
+    def _readable(line: bytes) -> bool:
+        # A torn record from a writer that died mid-append is terminated by the
+        # next writer's newline (see LedgerIndex.exclusive): not valid JSON
+        try:
+            json.loads(line)
+            return True
+        except ValueError:
+            return False
+
+    async def follow(self, interval: float = 0.5) -> AsyncIterator[TailEvent]:
+        """
+        Polls forever. Records of this process wake it up immediately through
+        the workspace's LedgerFeed; other writers are seen within `interval` seconds.
+        """
+        feed = LedgerFeed.for_workspace(self.workspace_root)
+        with feed.subscription(max_queued=1) as wakeups:
+            while True:
+                for event in self.poll():
+                    yield event
+                try:
+                    await asyncio.wait_for(wakeups.get(), interval)
+                except asyncio.TimeoutError:
+                    pass
@@ -2,7 +2,15 @@ import os
 import json
 import hashlib
 from typing import Dict, Any, Literal, Optional
-from .types import Proposal, Decision, Accountability
+from .types import Proposal
+from .records import DecisionLike
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are POSIX-only
+    fcntl = None
+
+INITIAL_CREDITS = 100
 
 class LiabilityManager:
     def __init__(self, workspace_root: str):
@@ -13,11 +21,22 @@ class LiabilityManager:
         directory = os.path.dirname(self.ledger_path)
         if not os.path.exists(directory):
             os.makedirs(directory, exist_ok=True)
-        if not os.path.exists(self.ledger_path):
-            with open(self.ledger_path, 'w', encoding='utf-8') as f:
-                json.dump({"agentCredits": 100}, f, indent=2)
+        # Create without truncating, then initialize under the lock: a worker
+        # starting up never resets credits another worker has already updated
+        fd = os.open(self.ledger_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with open(fd, 'r+', encoding='utf-8') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            if os.fstat(f.fileno()).st_size == 0:
+                json.dump({"agentCredits": INITIAL_CREDITS}, f, indent=2)
+
+    @staticmethod
+    def _load(f) -> Dict[str, Any]:
+        content = f.read()
+        # Empty only while its creator waits for the lock to initialize it
+        return json.loads(content) if content.strip() else {"agentCredits": INITIAL_CREDITS}
 
-    def generate_signature(self, proposal: Proposal, decision: Decision) -> str:
+    def generate_signature(self, proposal: Proposal, decision: DecisionLike) -> str:
         data = {
             "p": proposal.id,
             "f": proposal.files,
@@ -27,7 +46,7 @@ class LiabilityManager:
         encoded = json.dumps(data, sort_keys=True).encode('utf-8')
         return hashlib.sha256(encoded).hexdigest()[:16]
 
-    def attribute(self, decision: Decision) -> Literal['ai-agent', 'human-approver', 'policy-author', 'system-fault']:
+    def attribute(self, decision: DecisionLike) -> Literal['ai-agent', 'human-approver', 'policy-author', 'system-fault']:
         # Logic hole detection
         if not decision.allowed and not decision.violations:
             if decision.anomalyReport and decision.anomalyReport.isAnomaly:
@@ -44,7 +63,7 @@ class LiabilityManager:
         
         return 'ai-agent'
 
-    def calculate_credit_impact(self, decision: Decision) -> float:
+    def calculate_credit_impact(self, decision: DecisionLike) -> float:
         if decision.allowed:
             return 1.0
         if decision.riskLevel == 'high':
@@ -52,8 +71,11 @@ class LiabilityManager:
         return -2.0
 
     def update_credits(self, impact: float) -> float:
+        # Locked read-modify-write: several server workers share the credits file
         with open(self.ledger_path, 'r+', encoding='utf-8') as f:
-            data = json.load(f)
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            data = self._load(f)
             data['agentCredits'] += impact
             f.seek(0)
             json.dump(data, f, indent=2)
@@ -62,5 +84,7 @@ class LiabilityManager:
 
     def get_credits(self) -> float:
         with open(self.ledger_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH)  # never observe a half-rewritten file
+            data = self._load(f)
             return data['agentCredits']
@@ -0,0 +1,127 @@
+import hashlib
+from typing import Callable, List, Tuple
+
+# prevHash of the first record of a ledger
+GENESIS_HASH = '0' * 64
+# Roots of complete, aligned 2**CHUNK_HEIGHT-leaf subtrees are kept for proofs
+CHUNK_HEIGHT = 10
+CHUNK_SIZE = 1 << CHUNK_HEIGHT
+
+def entry_hash(record: bytes) -> str:
+    """Hash of a ledger record as written (without the trailing newline)."""
+    return hashlib.sha256(record).hexdigest()
+
+# Domain-separated nodes as in RFC 6962, so a leaf can never pass for an interior node
+def leaf_hash(entry: str) -> bytes:
+    return hashlib.sha256(b'\x00' + bytes.fromhex(entry)).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+EMPTY_ROOT = hashlib.sha256(b'').hexdigest()
+
+def _split(size: int) -> int:
+    # Largest power of two strictly below size
+    return 1 << ((size - 1).bit_length() - 1)
+
+class MerkleAccumulator:
+    """
+    Incremental RFC 6962 Merkle tree over entry hashes. Only the roots of the
+    perfect subtrees along the right edge are kept, so an append is O(1)
+    amortized and the root is O(log n). Roots of complete aligned chunks of
+    CHUNK_SIZE leaves are remembered to keep proof generation cheap.
+    """
+
+    __slots__ = ('size', '_peaks', 'chunk_roots')
+
+    def __init__(self):
+        self.size = 0
+        self._peaks: List[Tuple[int, bytes]] = []  # (height, hash), left to right
+        self.chunk_roots: List[bytes] = []
+
+    def append(self, entry: str) -> None:
+        self.append_digest(bytes.fromhex(entry))
+
+    def append_digest(self, entry: bytes) -> None:
+        height, digest = 0, hashlib.sha256(b'\x00' + entry).digest()
+        while self._peaks and self._peaks[-1][0] == height:
+            _, left = self._peaks.pop()
+            digest = node_hash(left, digest)
+            height += 1
+            if height == CHUNK_HEIGHT:
+                self.chunk_roots.append(digest)
+        self._peaks.append((height, digest))
+        self.size += 1
+
+    def root(self) -> str:
+        if not self._peaks:
+            return EMPTY_ROOT
+        # Folding the peaks right to left gives the RFC 6962 split of a partial tree
+        digest = self._peaks[-1][1]
+        for _, peak in reversed(self._peaks[:-1]):
+            digest = node_hash(peak, digest)
+        return digest.hex()
+
+class MerkleTree:
+    """Subtree hashes and inclusion paths over a ledger's entry hashes."""
+
+    def __init__(self, entries: Callable[[int], str], chunk_roots: List[bytes]):
+        self.entries = entries  # position -> entry hash
+        self.chunk_roots = chunk_roots
+
+    def subtree(self, lo: int, hi: int) -> bytes:
+        size = hi - lo
+        if size == 1:
+            return leaf_hash(self.entries(lo))
+        if size >= CHUNK_SIZE and size & (size - 1) == 0 and lo % CHUNK_SIZE == 0:
+            level = self.chunk_roots[lo // CHUNK_SIZE:hi // CHUNK_SIZE]
+            while len(level) > 1:
+                level = [node_hash(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            return level[0]
+        k = _split(size)
+        return node_hash(self.subtree(lo, lo + k), self.subtree(lo + k, hi))
+
+    def root(self, size: int) -> str:
+        return self.subtree(0, size).hex() if size else EMPTY_ROOT
+
+    def inclusion_path(self, position: int, size: int) -> List[str]:
+        """Audit path of leaf `position` in the tree of the first `size` leaves, bottom-up."""
+        if not 0 <= position < size:
+            raise ValueError(f"Position {position} is outside a tree of size {size}")
+        path: List[bytes] = []
+        lo, hi = 0, size
+        while hi - lo > 1:
+            k = _split(hi - lo)
+            if position < lo + k:
+                path.append(self.subtree(lo + k, hi))
+                hi = lo + k
+            else:
+                path.append(self.subtree(lo, lo + k))
+                lo = lo + k
+        return [digest.hex() for digest in reversed(path)]
+
+def root_from_path(entry: str, position: int, size: int, path: List[str]) -> str:
+    """
+    Recomputes the root from an inclusion path (RFC 9162, 2.1.3.2).
+    Raises ValueError when the path cannot belong to a tree of that size.
+    """
+    if not 0 <= position < size:
+        raise ValueError(f"Position {position} is outside a tree of size {size}")
+    fn, sn = position, size - 1
+    digest = leaf_hash(entry)
+    for sibling_hex in path:
+        if sn == 0:
+            raise ValueError("Inclusion path is too long")
+        sibling = bytes.fromhex(sibling_hex)
+        if fn & 1 or fn == sn:
+            digest = node_hash(sibling, digest)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            digest = node_hash(digest, sibling)
+        fn >>= 1
+        sn >>= 1
+    if sn != 0:
+        raise ValueError("Inclusion path is too short")
+    return digest.hex()
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import time
+import fnmatch
+import hashlib
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+import yaml
+from .types import PolicyConfig, ValueManifesto
+from .safe_evaluator import SafeEvaluator
+from .sovereign import SovereignManager
+
+BUNDLE_FILE = 'agent.policy.bundle'
+BUNDLE_VERSION = 1
+# Layout: magic | 64-byte Ed25519 signature over (magic + payload) | JSON payload
+BUNDLE_MAGIC = b'TAEBNDL1'
+SIGNATURE_SIZE = 64
+
+def _glob_regex(patterns: List[str]) -> Optional[str]:
+    """Folds fnmatch patterns into one regex (None: matches nothing)."""
+    if not patterns:
+        return None
+    return '|'.join(fnmatch.translate(os.path.normcase(p)) for p in patterns)
+
+def _expressions(policy: PolicyConfig, manifesto: Optional[ValueManifesto]) -> List[Any]:
+    expressions = [e for r in policy.rules for e in (r.condition, r.check) if e]
+    if manifesto:
+        expressions.extend(h.condition for h in manifesto.mercy_hooks)
+    return expressions
+
+def collect_dependencies(policy: PolicyConfig, manifesto: Optional[ValueManifesto] = None) -> Optional[Set[str]]:
+    """Context paths referenced by rules and mercy hooks (None: unknown, build everything)."""
+    dependencies: Set[str] = set()
+    for expression in _expressions(policy, manifesto):
+        if isinstance(expression, str):
+            continue  # rejected by SafeEvaluator at evaluation time
+        paths = SafeEvaluator.collect_vars(expression)
+        if paths is None:
+            return None
+        dependencies |= paths
+    return dependencies
+
+class CompiledPolicy:
+    """
+    Load-time work done once per policy: the scope globs and each risk's globs
+    folded into a single regex, the context paths the rules read, and the value
+    weight of each rule. Built from the policy by PolicyEngine, or read
+    ready-made from a bundle.
+    """
+
+    __slots__ = ('scope_source', 'risk_sources', 'dependencies', 'value_weights', '_scope', '_risks')
+
+    def __init__(
+        self,
+        scope_source: Optional[str],
+        risk_sources: List[Tuple[str, str]],
+        dependencies: Optional[Set[str]],
+        value_weights: Dict[str, float]
+    ):
+        self.scope_source = scope_source
+        self.risk_sources = risk_sources
+        self.dependencies = dependencies
+        self.value_weights = value_weights
+        self._scope: Optional[Pattern] = re.compile(scope_source) if scope_source is not None else None
+        self._risks = [(re.compile(source), level) for source, level in risk_sources]
+
+    @classmethod
+    def from_policy(cls, policy: PolicyConfig, manifesto: Optional[ValueManifesto] = None) -> 'CompiledPolicy':
+        risk_sources = []
+        for risk in policy.risks:
+            source = _glob_regex(risk.match)
+            if source is not None:
+                risk_sources.append((source, risk.level))
+
+        value_weights: Dict[str, float] = {}
+        if manifesto:
+            # First rule and value with a given id win, as in a linear lookup
+            values: Dict[str, float] = {}
+            for item in manifesto.values:
+                values.setdefault(item.id, item.weight)
+            seen: Set[str] = set()
+            for rule in policy.rules:
+                if rule.id in seen:
+                    continue
+                seen.add(rule.id)
+                if rule.valueId and rule.valueId in values:
+                    value_weights[rule.id] = values[rule.valueId]
+
+        return cls(
+            _glob_regex([p for s in policy.scopes for p in s.allow]),
+            risk_sources,
+            collect_dependencies(policy, manifesto),
+            value_weights
+        )
+
+    def is_within_scope(self, files: List[str]) -> bool:
+        if self._scope is None:
+            return not files
+        match = self._scope.match
+        return all(match(os.path.normcase(f)) for f in files)
+
+    def risk_level(self, files: List[str]) -> str:
+        # The last matching risk wins
+        level = 'low'
+        for pattern, risk_level in self._risks:
+            if any(pattern.match(os.path.normcase(f)) for f in files):
+                level = risk_level
+        return level
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scope": self.scope_source,
+            "risks": [list(r) for r in self.risk_sources],
+            "dependencies": sorted(self.dependencies) if self.dependencies is not None else None,
+            "valueWeights": self.value_weights
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompiledPolicy':
+        dependencies = data.get('dependencies')
+        return cls(
+            data.get('scope'),
+            [(source, level) for source, level in data.get('risks', [])],
+            set(dependencies) if dependencies is not None else None,
+            data.get('valueWeights', {})
+        )
+
+class PolicyBundle:
+    __slots__ = ('policy', 'manifesto', 'compiled', 'policy_sha256', 'manifesto_sha256', 'compiled_at')
+
+    def __init__(
+        self,
+        policy: PolicyConfig,
+        manifesto: Optional[ValueManifesto],
+        compiled: CompiledPolicy,
+        policy_sha256: str,
+        manifesto_sha256: Optional[str],
+        compiled_at: float
+    ):
+        self.policy = policy
+        self.manifesto = manifesto
+        self.compiled = compiled
+        self.policy_sha256 = policy_sha256
+        self.manifesto_sha256 = manifesto_sha256
+        self.compiled_at = compiled_at
+
+def source_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def compile_bundle(policy_text: str, manifesto_text: Optional[str], private_key_pem: str) -> bytes:
+    """
+    Parses and validates a policy (and manifesto), precompiles it and returns
+    the signed bundle bytes.
+    """
+    policy = PolicyConfig.model_validate(yaml.safe_load(policy_text))
+    manifesto = None
+    if manifesto_text is not None:
+        manifesto = ValueManifesto.model_validate(yaml.safe_load(manifesto_text))
+
+    # Caught here rather than on the first evaluation
+    for expression in _expressions(policy, manifesto):
+        if isinstance(expression, str):
+            raise ValueError(f"String-based policy conditions are disabled: '{expression}'. Please migrate to JSON Logic.")
+
+    payload = json.dumps({
+        "version": BUNDLE_VERSION,
+        "compiledAt": time.time(),
+        "policySha256": source_hash(policy_text),
+        "manifestoSha256": source_hash(manifesto_text) if manifesto_text is not None else None,
+        "policy": policy.model_dump(mode='json'),
+        "manifesto": manifesto.model_dump(mode='json') if manifesto else None,
+        "compiled": CompiledPolicy.from_policy(policy, manifesto).to_dict()
+    }, separators=(',', ':')).encode('utf-8')
+    signature = SovereignManager.sign_bytes(BUNDLE_MAGIC + payload, private_key_pem)
+    return BUNDLE_MAGIC + signature + payload
+
+def parse_bundle(data: bytes, public_key: Optional[str] = None) -> PolicyBundle:
+    """
+    Verifies (when a public key is given) and decodes bundle bytes. One Ed25519
+    check covers the policy, the manifesto and the compiled matchers.
+    """
+    header = len(BUNDLE_MAGIC) + SIGNATURE_SIZE
+    if len(data) < header or not data.startswith(BUNDLE_MAGIC):
+        raise ValueError("Not a policy bundle (bad header)")
+    signature = data[len(BUNDLE_MAGIC):header]
+    payload = data[header:]
+
+    if public_key and not SovereignManager.verify_bytes(BUNDLE_MAGIC + payload, signature, public_key):
+        raise ValueError("Policy bundle signature verification failed. Unauthorized policy modification detected!")
+
+    content = json.loads(payload)
+    if content.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported policy bundle version: {content.get('version')}. Recompile the policy.")
+    manifesto = content.get('manifesto')
+    return PolicyBundle(
+        policy=PolicyConfig.model_validate(content['policy']),
+        manifesto=ValueManifesto.model_validate(manifesto) if manifesto is not None else None,
+        compiled=CompiledPolicy.from_dict(content['compiled']),
+        policy_sha256=content['policySha256'],
+        manifesto_sha256=content.get('manifestoSha256'),
+        compiled_at=content.get('compiledAt', 0.0)
+    )
+
+def load_bundle(path: str, public_key: Optional[str] = None) -> PolicyBundle:
+    with open(path, 'rb') as f:
+        return parse_bundle(f.read(), public_key)
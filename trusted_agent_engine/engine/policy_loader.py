@@ -1,8 +1,13 @@
 import os
 import yaml
-from typing import Optional
-from .types import PolicyConfig
+from typing import Optional, Tuple
+from .types import PolicyConfig, ValueManifesto
 from .sovereign import SovereignManager
+from .policy_bundle import BUNDLE_FILE, CompiledPolicy, PolicyBundle, load_bundle, source_hash
+
+POLICY_FILE = 'agent.policy.yaml'
+MANIFESTO_FILE = 'value_manifesto.yaml'
+PUBLIC_KEY_FILE = os.path.join('.ai', 'sovereign.pub')
 
 def load_policy(path: str, public_key: Optional[str] = None, signature_path: Optional[str] = None) -> PolicyConfig:
     if not os.path.exists(path):
@@ -25,3 +30,68 @@ def load_policy(path: str, public_key: Optional[str] = None, signature_path: Opt
 
     data = yaml.safe_load(content)
     return PolicyConfig.model_validate(data)
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _source_changed(path: str, expected_hash: Optional[str]) -> bool:
+    # A missing source is fine: a bundle may be deployed on its own
+    content = _read_text(path)
+    return content is not None and source_hash(content) != expected_hash
+
+def load_workspace_bundle(workspace_root: str, public_key: Optional[str] = None) -> Optional[PolicyBundle]:
+    """
+    Loads the workspace's compiled bundle if there is one and it was compiled
+    from the policy and manifesto currently on disk. A stale bundle is ignored
+    (None); a bundle that fails verification raises ValueError.
+    """
+    path = os.path.join(workspace_root, BUNDLE_FILE)
+    if not os.path.exists(path):
+        return None
+    bundle = load_bundle(path, public_key=public_key)
+    if (_source_changed(os.path.join(workspace_root, POLICY_FILE), bundle.policy_sha256)
+            or _source_changed(os.path.join(workspace_root, MANIFESTO_FILE), bundle.manifesto_sha256)):
+        print(f"[Governance Warning] {BUNDLE_FILE} in {workspace_root} is stale (sources changed since compile); "
+              f"loading the YAML policy instead.")
+        return None
+    return bundle
+
+def load_compiled_workspace(workspace_root: str) -> Tuple[PolicyConfig, Optional[ValueManifesto], Optional[CompiledPolicy]]:
+    """
+    Like load_workspace, but prefers a current compiled bundle (no YAML parsing)
+    and also returns its precompiled matchers (None when loaded from YAML).
+    """
+    public_key = _read_text(os.path.join(workspace_root, PUBLIC_KEY_FILE))
+    bundle = load_workspace_bundle(workspace_root, public_key)
+    if bundle is not None:
+        return bundle.policy, bundle.manifesto, bundle.compiled
+    config, manifesto = _load_yaml_workspace(workspace_root, public_key)
+    return config, manifesto, None
+
+def load_workspace(workspace_root: str) -> Tuple[PolicyConfig, Optional[ValueManifesto]]:
+    """
+    Loads the verified policy and optional manifesto of a workspace, from its
+    compiled bundle when that is current.
+    """
+    config, manifesto, _ = load_compiled_workspace(workspace_root)
+    return config, manifesto
+
+def _load_yaml_workspace(workspace_root: str, public_key: Optional[str]) -> Tuple[PolicyConfig, Optional[ValueManifesto]]:
+    policy_path = os.path.join(workspace_root, POLICY_FILE)
+    manifesto_path = os.path.join(workspace_root, MANIFESTO_FILE)
+
+    # 1. Load policy (with signature verification)
+    config = load_policy(policy_path, public_key=public_key)
+
+    # 2. Load manifesto (optional)
+    manifesto = None
+    if os.path.exists(manifesto_path):
+        with open(manifesto_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+            manifesto = ValueManifesto.model_validate(data)
+
+    return config, manifesto
@@ -0,0 +1,225 @@
+import os
+import glob
+import fnmatch
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from .evaluator import PolicyEngine
+from .policy_loader import load_compiled_workspace, POLICY_FILE, MANIFESTO_FILE, PUBLIC_KEY_FILE
+from .policy_bundle import BUNDLE_FILE
+from .shadow import ShadowPolicy, load_shadow_policies, SHADOW_POLICY_PATTERN
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # inotify is optional, stat polling is always available
+    INotify = None
+    inotify_flags = None
+
+# Client-named (not preloaded) workspaces a registry keeps watching at once
+DEFAULT_MAX_WATCHERS = 64
+
+WATCHED_FILES = (POLICY_FILE, f"{POLICY_FILE}.sig", MANIFESTO_FILE, PUBLIC_KEY_FILE, BUNDLE_FILE)
+
+Fingerprint = Tuple[Optional[Tuple], ...]
+
+class PolicyWatcher:
+    """
+    Keeps a verified, ready-to-use PolicyEngine for one workspace.
+    The policy files are watched in the background; a change is re-verified and
+    recompiled off the request path and atomically swapped in. A policy that fails
+    verification is rejected and the last good engine keeps serving. Candidate
+    (shadow) policies of the workspace are reloaded along with it.
+    """
+
+    def __init__(
+        self,
+        workspace_root: str,
+        poll_interval: float = 1.0,
+        settle_delay: float = 0.2,
+        on_reject: Optional[Callable[[str, Exception], None]] = None
+    ):
+        self.workspace_root = workspace_root
+        self.poll_interval = poll_interval
+        self.settle_delay = settle_delay
+        self.on_reject = on_reject
+        self.last_error: Optional[str] = None
+        self.reload_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # The initial load must succeed: there is no last good policy to fall back on.
+        self._fingerprint = self._snapshot()
+        self.engine: PolicyEngine = self._build()
+        self.shadows: List[ShadowPolicy] = load_shadow_policies(workspace_root, self.engine.manifesto)
+
+    def start(self) -> 'PolicyWatcher':
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"policy-watcher:{self.workspace_root}",
+                daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
+            self._thread = None
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-verifies the workspace policy if its files changed.
+        Returns True when a new engine was swapped in.
+        """
+        with self._lock:
+            fingerprint = self._snapshot()
+            if not force and fingerprint == self._fingerprint:
+                return False
+            self._fingerprint = fingerprint
+
+            try:
+                engine = self._build()
+                shadows = load_shadow_policies(self.workspace_root, engine.manifesto)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[Governance Alert] Rejected policy update in {self.workspace_root}: {e}. "
+                      f"Continuing with last verified policy.")
+                if self.on_reject:
+                    self.on_reject(self.workspace_root, e)
+                return False
+
+            # Single reference assignment: readers see either the old or the new engine.
+            self.engine = engine
+            self.shadows = shadows
+            self.last_error = None
+            self.reload_count += 1
+            return True
+
+    def _build(self) -> PolicyEngine:
+        config, manifesto, compiled = load_compiled_workspace(self.workspace_root)
+        return PolicyEngine(config, manifesto, self.workspace_root, compiled=compiled)
+
+    def _snapshot(self) -> Fingerprint:
+        stats = []
+        for name in WATCHED_FILES:
+            try:
+                st = os.stat(os.path.join(self.workspace_root, name))
+                stats.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                stats.append(None)
+        for path in sorted(glob.glob(os.path.join(self.workspace_root, SHADOW_POLICY_PATTERN))):
+            try:
+                st = os.stat(path)
+                stats.append((path, st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                pass
+        return tuple(stats)
+
+    def _run(self) -> None:
+        if INotify is not None:
+            try:
+                self._watch_inotify()
+                return
+            except OSError as e:
+                print(f"[Governance Warning] inotify unavailable ({e}), falling back to polling.")
+        self._watch_polling()
+
+    def _watch_polling(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            if self._snapshot() != self._fingerprint:
+                # Let writers finish (e.g. policy written before its signature)
+                self._stop.wait(self.settle_delay)
+                self.reload()
+
+    def _watch_inotify(self) -> None:
+        mask = (inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE |
+                inotify_flags.DELETE | inotify_flags.ATTRIB)
+        watched_names = {os.path.basename(name) for name in WATCHED_FILES} | {'.ai'}
+        ai_dir = os.path.join(self.workspace_root, '.ai')
+
+        with INotify() as inotify:
+            inotify.add_watch(self.workspace_root, mask)
+            ai_watched = False
+            while not self._stop.is_set():
+                if not ai_watched and os.path.isdir(ai_dir):
+                    inotify.add_watch(ai_dir, mask)
+                    ai_watched = True
+
+                events = inotify.read(timeout=int(self.poll_interval * 1000))
+                if any(event.name in watched_names or fnmatch.fnmatch(event.name, SHADOW_POLICY_PATTERN)
+                       for event in events):
+                    self._stop.wait(self.settle_delay)
+                    inotify.read(timeout=0)  # coalesce the burst
+                    self.reload()
+
+class PolicyRegistry:
+    """
+    Process-wide map of workspace root -> PolicyWatcher.
+    Lookups on the request path are a dictionary read.
+
+    Workspaces are named by clients, so besides the preloaded ones at most
+    `max_watchers` are kept: each holds a watcher thread (and an inotify
+    descriptor), and the least recently used is stopped and dropped beyond that.
+    Preloaded workspaces are never dropped.
+    """
+
+    def __init__(self, watch: bool = True, poll_interval: float = 1.0, max_watchers: int = DEFAULT_MAX_WATCHERS):
+        self.watch = watch
+        self.poll_interval = poll_interval
+        self.max_watchers = max_watchers
+        self._watchers: 'OrderedDict[str, PolicyWatcher]' = OrderedDict()  # least recently used first
+        self._pinned: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, workspace_root: str) -> PolicyEngine:
+        return self._watcher(workspace_root).engine
+
+    def shadows(self, workspace_root: str) -> List[ShadowPolicy]:
+        return self._watcher(workspace_root).shadows
+
+    def preload(self, workspace_roots: List[str]) -> None:
+        for root in workspace_roots:
+            root = os.path.abspath(root)
+            self._pinned.add(root)
+            self._watcher(root)
+
+    def _watcher(self, workspace_root: str) -> PolicyWatcher:
+        root = os.path.abspath(workspace_root)
+        watcher = self._watchers.get(root)
+        if watcher is None:
+            return self._add(root)
+        try:
+            self._watchers.move_to_end(root)
+        except KeyError:  # evicted meanwhile; this request still gets its engine
+            pass
+        return watcher
+
+    def watchers(self) -> Dict[str, PolicyWatcher]:
+        return dict(self._watchers)
+
+    def close(self) -> None:
+        with self._lock:
+            for watcher in self._watchers.values():
+                watcher.stop()
+            self._watchers.clear()
+            self._pinned.clear()
+
+    def _add(self, root: str) -> PolicyWatcher:
+        evicted: List[PolicyWatcher] = []
+        with self._lock:
+            watcher = self._watchers.get(root)
+            if watcher is None:
+                watcher = PolicyWatcher(root, poll_interval=self.poll_interval)
+                if self.watch:
+                    watcher.start()
+                self._watchers[root] = watcher
+                unpinned = [r for r in self._watchers if r not in self._pinned]
+                for old in unpinned[:max(0, len(unpinned) - self.max_watchers)]:
+                    evicted.append(self._watchers.pop(old))
+        for old_watcher in evicted:
+            # Its thread exits at its next wakeup; requests holding its engine finish normally
+            old_watcher.stop(wait=False)
+        return watcher
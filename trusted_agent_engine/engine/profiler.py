@@ -0,0 +1,110 @@
+import os
+import re
+import time
+import glob
+import pstats
+import cProfile
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+
+PROFILE_DIR = os.path.join('.ai', 'profiles')
+# Profiles kept per workspace; saving one more deletes the oldest
+DEFAULT_MAX_PROFILES = 100
+
+class HotFunction(BaseModel):
+    function: str
+    calls: int
+    totalTimeMs: float  # time spent in the function itself
+    cumulativeTimeMs: float  # including callees
+    profiles: int  # number of captured profiles the function appears in
+
+class ProfileCapture:
+    """
+    cProfile capture for one proposal, saved as `.ai/profiles/<proposal-id>-<ms>.prof`.
+    Use it as a context manager around the synchronous stages to profile; entering
+    it several times accumulates into the same profile. At most `max_retained`
+    profiles are kept in the workspace (None: no limit).
+    """
+
+    def __init__(self, workspace_root: str, proposal_id: str, max_retained: Optional[int] = DEFAULT_MAX_PROFILES):
+        self.workspace_root = workspace_root
+        self.proposal_id = proposal_id
+        self.max_retained = max_retained
+        self.path: Optional[str] = None
+        self._profile = cProfile.Profile()
+        self._active = False
+
+    def __enter__(self) -> 'ProfileCapture':
+        try:
+            self._profile.enable()
+            self._active = True
+        except ValueError as e:
+            # Another profiler is already running in this thread
+            print(f"[Governance Warning] Profiling skipped: {e}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._active:
+            self._profile.disable()
+            self._active = False
+
+    def save(self) -> str:
+        directory = os.path.join(self.workspace_root, PROFILE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        safe_id = re.sub(r'[^A-Za-z0-9._-]', '_', self.proposal_id)[:100]
+        self.path = os.path.join(directory, f"{safe_id}-{int(time.time() * 1000)}.prof")
+        self._profile.dump_stats(self.path)
+        if self.max_retained is not None:
+            self._prune()
+        return self.path
+
+    def _prune(self) -> None:
+        def modified(path: str) -> float:
+            try:
+                return os.path.getmtime(path)
+            except FileNotFoundError:  # pruned concurrently
+                return 0.0
+        paths = sorted(list_profiles(self.workspace_root), key=modified)
+        for path in paths[:max(0, len(paths) - self.max_retained)]:
+            if path != self.path:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+def list_profiles(workspace_root: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(workspace_root, PROFILE_DIR, '*.prof')))
+
+def _label(key: Tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == '~':
+        return name  # built-in
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def aggregate_profiles(paths: List[str], sort: str = 'tottime', limit: int = 20) -> List[HotFunction]:
+    """
+    Merges captured profiles and returns the hottest functions.
+    `sort` is one of 'tottime', 'cumtime' or 'calls'.
+    """
+    totals: Dict[Tuple[str, int, str], List[float]] = {}
+    for path in paths:
+        # pstats.Stats.stats: key -> (primitive calls, calls, tottime, cumtime, callers)
+        for key, (_, calls, tottime, cumtime, _) in pstats.Stats(path).stats.items():
+            entry = totals.setdefault(key, [0, 0.0, 0.0, 0])
+            entry[0] += calls
+            entry[1] += tottime
+            entry[2] += cumtime
+            entry[3] += 1
+
+    column = {'tottime': 1, 'cumtime': 2, 'calls': 0}[sort]
+    ranked = sorted(totals.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+    return [
+        HotFunction(
+            function=_label(key),
+            calls=int(calls),
+            totalTimeMs=tottime * 1000,
+            cumulativeTimeMs=cumtime * 1000,
+            profiles=count
+        )
+        for key, (calls, tottime, cumtime, count) in ranked
+    ]
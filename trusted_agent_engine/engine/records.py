@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Optional, Union
+from .types import AnomalyReport, Decision
+
+# The engine builds decisions from values it produced itself, so the hot path
+# uses these plain slotted classes and converts to the public pydantic models
+# once, at the boundary. That conversion is a single `from_attributes`
+# validation pass: with pydantic 2 it is cheaper than `model_construct`, which
+# runs in Python, and than building nested models one by one.
+
+class ViolationRecord:
+    __slots__ = ('ruleId', 'description', 'level', 'valueWeight')
+
+    def __init__(self, ruleId: str, description: str, level: str, valueWeight: Optional[float] = None):
+        self.ruleId = ruleId
+        self.description = description
+        self.level = level
+        self.valueWeight = valueWeight
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Same keys, in the same order, as Violation.model_dump()
+        return {
+            'ruleId': self.ruleId,
+            'description': self.description,
+            'level': self.level,
+            'valueWeight': self.valueWeight
+        }
+
+class AccountabilityRecord:
+    __slots__ = ('responsibleEntity', 'signature', 'creditImpact')
+
+    def __init__(self, responsibleEntity: str, signature: str, creditImpact: float):
+        self.responsibleEntity = responsibleEntity
+        self.signature = signature
+        self.creditImpact = creditImpact
+
+class DecisionRecord:
+    """Internal counterpart of Decision; same attribute names, so code reading either works on both."""
+
+    __slots__ = (
+        'allowed', 'requiresHuman', 'riskLevel', 'actions', 'violations', 'valueScore',
+        'accountability', 'anomalyReport', 'skippedRules', 'timedOutStage', 'auditLog'
+    )
+
+    def __init__(
+        self,
+        allowed: bool,
+        requiresHuman: bool,
+        riskLevel: str,
+        actions: List[str],
+        violations: List[ViolationRecord],
+        valueScore: Optional[float] = None,
+        accountability: Optional[AccountabilityRecord] = None,
+        anomalyReport: Optional[AnomalyReport] = None,
+        skippedRules: Optional[List[str]] = None,
+        timedOutStage: Optional[str] = None,
+        auditLog: str = ""
+    ):
+        self.allowed = allowed
+        self.requiresHuman = requiresHuman
+        self.riskLevel = riskLevel
+        self.actions = actions
+        self.violations = violations
+        self.valueScore = valueScore
+        self.accountability = accountability
+        self.anomalyReport = anomalyReport
+        self.skippedRules = skippedRules
+        self.timedOutStage = timedOutStage
+        self.auditLog = auditLog
+
+    def to_model(self) -> Decision:
+        return Decision.model_validate(self, from_attributes=True)
+
+# What LiabilityManager accepts: it only reads attributes both share
+DecisionLike = Union[Decision, DecisionRecord]
@@ -0,0 +1,208 @@
+import os
+import json
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .types import Proposal, PolicyConfig, ValueManifesto, ReplayReport, RuleReplayDelta
+from .evaluator import PolicyEngine
+from .diff_parser import parse_unified_diff
+from .context_bank import iter_merged
+
+# (proposal id, recorded allowed, replayed allowed, recorded rule ids, replayed rule ids, error)
+ReplayOutcome = Tuple[str, bool, bool, List[str], List[str], Optional[str]]
+
+COMMIT_MARKER = '\x00'
+FIELD_SEPARATOR = '\x1f'
+
+def iter_ledger_records(workspace_root: str) -> Iterator[str]:
+    """
+    Streams raw ledger records of all shards in recording order; each one is
+    already a replay record (a DecisionTrace with the proposal and the recorded decision).
+    """
+    for raw in iter_merged(workspace_root):
+        yield raw.decode('utf-8')
+
+def iter_git_records(rev_range: str, cwd: Optional[str] = None, author: str = 'human') -> Iterator[str]:
+    """
+    Streams the commits of `git log -p <rev_range>` as replay records.
+    Commits landed, so their recorded decision is "allowed" with no violations.
+    """
+    fmt = '%x00%H%x1f%at%x1f%B%x1f'  # COMMIT_MARKER and FIELD_SEPARATOR as git escapes
+    # A file rather than a pipe: a pipe nobody drains could block git
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        ['git', 'log', '-p', '--no-color', '--no-ext-diff', f'--format={fmt}', rev_range],
+        cwd=cwd, stdout=subprocess.PIPE, stderr=stderr, encoding='utf-8', errors='replace'
+    )
+    completed = False
+    try:
+        header: Optional[str] = None
+        diff_lines: List[str] = []
+        for line in process.stdout:
+            if line.startswith(COMMIT_MARKER):
+                if header is not None:
+                    yield _git_record(header, ''.join(diff_lines), author)
+                header, diff_lines = line[1:], []
+            elif header is not None and header.count(FIELD_SEPARATOR) < 3:
+                header += line  # multi-line commit message
+            else:
+                diff_lines.append(line)
+        if header is not None:
+            yield _git_record(header, ''.join(diff_lines), author)
+        completed = True
+    finally:
+        if not completed:
+            # The consumer stopped early (or failed): git's exit status is moot
+            process.kill()
+        process.stdout.close()
+        code = process.wait()
+        stderr.seek(0)
+        message = stderr.read().decode('utf-8', errors='replace').strip()
+        stderr.close()
+    if code != 0:
+        raise RuntimeError(f"git log failed for range {rev_range}: {message or f'exit status {code}'}")
+
+def _git_record(header: str, diff: str, author: str) -> str:
+    sha, timestamp, message, _ = header.split(FIELD_SEPARATOR, 3)
+    diff = diff.lstrip('\n')
+    return json.dumps({
+        "proposal": {
+            "id": f"git-{sha}",
+            "timestamp": float(timestamp),
+            "author": author,
+            "reasoning": message.strip(),
+            "files": parse_unified_diff(diff).filesTouched,
+            "diff": diff
+        },
+        "allowed": True,
+        "violations": []
+    })
+
+_worker_engine: Optional[PolicyEngine] = None
+
+def _init_worker(policy: Dict[str, Any], manifesto: Optional[Dict[str, Any]], evaluation_mode: Optional[str]) -> None:
+    global _worker_engine
+    # No workspace root: no LiabilityManager, so credits are never touched
+    _worker_engine = PolicyEngine(
+        PolicyConfig.model_validate(policy),
+        ValueManifesto.model_validate(manifesto) if manifesto else None,
+        evaluation_mode=evaluation_mode
+    )
+
+def _replay_batch(records: List[str]) -> List[ReplayOutcome]:
+    outcomes: List[ReplayOutcome] = []
+    for record in records:
+        data = json.loads(record)
+        if data.get('timedOutStage'):
+            continue  # a deadline decision has no rule results; its background completion, if any, does
+        proposal_data = data.get('proposal') or {}
+        recorded_rules = [v['ruleId'] for v in data.get('violations', [])]
+        try:
+            # Replay must not depend on load: a candidate's meta.deadline is ignored
+            decision = _worker_engine.evaluate(Proposal.model_validate(proposal_data), use_deadline=False)
+            outcomes.append((
+                proposal_data.get('id', '?'), data['allowed'], decision.allowed,
+                recorded_rules, [v.ruleId for v in decision.violations], None
+            ))
+        except Exception as e:
+            outcomes.append((proposal_data.get('id', '?'), data.get('allowed', False), False, recorded_rules, [], str(e)))
+    return outcomes
+
+def _batches(records: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class ReplayRunner:
+    """
+    What-if replay of past proposals against a candidate policy.
+    Evaluation is side-effect free (no credits, no ledger writes) and spread over
+    a process pool; records are streamed so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyConfig,
+        manifesto: Optional[ValueManifesto] = None,
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+        evaluation_mode: Optional[str] = None,
+        max_changed: int = 100
+    ):
+        self.policy = policy
+        self.manifesto = manifesto
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.evaluation_mode = evaluation_mode
+        self.max_changed = max_changed
+
+    def run(self, records: Iterable[str]) -> ReplayReport:
+        report = ReplayReport(
+            total=0, unchanged=0, newlyBlocked=0, newlyAllowed=0, errors=0,
+            perRule={}, changedProposals=[]
+        )
+        for outcomes in self._evaluate(records):
+            for outcome in outcomes:
+                self._accumulate(report, outcome)
+        return report
+
+    def _evaluate(self, records: Iterable[str]) -> Iterator[List[ReplayOutcome]]:
+        initargs = (
+            self.policy.model_dump(),
+            self.manifesto.model_dump() if self.manifesto else None,
+            self.evaluation_mode
+        )
+        batches = _batches(records, self.batch_size)
+
+        if self.workers <= 1:
+            _init_worker(*initargs)
+            for batch in batches:
+                yield _replay_batch(batch)
+            return
+
+        # Bounded number of batches in flight keeps memory flat for huge ledgers
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+            pending: Set[Future] = set()
+            for batch in batches:
+                pending.add(pool.submit(_replay_batch, batch))
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in pending:
+                yield future.result()
+
+    def _accumulate(self, report: ReplayReport, outcome: ReplayOutcome) -> None:
+        proposal_id, was_allowed, now_allowed, old_rules, new_rules, error = outcome
+        report.total += 1
+        if error:
+            report.errors += 1
+            return
+
+        old_set, new_set = set(old_rules), set(new_rules)
+        for rule_id in new_set - old_set:
+            report.perRule.setdefault(rule_id, RuleReplayDelta()).added += 1
+        for rule_id in old_set - new_set:
+            report.perRule.setdefault(rule_id, RuleReplayDelta()).removed += 1
+
+        if was_allowed == now_allowed:
+            report.unchanged += 1
+            return
+        if was_allowed:
+            report.newlyBlocked += 1
+        else:
+            report.newlyAllowed += 1
+        if len(report.changedProposals) < self.max_changed:
+            report.changedProposals.append({
+                "id": proposal_id,
+                "recordedAllowed": was_allowed,
+                "replayedAllowed": now_allowed,
+                "rulesAdded": sorted(new_set - old_set),
+                "rulesRemoved": sorted(old_set - new_set)
+            })
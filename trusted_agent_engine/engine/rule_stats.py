@@ -0,0 +1,55 @@
+import threading
+from typing import Dict, List
+from .types import RuleConfig
+
+SEALING_ACTIONS = ('block', 'require_human')
+
+class RuleStats:
+    """
+    Runtime cost and selectivity statistics per policy rule.
+    Used by the fail-fast evaluation mode to try cheap, frequently blocking rules first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # rule id -> [evaluations, total_ns, triggers]
+        self._stats: Dict[str, List[int]] = {}
+
+    def record(self, rule_id: str, elapsed_ns: int, triggered: bool) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(rule_id, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += elapsed_ns
+            entry[2] += int(triggered)
+
+    def mean_cost_ns(self, rule_id: str) -> float:
+        entry = self._stats.get(rule_id)
+        if not entry:
+            return 0.0  # unmeasured rules go first so they get measured
+        return entry[1] / entry[0]
+
+    def trigger_rate(self, rule_id: str) -> float:
+        entry = self._stats.get(rule_id, [0, 0, 0])
+        # Laplace smoothing keeps never-triggering rules from dividing by zero
+        return (entry[2] + 1) / (entry[0] + 2)
+
+    def order(self, rules: List[RuleConfig]) -> List[RuleConfig]:
+        """
+        Sealing rules (block/require_human) by expected cost per trigger, then the rest.
+        Ties keep declaration order.
+        """
+        def key(rule: RuleConfig):
+            sealing = rule.action in SEALING_ACTIONS
+            return (0 if sealing else 1, self.mean_cost_ns(rule.id) / self.trigger_rate(rule.id))
+        return sorted(rules, key=key)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                rule_id: {
+                    "evaluations": entry[0],
+                    "meanCostNs": entry[1] / entry[0] if entry[0] else 0.0,
+                    "triggerRate": entry[2] / entry[0] if entry[0] else 0.0
+                }
+                for rule_id, entry in self._stats.items()
+            }
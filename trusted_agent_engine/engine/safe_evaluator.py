@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 import json_logic
 
 class SafeEvaluator:
@@ -24,3 +24,33 @@ class SafeEvaluator:
         except Exception as e:
             print(f"[Governance Error] Failed to evaluate JSON Logic: {e}")
             return False
+
+    @staticmethod
+    def collect_vars(expression: Any) -> Optional[Set[str]]:
+        """
+        Statically collects the `var` paths an expression reads.
+        Returns None when a path is only known at runtime (or the whole data is read),
+        in which case callers must provide the full context.
+        """
+        paths: Set[str] = set()
+        stack = [expression]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                for op, args in node.items():
+                    if op != 'var':
+                        stack.append(args)
+                        continue
+                    if isinstance(args, list):
+                        if not args:
+                            return None
+                        path, defaults = args[0], args[1:]
+                        stack.extend(defaults)
+                    else:
+                        path = args
+                    if isinstance(path, (dict, list)) or path is None or path == '':
+                        return None
+                    paths.add(str(path))
+        return paths
@@ -0,0 +1,317 @@
+import os
+import json
+import glob
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import BaseModel
+from .types import AnomalyReport, Decision, PolicyConfig, Proposal, RuleReplayDelta, ValueManifesto
+from .evaluator import PolicyEngine
+from .anomaly_detector import PROCESS_POOL_CONTEXT
+from .policy_loader import load_policy
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are POSIX-only
+    fcntl = None
+
+# Candidate policies trialled next to agent.policy.yaml: agent.shadow.<name>.yaml.
+# They never affect decisions, so they are loaded without a signature.
+SHADOW_POLICY_PATTERN = 'agent.shadow.*.yaml'
+SHADOW_LEDGER_FILE = os.path.join('.ai', 'shadow.jsonl')
+DEFAULT_SHADOW_QUEUE_SIZE = 1000
+SHADOW_QUEUE_ENV = 'TRUSTED_ENGINE_SHADOW_QUEUE'
+
+class ShadowRecord(BaseModel):
+    timestamp: float
+    proposalId: str
+    policy: str
+    primaryOutcome: str
+    shadowOutcome: str
+    rulesAdded: List[str]  # fired only under the shadow policy
+    rulesRemoved: List[str]  # fired only under the primary policy
+    evaluationMs: float
+    error: Optional[str] = None
+
+class ShadowPolicyStats(BaseModel):
+    workspaceRoot: str
+    policy: str
+    evaluated: int = 0
+    agreed: int = 0
+    errors: int = 0
+    # "<primary outcome> -> <shadow outcome>" counts, disagreements only
+    outcomes: Dict[str, int] = {}
+    perRule: Dict[str, RuleReplayDelta] = {}
+
+class ShadowMetrics(BaseModel):
+    capacity: int
+    queued: int
+    submitted: int
+    dropped: int
+    policies: List[ShadowPolicyStats]
+
+def fold_record(stats: ShadowPolicyStats, record: ShadowRecord) -> None:
+    stats.evaluated += 1
+    if record.error is not None:
+        stats.errors += 1
+    elif record.shadowOutcome == record.primaryOutcome:
+        stats.agreed += 1
+    else:
+        transition = f"{record.primaryOutcome} -> {record.shadowOutcome}"
+        stats.outcomes[transition] = stats.outcomes.get(transition, 0) + 1
+    for rule_id in record.rulesAdded:
+        stats.perRule.setdefault(rule_id, RuleReplayDelta()).added += 1
+    for rule_id in record.rulesRemoved:
+        stats.perRule.setdefault(rule_id, RuleReplayDelta()).removed += 1
+
+def decision_outcome(decision: Decision) -> str:
+    if 'block' in decision.actions:
+        return 'block'
+    if decision.requiresHuman:
+        return 'require_human'
+    return 'allow'
+
+def anomaly_config(policy: PolicyConfig) -> Tuple[Any, Any]:
+    """The policy settings an anomaly report depends on."""
+    return policy.meta.get('anomalyScan') or {}, policy.meta.get('anomalyBaseline') or {}
+
+class ShadowSpec(NamedTuple):
+    """What the shadow worker process needs to rebuild a shadow engine."""
+    name: str
+    policy: str  # PolicyConfig JSON
+    manifesto: Optional[str]  # ValueManifesto JSON
+    anomaly: Tuple[Any, Any]
+
+class ShadowPolicy:
+    """A candidate policy evaluated beside the primary one, without credit side effects."""
+
+    def __init__(self, name: str, engine: PolicyEngine):
+        self.name = name
+        self.engine = engine
+        # Same anomaly baselines as the primary engine, but never charge credits
+        self.engine.liability = None
+        self.spec = ShadowSpec(
+            name,
+            engine.policy.model_dump_json(),
+            engine.manifesto.model_dump_json() if engine.manifesto else None,
+            anomaly_config(engine.policy)
+        )
+
+def load_shadow_policies(workspace_root: str, manifesto: Optional[ValueManifesto] = None) -> List[ShadowPolicy]:
+    """
+    Loads the workspace's candidate policies. A candidate that fails to load is
+    skipped with a warning: it must never take the primary policy down with it.
+    """
+    shadows = []
+    for path in sorted(glob.glob(os.path.join(workspace_root, SHADOW_POLICY_PATTERN))):
+        name = os.path.basename(path)[len('agent.shadow.'):-len('.yaml')]
+        try:
+            shadows.append(ShadowPolicy(name, PolicyEngine(load_policy(path), manifesto, workspace_root)))
+        except Exception as e:
+            print(f"[Governance Warning] Skipping shadow policy '{name}' in {workspace_root}: {e}")
+    return shadows
+
+class _ShadowJob(NamedTuple):
+    workspace_root: str
+    shadows: List[ShadowSpec]
+    proposal: Proposal
+    primary: Decision
+    anomaly_report: Optional[AnomalyReport]
+    # anomaly_config() of the primary policy the report was computed under
+    anomaly: Optional[Tuple[Any, Any]]
+
+# Shadow engines of the worker process, rebuilt when a candidate policy changes
+_worker_engines: Dict[Tuple[str, str], Tuple[ShadowSpec, PolicyEngine]] = {}
+
+def _shadow_engine(workspace_root: str, spec: ShadowSpec) -> PolicyEngine:
+    cached = _worker_engines.get((workspace_root, spec.name))
+    if cached is not None and cached[0] == spec:
+        return cached[1]
+    manifesto = ValueManifesto.model_validate_json(spec.manifesto) if spec.manifesto else None
+    engine = PolicyEngine(PolicyConfig.model_validate_json(spec.policy), manifesto, workspace_root)
+    engine.liability = None
+    _worker_engines[(workspace_root, spec.name)] = (spec, engine)
+    return engine
+
+def evaluate_shadows(job: _ShadowJob) -> List[ShadowRecord]:
+    """Runs in the shadow worker process: one record per shadow policy of the job."""
+    primary_outcome = decision_outcome(job.primary)
+    primary_rules = {v.ruleId for v in job.primary.violations}
+    records = []
+    for spec in job.shadows:
+        # The primary's report only stands for a shadow scanning with the same settings;
+        # otherwise the shadow engine runs its own detection (if its rules need one)
+        report = job.anomaly_report if spec.anomaly == job.anomaly else None
+        started = time.perf_counter()
+        try:
+            engine = _shadow_engine(job.workspace_root, spec)
+            decision = engine.evaluate_record(job.proposal, report, use_deadline=False)
+            shadow_outcome, error = decision_outcome(decision), None
+            shadow_rules = {v.ruleId for v in decision.violations}
+        except Exception as e:
+            shadow_outcome, error, shadow_rules = 'error', str(e), set()
+        records.append(ShadowRecord(
+            timestamp=time.time(),
+            proposalId=job.proposal.id,
+            policy=spec.name,
+            primaryOutcome=primary_outcome,
+            shadowOutcome=shadow_outcome,
+            rulesAdded=sorted(shadow_rules - primary_rules),
+            rulesRemoved=sorted(primary_rules - shadow_rules),
+            evaluationMs=(time.perf_counter() - started) * 1000,
+            error=error
+        ))
+    return records
+
+class ShadowEvaluator:
+    """
+    Evaluates shadow policies after the primary decision has been returned, in
+    a separate worker process so that shadow work never competes with request
+    handling for the GIL. The queue is bounded: when it is full, shadow work is
+    dropped (and counted) rather than slowing down or queueing behind requests.
+    Every comparison is appended to the workspace's shadow ledger, apart from
+    the main one, and folded into per-policy disagreement statistics.
+    """
+
+    def __init__(self, max_queued: int = DEFAULT_SHADOW_QUEUE_SIZE):
+        self.max_queued = max_queued
+        self.submitted = 0
+        self.dropped = 0
+        self._stats: Dict[Tuple[str, str], ShadowPolicyStats] = {}
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+
+    def submit(
+        self,
+        workspace_root: str,
+        shadows: List[ShadowPolicy],
+        proposal: Proposal,
+        primary: Decision,
+        anomaly_report: Optional[AnomalyReport] = None,
+        primary_policy: Optional[PolicyConfig] = None
+    ) -> bool:
+        """
+        Queues shadow evaluation of a decided proposal. Never blocks; False if dropped.
+        The primary's anomaly report is reused by shadows whose anomaly settings
+        match `primary_policy`; the others detect anomalies themselves.
+        """
+        if not shadows:
+            return False
+        jobs = self._ensure_worker()
+        with self._lock:
+            self.submitted += 1
+        job = _ShadowJob(
+            workspace_root, [shadow.spec for shadow in shadows], proposal, primary,
+            anomaly_report or primary.anomalyReport,
+            anomaly_config(primary_policy) if primary_policy is not None else None
+        )
+        try:
+            jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def join(self) -> None:
+        """Waits until every queued job is processed."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def metrics(self) -> ShadowMetrics:
+        with self._lock:
+            policies = [stats.model_copy(deep=True) for stats in self._stats.values()]
+            return ShadowMetrics(
+                capacity=self.max_queued,
+                queued=self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0,
+                submitted=self.submitted,
+                dropped=self.dropped,
+                policies=policies
+            )
+
+    def _ensure_worker(self) -> queue.Queue:
+        # Started lazily, and again in a forked server worker (threads do not survive fork)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queued)
+                self._pool = None
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, args=(self._queue,), name="shadow-evaluator", daemon=True).start()
+            return self._queue
+
+    def _run(self, jobs: queue.Queue) -> None:
+        # Only hands jobs to the worker process and waits, mostly outside the GIL
+        while True:
+            job = jobs.get()
+            try:
+                records = self._evaluate(job)
+                with self._lock:
+                    for record in records:
+                        key = (job.workspace_root, record.policy)
+                        stats = self._stats.get(key)
+                        if stats is None:
+                            stats = self._stats[key] = ShadowPolicyStats(workspaceRoot=job.workspace_root, policy=record.policy)
+                        fold_record(stats, record)
+                self._append(job.workspace_root, records)
+            except Exception as e:
+                print(f"[Governance Error] Shadow evaluation of '{job.proposal.id}' failed: {e}")
+            finally:
+                jobs.task_done()
+
+    def _evaluate(self, job: _ShadowJob) -> List[ShadowRecord]:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=PROCESS_POOL_CONTEXT)
+        try:
+            return self._pool.submit(evaluate_shadows, job).result()
+        except BrokenProcessPool:
+            self._pool = None  # the worker died (e.g. OOM-killed); the next job starts a new one
+            raise
+
+    @staticmethod
+    def _append(workspace_root: str, records: List[ShadowRecord]) -> None:
+        data = b''.join(record.model_dump_json().encode('utf-8') + b'\n' for record in records)
+        path = os.path.join(workspace_root, SHADOW_LEDGER_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)  # shared by the server workers
+            f.write(data)
+
+def iter_shadow_ledger(workspace_root: str) -> Iterator[ShadowRecord]:
+    path = os.path.join(workspace_root, SHADOW_LEDGER_FILE)
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n') and line.strip():  # skip a record still being written
+                yield ShadowRecord.model_validate(json.loads(line))
+
+def summarize_shadow_ledger(workspace_root: str, since: Optional[float] = None) -> List[ShadowPolicyStats]:
+    """Disagreement statistics per shadow policy over the whole shadow ledger (all workers)."""
+    stats: Dict[str, ShadowPolicyStats] = {}
+    for record in iter_shadow_ledger(workspace_root):
+        if since is not None and record.timestamp < since:
+            continue
+        policy_stats = stats.get(record.policy)
+        if policy_stats is None:
+            policy_stats = stats[record.policy] = ShadowPolicyStats(workspaceRoot=workspace_root, policy=record.policy)
+        fold_record(policy_stats, record)
+    return [stats[name] for name in sorted(stats)]
+
+_default_evaluator: Optional[ShadowEvaluator] = None
+_default_lock = threading.Lock()
+
+def shadow_evaluator() -> ShadowEvaluator:
+    """The process-wide evaluator used by TrustedGuard and the API server."""
+    global _default_evaluator
+    with _default_lock:
+        if _default_evaluator is None:
+            _default_evaluator = ShadowEvaluator(
+                int(os.environ.get(SHADOW_QUEUE_ENV, DEFAULT_SHADOW_QUEUE_SIZE))
+            )
+        return _default_evaluator
@@ -52,3 +52,27 @@ class SovereignManager:
             return True
         except Exception:
             return False
+
+    @staticmethod
+    def sign_bytes(data: bytes, private_key_pem: str) -> bytes:
+        """Raw 64-byte Ed25519 signature, for binary artifacts such as policy bundles."""
+        private_key = serialization.load_pem_private_key(
+            private_key_pem.encode('utf-8'),
+            password=None
+        )
+        if not isinstance(private_key, ed25519.Ed25519PrivateKey):
+            raise ValueError("Private key must be Ed25519")
+        return private_key.sign(data)
+
+    @staticmethod
+    def verify_bytes(data: bytes, signature: bytes, public_key_pem: str) -> bool:
+        try:
+            public_key = serialization.load_pem_public_key(
+                public_key_pem.encode('utf-8')
+            )
+            if not isinstance(public_key, ed25519.Ed25519PublicKey):
+                return False
+            public_key.verify(signature, data)
+            return True
+        except Exception:
+            return False
@@ -71,6 +71,11 @@ class AnomalyReport(BaseModel):
     isAnomaly: bool
     score: float
     reasons: List[str]
+    # Highest z-score against the learned size baselines (None until one is learned)
+    baselineZ: Optional[float] = None
+    # Per-file [added, removed] line counts measured for baseline scoring, handed
+    # on to BaselineStore.observe; never serialized
+    fileStats: Optional[Dict[str, List[int]]] = Field(default=None, exclude=True)
 
 class GovernanceAsset(BaseModel):
     id: str
@@ -100,11 +105,83 @@ class Decision(BaseModel):
     valueScore: Optional[float] = None
     accountability: Optional[Accountability] = None
     anomalyReport: Optional[AnomalyReport] = None
+    skippedRules: Optional[List[str]] = None
+    # Set when the evaluation deadline cut this stage short (the decision is then require_human)
+    timedOutStage: Optional[Literal['scan', 'anomaly', 'rules']] = None
     auditLog: str
 
 class DecisionTrace(Decision):
     proposal: Proposal
     outcome: Literal['applied', 'rejected', 'pending']
+    # Set by ContextBank.record: write time and position within the ledger (shard)
+    recordedAt: Optional[float] = None
+    sequence: Optional[int] = None
+    # Hash of the previous record in the same ledger file (hash chain)
+    prevHash: Optional[str] = None
+    # Full result of an evaluation first answered with a deadline decision, and
+    # the sequence of that decision's trace in the same ledger file. Decision
+    # counts skip completions; rule-level analyses skip the timed-out trace.
+    backgroundCompletion: Optional[bool] = None
+    completesSequence: Optional[int] = None
+
+    @classmethod
+    def from_decision(cls, decision: Decision, proposal: Proposal, outcome: str) -> 'DecisionTrace':
+        """
+        Wraps an engine decision without re-validating it or copying the proposal.
+        """
+        return cls.model_construct(**dict(decision), proposal=proposal, outcome=outcome)
+
+class HistoryPage(BaseModel):
+    traces: List[DecisionTrace]
+    count: int
+    nextCursor: Optional[str] = None
+
+class LedgerCheckpoint(BaseModel):
+    size: int  # records covered
+    root: str  # Merkle root of their entry hashes
+    lastHash: str
+    createdAt: float
+    signature: Optional[str] = None  # sovereign signature, if a key was available
+
+class InclusionProof(BaseModel):
+    shard: str
+    position: int
+    entryHash: str
+    treeSize: int
+    root: str
+    path: List[str]
+    signature: Optional[str] = None  # of the checkpoint the proof is against
+
+class ShardVerification(BaseModel):
+    shard: str
+    ok: bool
+    records: int
+    legacyRecords: int  # written before hash chaining
+    tornRecords: int
+    checkpoints: int
+    signedCheckpoints: int  # with a signature verified against the public key
+    unverifiedCheckpoints: int  # signed, but verified without a public key
+    firstCorruptPosition: Optional[int] = None
+    firstCorruptOffset: Optional[int] = None
+    error: Optional[str] = None
+
+class LedgerVerification(BaseModel):
+    ok: bool
+    shards: List[ShardVerification]
+    durationMs: float
+
+class RuleReplayDelta(BaseModel):
+    added: int = 0
+    removed: int = 0
+
+class ReplayReport(BaseModel):
+    total: int
+    unchanged: int
+    newlyBlocked: int
+    newlyAllowed: int
+    errors: int
+    perRule: Dict[str, RuleReplayDelta]
+    changedProposals: List[Dict[str, Any]]
 
 # Resolve forward references
 Vote.model_rebuild()